@@ -1,10 +1,18 @@
 """Application factory for Tarpaulin API."""
+import logging
+
 from flask import Flask
 from flask_cors import CORS
 
 from config import config
+from app.auth.policy import register_policies
 from app.extensions import init_extensions
 from app.errors.handlers import register_error_handlers
+from app.utils.compression import register_compression
+from app.utils.json_provider import FastJSONProvider
+from app.utils.metrics import register_metrics
+from app.utils.profiling import register_profiling
+from app.utils.rate_limit import register_rate_limiting
 
 
 def create_app(config_name='default'):
@@ -21,6 +29,10 @@ def create_app(config_name='default'):
     
     # Load configuration
     app.config.from_object(config[config_name])
+    configure_logging(app)
+    
+    # Encode JSON responses with the configured fast encoder
+    app.json = FastJSONProvider(app)
     
     # Initialize extensions
     init_extensions(app)
@@ -28,15 +40,49 @@ def create_app(config_name='default'):
     # Enable CORS
     CORS(app)
     
+    # Time Datastore, storage and HTTP calls per request
+    register_metrics(app)
+    
     # Register error handlers
     register_error_handlers(app)
     
+    # Compress large JSON responses
+    register_compression(app)
+    
     # Register blueprints
     register_blueprints(app)
     
+    # Enforce each endpoint's authorization policy
+    register_policies(app)
+    
+    # Shed excess load and rate-limit clients before any other work
+    register_rate_limiting(app)
+    
+    # Profile requests on demand (no-op unless PROFILING_ENABLED)
+    register_profiling(app)
+    
     return app
 
 
+def configure_logging(app):
+    """Set the level of the app's loggers.
+    
+    Messages are key=value pairs. A handler is only added when neither the
+    ``app`` logger nor the root logger has one, so a server's own logging
+    configuration (e.g. gunicorn's) takes precedence.
+    
+    Args:
+        app: Flask application instance
+    """
+    logger = logging.getLogger('app')
+    logger.setLevel(app.config['LOG_LEVEL'])
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(
+            'time=%(asctime)s level=%(levelname)s logger=%(name)s %(message)s'))
+        logger.addHandler(handler)
+
+
 def register_blueprints(app):
     """Register all blueprints with the application.
     
@@ -48,9 +94,11 @@ def register_blueprints(app):
     from app.routes.user_routes import users_bp
     from app.routes.course_routes import courses_bp
     from app.routes.avatar_routes import avatar_bp
+    from app.routes.admin_routes import admin_bp
     
     # Register blueprints with proper prefixes
     app.register_blueprint(auth_bp)    # ensures /users/login is active
     app.register_blueprint(users_bp)   # handles GET/… /users
-    # app.register_blueprint(course_bp)  # handles /courses
-    # app.register_blueprint(enrollment_bp)  # handles /courses/<id>/students
\ No newline at end of file
+    app.register_blueprint(courses_bp) # handles /courses and /courses/<id>/students
+    app.register_blueprint(avatar_bp)  # handles /users/<id>/avatar
+    app.register_blueprint(admin_bp)   # handles /admin/... operational endpoints
\ No newline at end of file
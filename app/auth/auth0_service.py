@@ -1,13 +1,73 @@
 """Auth0 integration for user authentication."""
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+
 import requests
 from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from app.errors.exceptions import UnauthorizedError, BadRequestError
+from app.utils.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Pooled keep-alive session, created lazily per process so it's fork safe
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+# Per-process salt for login cache keys; credentials are never stored
+_CACHE_KEY_SALT = os.urandom(32)
+
+
+def get_session():
+    """Get the process-wide HTTP session used to talk to Auth0.
+    
+    Returns:
+        requests.Session with a sized connection pool and retry policy
+    """
+    global _session, _session_pid
+    
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                config = current_app.config
+                retry = Retry(
+                    total=config['AUTH0_MAX_RETRIES'],
+                    read=0,
+                    backoff_factor=config['AUTH0_RETRY_BACKOFF'],
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset(['POST'])
+                )
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=config['AUTH0_POOL_SIZE'],
+                                      max_retries=retry)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session, _session_pid = session, os.getpid()
+    
+    return _session
+
+
+def _login_cache_key(username, password):
+    """Derive the login cache key from a salted hash of the credentials."""
+    message = f'{username}\0{password}'.encode()
+    return hmac.new(_CACHE_KEY_SALT, message, hashlib.sha256).digest()
 
 
 def login_user(username, password):
     """Authenticate user with Auth0 and get JWT token.
     
+    When LOGIN_CACHE_ENABLED is set, a successful login is reused for
+    identical credentials for up to LOGIN_CACHE_TTL seconds (and never past
+    the token's own expiry), so bursts of re-logins cost one round-trip.
+    
     Args:
         username: User's email/username
         password: User's password
@@ -22,8 +82,16 @@ def login_user(username, password):
     if not username or not password:
         raise BadRequestError('Username and password are required')
     
+    cache = current_app.login_cache
+    if cache is not None:
+        cache_key = _login_cache_key(username, password)
+        token = cache.get(cache_key)
+        if token is not None:
+            return {'token': token}
+    
     # Auth0 token endpoint
-    url = f'https://{current_app.config["AUTH0_DOMAIN"]}/oauth/token'
+    url = (current_app.config.get('AUTH0_TOKEN_URL') or
+           f'https://{current_app.config["AUTH0_DOMAIN"]}/oauth/token')
     
     # Request body for password grant
     data = {
@@ -37,19 +105,31 @@ def login_user(username, password):
     }
     
     # Make request to Auth0
-    response = requests.post(url, json=data)
+    try:
+        with timed('http.auth0_token'):
+            response = get_session().post(url, json=data,
+                                          timeout=current_app.config['AUTH0_TIMEOUT'])
+    except requests.RequestException:
+        logger.warning('Auth0 token request failed', exc_info=True)
+        raise UnauthorizedError('Authentication failed')
     
-    # Debug: Print response details
-    print(f"Auth0 Response Status: {response.status_code}")
-    print(f"Auth0 Response: {response.text}")
+    logger.debug('Auth0 token response status: %s', response.status_code)
     
     if response.status_code == 200:
         result = response.json()
+        token = result['access_token']
+        
+        if cache is not None:
+            lifetime = current_app.config['LOGIN_CACHE_TTL']
+            if 'expires_in' in result:
+                lifetime = min(lifetime, result['expires_in'] - 60)
+            if lifetime > 0:
+                cache.set(cache_key, token, expires_at=time.time() + lifetime)
+        
         return {
-            'token': result['access_token']
+            'token': token
         }
     elif response.status_code == 403 or response.status_code == 401:
         raise UnauthorizedError('Invalid username or password')
     else:
         raise UnauthorizedError('Authentication failed')
-    
\ No newline at end of file
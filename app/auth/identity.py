@@ -0,0 +1,132 @@
+"""Resolution of the authenticated caller to a User.
+
+Authorization only needs the caller's ID and role. With
+``JWT_ROLE_CLAIMS_ENABLED`` these come from namespaced custom claims in the
+verified token (``<JWT_CLAIM_NAMESPACE>role`` and ``...user_id``, added
+by an Auth0 Action from the user's app_metadata), so role-gated requests
+do no lookup at all. Tokens without valid claims fall back to Datastore.
+
+Staleness: a role change reaches claims-authorized requests only when the
+user's tokens carrying the old role stop being trusted, i.e. at the
+token's ``exp``, or ``JWT_ROLE_CLAIMS_MAX_AGE`` seconds after its ``iat``
+if that's sooner. Lookups through the identity cache are bounded by
+IDENTITY_CACHE_TTL instead.
+"""
+import copy
+import time
+
+from flask import current_app, g, request
+
+from app.models.user import User
+
+
+ROLES = frozenset(('admin', 'instructor', 'student'))
+
+
+class TokenIdentity:
+    """The caller's identity as asserted by verified token claims."""
+
+    __slots__ = ('id', 'role', 'sub')
+
+    def __init__(self, user_id, role, sub):
+        """Initialize the identity.
+
+        Args:
+            user_id: Datastore ID of the user
+            role: The user's role
+            sub: Auth0 subject identifier
+        """
+        self.id = user_id
+        self.role = role
+        self.sub = sub
+
+
+def get_caller():
+    """Get the ID and role of the current request's caller.
+
+    Trusted token claims are used when present; otherwise the caller is
+    resolved to their User (``get_current_user``). Memoized on ``flask.g``.
+
+    Returns:
+        TokenIdentity, User, or None if no user has the token's sub
+    """
+    if 'caller' not in g:
+        g.caller = identity_from_claims(request.jwt_payload) or get_current_user()
+    return g.caller
+
+
+def identity_from_claims(payload):
+    """Read the caller's identity from a verified JWT payload.
+
+    Args:
+        payload: Verified JWT payload
+
+    Returns:
+        TokenIdentity, or None if claims are disabled, missing, malformed
+        or older than JWT_ROLE_CLAIMS_MAX_AGE
+    """
+    config = current_app.config
+    if not config['JWT_ROLE_CLAIMS_ENABLED']:
+        return None
+
+    namespace = config['JWT_CLAIM_NAMESPACE']
+    role = payload.get(namespace + 'role')
+    user_id = payload.get(namespace + 'user_id')
+    if not isinstance(role, str) or role not in ROLES or user_id is None:
+        return None
+
+    max_age = config['JWT_ROLE_CLAIMS_MAX_AGE']
+    if max_age is not None and time.time() - payload.get('iat', 0) > max_age:
+        return None
+
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    return TokenIdentity(user_id, role, payload.get('sub'))
+
+
+def get_current_user():
+    """Get the User for the verified JWT of the current request.
+
+    The user is resolved at most once per request and memoized on
+    ``flask.g``; across requests lookups go through the process-wide
+    identity cache before falling back to Datastore.
+
+    Use this when the full user record is needed; ``get_caller`` is enough
+    to make authorization decisions.
+
+    Returns:
+        User instance or None if no user has the token's sub
+    """
+    if 'current_user' not in g:
+        g.current_user = get_user_by_sub(request.jwt_payload.get('sub'))
+    return g.current_user
+
+
+def get_user_by_sub(sub):
+    """Get a user by Auth0 sub through the identity cache.
+
+    Args:
+        sub: Auth0 subject identifier
+
+    Returns:
+        User instance or None
+    """
+    if not sub:
+        return None
+
+    cache = current_app.identity_cache
+    if cache is None:
+        return User.get_by_sub(sub)
+
+    user = cache.get(sub)
+    if user is None:
+        user = User.get_by_sub(sub)
+        if user is None:
+            return None
+        # Cache a private copy; the request's loader memoizes the original
+        cache.set(sub, copy.copy(user))
+
+    # Hand out a copy so callers can't mutate the shared cached instance
+    return copy.copy(user)
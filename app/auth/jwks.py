@@ -0,0 +1,138 @@
+"""In-process JWKS key store for JWT signature verification."""
+import json
+import logging
+import threading
+import time
+from urllib.request import urlopen
+
+from jose import jwk
+
+from app.utils.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSCache:
+    """Cache of the identity provider's signing keys, indexed by ``kid``.
+
+    Keys are fetched once and kept as pre-constructed public key objects, so
+    verifying a token is a dict lookup plus the signature check. Once the key
+    set is older than ``ttl`` it is still served while a background thread
+    refreshes it (stale-while-revalidate). A token signed with an unknown
+    ``kid`` triggers a single synchronous refetch shared by all waiting
+    threads; refetches (including retries after a failed first fetch) are
+    rate-limited by ``min_refetch_interval`` so forged headers cannot hammer
+    the provider. Fetches run without holding the lock that guards the
+    key set, which is swapped in whole.
+    """
+
+    def __init__(self, url, ttl=600, min_refetch_interval=30, timeout=5,
+                 algorithm='RS256'):
+        """Initialize the cache.
+
+        Args:
+            url: URL of the JWKS document
+            ttl: Seconds before the key set is refreshed in the background
+            min_refetch_interval: Minimum seconds between unknown-kid refetches
+            timeout: Network timeout for a JWKS fetch, in seconds
+            algorithm: Algorithm used for keys that don't declare ``alg``
+        """
+        self.url = url
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self.algorithm = algorithm
+
+        self._keys = {}
+        self._fetched_at = None
+        self._last_attempt = None
+        self._generation = 0
+        self._refreshing = False
+
+        # Serializes unknown-kid refetches; held during that fetch
+        self._lock = threading.Lock()
+        # Guards the key set swap and ``_refreshing``; never held during I/O
+        self._state_lock = threading.Lock()
+
+    def get_key(self, kid):
+        """Get the public key for a ``kid``.
+
+        Args:
+            kid: Key ID from the token header
+
+        Returns:
+            jose Key instance or None if the provider has no such key
+        """
+        key = self._keys.get(kid)
+
+        if key is not None:
+            if time.monotonic() - self._fetched_at > self.ttl:
+                self._refresh_in_background()
+            return key
+
+        self._refresh_for_unknown_kid()
+        return self._keys.get(kid)
+
+    def _refresh_for_unknown_kid(self):
+        """Refetch the key set once for all threads missing a kid."""
+        generation = self._generation
+        with self._lock:
+            # Another thread refreshed while we waited for the lock.
+            if self._generation != generation:
+                return
+
+            if (self._last_attempt is not None and
+                    time.monotonic() - self._last_attempt < self.min_refetch_interval):
+                return
+
+            try:
+                self._refresh()
+            except Exception:
+                logger.warning('JWKS fetch from %s failed', self.url, exc_info=True)
+
+    def _refresh_in_background(self):
+        """Start a background refresh unless one is already running."""
+        with self._state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        thread = threading.Thread(target=self._background_refresh,
+                                  name='jwks-refresh', daemon=True)
+        thread.start()
+
+    def _background_refresh(self):
+        """Refresh the key set, keeping the stale keys on failure."""
+        try:
+            self._refresh()
+        except Exception:
+            logger.warning('JWKS background refresh from %s failed', self.url,
+                           exc_info=True)
+            # Keep serving the stale keys; retry after min_refetch_interval.
+            with self._state_lock:
+                self._fetched_at = (time.monotonic() - self.ttl +
+                                    self.min_refetch_interval)
+        finally:
+            with self._state_lock:
+                self._refreshing = False
+
+    def _refresh(self):
+        """Fetch the JWKS document and swap in the new key index."""
+        self._last_attempt = time.monotonic()
+
+        with timed('http.jwks'), urlopen(self.url, timeout=self.timeout) as response:
+            jwks = json.loads(response.read())
+
+        keys = {}
+        for key in jwks.get('keys', []):
+            if 'kid' not in key or key.get('use', 'sig') != 'sig':
+                continue
+            try:
+                keys[key['kid']] = jwk.construct(key, key.get('alg', self.algorithm))
+            except Exception:
+                logger.warning('Skipping unusable JWKS key %s', key['kid'])
+
+        with self._state_lock:
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            self._generation += 1
@@ -1,12 +1,11 @@
 """JWT utilities for token validation and decoding."""
-import json
-from functools import wraps
-from urllib.request import urlopen
+import hashlib
 
 from flask import current_app, request
 from jose import jwt
 
 from app.errors.exceptions import UnauthorizedError, ForbiddenError
+from app.utils.metrics import timed
 
 
 class AuthError(Exception):
@@ -44,8 +43,29 @@ def get_token_auth_header():
     return token
 
 
+def get_jwks_cache():
+    """Get the application's JWKS key store.
+
+    Returns:
+        JWKSCache instance
+    """
+    return current_app.jwks_cache
+
+
+def get_token_cache():
+    """Get the application's verified-token cache.
+
+    Returns:
+        LRUCache instance or None if token caching is disabled
+    """
+    return current_app.token_cache
+
+
 def verify_jwt(token):
-    """Decode and verify the JWT using Auth0.
+    """Verify a JWT, reusing the payload of a previously verified token.
+    
+    Verified payloads are cached under a digest of the token until the
+    token's ``exp`` claim, so repeat bearer tokens skip RS256 verification.
     
     Args:
         token: A json web token string
@@ -56,27 +76,44 @@ def verify_jwt(token):
     Raises:
         UnauthorizedError: If the token is invalid
     """
-    # Get public key from Auth0
-    jsonurl = urlopen(f'https://{current_app.config["AUTH0_DOMAIN"]}/.well-known/jwks.json')
-    jwks = json.loads(jsonurl.read())
+    cache = get_token_cache()
+    if cache is None:
+        with timed('auth.decode_jwt'):
+            return decode_jwt(token)
     
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = cache.get(digest)
+    if payload is None:
+        with timed('auth.decode_jwt'):
+            payload = decode_jwt(token)
+        if 'exp' in payload:
+            cache.set(digest, payload, expires_at=payload['exp'])
+    return payload
+
+
+def decode_jwt(token):
+    """Decode and verify the JWT using Auth0.
+    
+    Signing keys come from the in-process JWKS cache, so steady-state
+    verification does not touch the network.
+    
+    Args:
+        token: A json web token string
+        
+    Returns:
+        dict: The decoded JWT payload
+        
+    Raises:
+        UnauthorizedError: If the token is invalid
+    """
     # Get the data in the header
     unverified_header = jwt.get_unverified_header(token)
     
     # Choose our key
-    rsa_key = {}
     if 'kid' not in unverified_header:
         raise UnauthorizedError('Authorization malformed.')
     
-    for key in jwks['keys']:
-        if key['kid'] == unverified_header['kid']:
-            rsa_key = {
-                'kty': key['kty'],
-                'kid': key['kid'],
-                'use': key['use'],
-                'n': key['n'],
-                'e': key['e']
-            }
+    rsa_key = get_jwks_cache().get_key(unverified_header['kid'])
             
     if rsa_key:
         try:
@@ -101,25 +138,20 @@ def verify_jwt(token):
         
     raise UnauthorizedError('Unable to find appropriate key.')
 
-def requires_auth(f):
-    """Decorator to require valid JWT for a route.
+def authenticate_request():
+    """Verify the request's bearer token and attach its payload.
     
-    Args:
-        f: The function to decorate
-        
-    Returns:
-        The decorated function
+    Sets ``request.jwt_payload`` on success.
+    
+    Raises:
+        UnauthorizedError: If the token is missing or invalid
     """
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        try:
-            token = get_token_auth_header()
-            payload = verify_jwt(token)
-            request.jwt_payload = payload
-            return f(*args, **kwargs)
-        except UnauthorizedError:
-            raise
-        except Exception:
-            raise UnauthorizedError('Authorization failed.')
-        
-    return decorated
\ No newline at end of file
+    try:
+        token = get_token_auth_header()
+        payload = verify_jwt(token)
+        request.jwt_payload = payload
+    except UnauthorizedError:
+        raise
+    except Exception:
+        raise UnauthorizedError('Authorization failed.')
+
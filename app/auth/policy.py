@@ -0,0 +1,197 @@
+"""Declarative per-endpoint authorization.
+
+``POLICIES`` maps every endpoint to a ``Policy``. At startup
+``register_policies`` compiles each policy into a check function
+specialised for it, and one ``before_request`` hook runs the check for
+the matched endpoint before the view is called. Creating the app fails if
+an endpoint has no policy, so a new route can't be public by accident.
+
+A check authenticates the bearer token and applies the per-sub rate limit
+(``app.rate_limiter``), then decides with as little work as possible:
+
+* ``AUTHENTICATED`` policies are decided by the JWT alone.
+* Role and owner policies need the caller's role and ID
+  (``get_caller``). Those come from the token's role claims when they're
+  trusted (JWT_ROLE_CLAIMS_ENABLED), again without any lookup; otherwise
+  the caller is resolved once per request through the identity cache and
+  Datastore. The result is set as ``request.caller``.
+
+Resource-level rules that need the resource itself, like "the course's
+instructor", stay in the view and use ``request.caller``.
+"""
+from flask import current_app, request
+
+from app.auth.identity import get_caller
+from app.auth.jwt_utils import authenticate_request
+from app.errors.exceptions import ForbiddenError
+
+
+class Policy:
+    """Who may call an endpoint.
+
+    A caller is allowed if their role is in ``roles`` or, with
+    ``owner_param``, if their user ID equals that URL parameter.
+    """
+
+    __slots__ = ('authenticated', 'roles', 'owner_param')
+
+    def __init__(self, authenticated=True, roles=(), owner_param=None):
+        """Initialize the policy.
+
+        Args:
+            authenticated: Require a valid JWT
+            roles: Roles allowed to call the endpoint
+            owner_param: URL parameter holding the ID of the owning user
+        """
+        self.authenticated = authenticated
+        self.roles = frozenset(roles)
+        self.owner_param = owner_param
+
+    def __repr__(self):
+        return (f'Policy(authenticated={self.authenticated}, roles={sorted(self.roles)}, '
+                f'owner_param={self.owner_param!r})')
+
+
+PUBLIC = Policy(authenticated=False)
+AUTHENTICATED = Policy()
+
+
+def role(*roles):
+    """Policy allowing callers with any of ``roles``."""
+    return Policy(roles=roles)
+
+
+def owner(param='user_id', *roles):
+    """Policy allowing the user named by a URL parameter, and ``roles``."""
+    return Policy(roles=roles, owner_param=param)
+
+
+# Policy of every endpoint, by Flask endpoint name
+POLICIES = {
+    'auth.test': PUBLIC,
+    'auth.login': PUBLIC,
+
+    'users.get_users': role('admin'),
+    'users.get_user': owner('user_id', 'admin'),
+
+    # The view checks ownership after the body, so a missing file is a 400
+    'avatar.upload': AUTHENTICATED,
+    'avatar.download': owner('user_id'),
+    'avatar.delete': owner('user_id'),
+
+    'courses.create': role('admin'),
+    'courses.list_all': PUBLIC,
+    'courses.get': PUBLIC,
+    'courses.update': role('admin'),
+    'courses.delete': role('admin'),
+    # Instructors are further limited to their own courses by the view
+    'courses.get_students': role('instructor', 'admin'),
+    'courses.update_students': role('instructor', 'admin'),
+
+    'admin.cache_stats': role('admin'),
+    'admin.metrics': role('admin'),
+    'admin.profiling_token': role('admin'),
+    'admin.profiling_window': role('admin'),
+
+    'static': PUBLIC,
+}
+
+
+def _authenticate():
+    """Verify the bearer token, then rate-limit its sub before any lookup."""
+    authenticate_request()
+    limiter = current_app.rate_limiter
+    if limiter is not None:
+        limiter.limit_sub(request.jwt_payload)
+
+
+def _resolve_caller():
+    """Get the authenticated caller, rejecting tokens with no user."""
+    caller = get_caller()
+    if caller is None:
+        raise ForbiddenError('User not found')
+    request.caller = caller
+    return caller
+
+
+def compile_policy(policy):
+    """Build the check function for a policy.
+
+    Args:
+        policy: Policy
+
+    Returns:
+        Function taking the view's URL parameters and raising
+        UnauthorizedError, ForbiddenError or TooManyRequestsError to deny
+        access, or None if the policy allows everyone
+    """
+    if not policy.authenticated:
+        return None
+
+    roles = policy.roles
+    param = policy.owner_param
+
+    if not roles and param is None:
+        def check(view_args):
+            _authenticate()
+
+    elif param is None:
+        def check(view_args):
+            _authenticate()
+            if _resolve_caller().role not in roles:
+                raise ForbiddenError('Insufficient permissions')
+
+    else:
+        def check(view_args):
+            _authenticate()
+            caller = _resolve_caller()
+            if caller.id != view_args.get(param) and caller.role not in roles:
+                raise ForbiddenError('Access denied')
+
+    return check
+
+
+def compile_policies(app, policies=None):
+    """Compile the check of every endpoint of an app.
+
+    Args:
+        app: Flask application instance, with its blueprints registered
+        policies: Endpoint -> Policy (defaults to ``POLICIES``)
+
+    Returns:
+        dict: Endpoint -> check function, for endpoints that need one
+
+    Raises:
+        RuntimeError: If an endpoint has no policy
+    """
+    policies = POLICIES if policies is None else policies
+    missing = sorted(set(app.view_functions) - set(policies))
+    if missing:
+        raise RuntimeError(f'No authorization policy for endpoints: {", ".join(missing)}')
+
+    checks = {}
+    for endpoint in app.view_functions:
+        check = compile_policy(policies[endpoint])
+        if check is not None:
+            checks[endpoint] = check
+    return checks
+
+
+def register_policies(app):
+    """Enforce the endpoint policies before every request.
+
+    Sets ``app.policy_checks``. Must run after the blueprints are registered.
+
+    Args:
+        app: Flask application instance
+    """
+    checks = app.policy_checks = compile_policies(app)
+
+    @app.before_request
+    def authorize():
+        # CORS preflights never reach a view
+        if request.method == 'OPTIONS':
+            return
+        check = checks.get(request.endpoint)
+        if check is not None:
+            check(request.view_args)
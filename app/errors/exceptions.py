@@ -28,4 +28,17 @@ class NotFoundError(TarpaulinException):
 
 class ConflictError(TarpaulinException):
     """Raised when there's a conflict (409)."""
-    pass
\ No newline at end of file
+    pass
+
+
+class TooManyRequestsError(TarpaulinException):
+    """Raised when a client is over a rate limit (429)."""
+    
+    def __init__(self, retry_after):
+        """Initialize the error.
+        
+        Args:
+            retry_after: Seconds until the client may retry
+        """
+        super().__init__('Too many requests')
+        self.retry_after = retry_after
\ No newline at end of file
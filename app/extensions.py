@@ -1,11 +1,125 @@
 """Initialize Flask extensions."""
+import os
+import threading
+from urllib.parse import urlparse
+
+from flask import current_app
 from google.cloud import datastore
 from google.cloud import storage
 
+from app.auth.jwks import JWKSCache
+from app.utils.cache import LRUCache
+from app.utils.collection_cache import CollectionCache, LocalCacheBackend
+from app.utils.metrics import instrument_datastore
+from app.utils.storage import create_storage
+
 
-# Global instances
-datastore_client = None
-storage_client = None
+class ClientRegistry:
+    """Lazily created, process-local Google Cloud clients.
+    
+    Clients are built on first use and rebuilt if the process ID changes,
+    so an app created before gunicorn forks (``--preload``) never shares
+    gRPC channels or sockets across workers. Every model and service gets
+    its clients from here, so each worker holds one Datastore and one
+    Storage client.
+    """
+    
+    def __init__(self, config):
+        """Initialize the registry.
+        
+        Args:
+            config: Flask config holding the client settings
+        """
+        self.config = config
+        self._pid = None
+        self._datastore = None
+        self._storage = None
+        self._lock = threading.Lock()
+    
+    def _check_pid(self):
+        """Drop clients inherited from a parent process."""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._datastore = None
+                    self._storage = None
+                    self._pid = os.getpid()
+    
+    @property
+    def datastore(self):
+        """The Datastore client for this process."""
+        self._check_pid()
+        if self._datastore is None:
+            with self._lock:
+                if self._datastore is None:
+                    self._datastore = self._create_datastore_client()
+        return self._datastore
+    
+    @property
+    def storage(self):
+        """The Cloud Storage client for this process."""
+        self._check_pid()
+        if self._storage is None:
+            with self._lock:
+                if self._storage is None:
+                    self._storage = storage.Client(project=self.config['PROJECT_ID'])
+        return self._storage
+    
+    def _create_datastore_client(self):
+        """Build the Datastore client from the app config."""
+        emulator_host = self.config.get('DATASTORE_EMULATOR_HOST')
+        if emulator_host:
+            # The client library only reads the emulator host from the environment
+            os.environ.setdefault('DATASTORE_EMULATOR_HOST', emulator_host)
+        
+        client = datastore.Client(
+            project=self.config['PROJECT_ID'],
+            namespace=self.config.get('DATASTORE_NAMESPACE'),
+            client_options=self.config.get('DATASTORE_CLIENT_OPTIONS')
+        )
+        
+        channel_options = self.config.get('DATASTORE_CHANNEL_OPTIONS')
+        if channel_options:
+            client._datastore_api_internal = _make_datastore_api(client, channel_options)
+        
+        if self.config.get('METRICS_ENABLED'):
+            instrument_datastore(client)
+        return client
+
+
+def _make_datastore_api(client, channel_options):
+    """Build the gRPC Datastore API for a client with custom channel options.
+    
+    Mirrors ``google.cloud.datastore._gapic.make_datastore_api`` (pinned
+    google-cloud-datastore 2.19), which has no hook for channel options.
+    """
+    from grpc import insecure_channel
+    from google.cloud._helpers import make_secure_channel
+    from google.cloud._http import DEFAULT_USER_AGENT
+    from google.cloud.datastore_v1.services.datastore import client as datastore_client
+    from google.cloud.datastore_v1.services.datastore.transports import grpc
+    
+    options = tuple(channel_options.items())
+    parse_result = urlparse(client._base_url)
+    host = parse_result.netloc
+    if parse_result.scheme == 'https':
+        channel = make_secure_channel(client._credentials, DEFAULT_USER_AGENT, host,
+                                      extra_options=options)
+    else:
+        channel = insecure_channel(host, options=options)
+    
+    transport = grpc.DatastoreGrpcTransport(channel=channel)
+    return datastore_client.DatastoreClient(transport=transport,
+                                            client_info=client._client_info)
+
+
+def get_datastore_client():
+    """Get the current app's Datastore client.
+    
+    Returns:
+        datastore.Client
+    """
+    return current_app.clients.datastore
 
 
 def init_extensions(app):
@@ -14,19 +128,58 @@ def init_extensions(app):
     Args:
         app: Flask application instance
     """
-    global datastore_client, storage_client
+    # Google Cloud clients are created lazily in each worker process
+    app.clients = ClientRegistry(app.config)
+    app.avatar_storage = create_storage(app)
+    
+    # Initialize the JWKS key store shared by all requests in this process
+    jwks_url = (app.config.get('AUTH0_JWKS_URL') or
+                f'https://{app.config["AUTH0_DOMAIN"]}/.well-known/jwks.json')
+    app.jwks_cache = JWKSCache(
+        jwks_url,
+        ttl=app.config['JWKS_CACHE_TTL'],
+        min_refetch_interval=app.config['JWKS_MIN_REFETCH_INTERVAL'],
+        timeout=app.config['JWKS_FETCH_TIMEOUT'],
+        algorithm=app.config['ALGORITHMS'][0]
+    )
     
-    # Initialize Google Cloud Datastore client
-    if app.config.get('DATASTORE_EMULATOR_HOST'):
-        # Use emulator in development
-        datastore_client = datastore.Client(project=app.config['PROJECT_ID'])
+    # Initialize the cache of verified JWT payloads
+    if app.config['TOKEN_CACHE_ENABLED']:
+        app.token_cache = LRUCache(max_size=app.config['TOKEN_CACHE_MAX_SIZE'])
     else:
-        # Use production Datastore
-        datastore_client = datastore.Client()
+        app.token_cache = None
     
-    # Initialize Google Cloud Storage client
-    storage_client = storage.Client(project=app.config['PROJECT_ID'])
+    # Initialize the process-wide sub -> User cache
+    if app.config['IDENTITY_CACHE_ENABLED']:
+        app.identity_cache = LRUCache(
+            max_size=app.config['IDENTITY_CACHE_MAX_SIZE'],
+            ttl=app.config['IDENTITY_CACHE_TTL']
+        )
+    else:
+        app.identity_cache = None
+    
+    # Initialize the LRU of small avatar images, bounded by total bytes
+    if app.config['AVATAR_CACHE_ENABLED']:
+        app.avatar_cache = LRUCache(
+            max_size=app.config['AVATAR_CACHE_MAX_ENTRIES'],
+            max_weight=app.config['AVATAR_CACHE_MAX_BYTES'],
+            weigher=lambda item: len(item[1])
+        )
+    else:
+        app.avatar_cache = None
     
-    # Store clients in app context for easy access
-    app.datastore_client = datastore_client
-    app.storage_client = storage_client
\ No newline at end of file
+    # Initialize the optional cache of issued login tokens
+    if app.config['LOGIN_CACHE_ENABLED']:
+        app.login_cache = LRUCache(max_size=app.config['LOGIN_CACHE_MAX_SIZE'],
+                                   ttl=app.config['LOGIN_CACHE_TTL'])
+    else:
+        app.login_cache = None
+    
+    # Initialize the read-through cache of collection listings
+    if app.config['COLLECTION_CACHE_ENABLED']:
+        app.collection_cache = CollectionCache(
+            LocalCacheBackend(app.config['COLLECTION_CACHE_MAX_SIZE']),
+            ttl=app.config['COLLECTION_CACHE_TTL']
+        )
+    else:
+        app.collection_cache = None
@@ -1,24 +1,169 @@
 """Base model class for Datastore entities."""
-from flask import current_app
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, g, has_request_context
 from google.cloud import datastore
 
+from app.models.loader import Loaded, RequestLoader
+from app.models.versions import bump_version
+
+# Datastore accepts at most 500 keys/entities per batch call
+BATCH_SIZE = 500
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def chunks(items, size=BATCH_SIZE):
+    """Split a list into consecutive chunks of at most ``size`` items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _map_chunks(fn, items, parallel=False):
+    """Apply ``fn`` to each batch-sized chunk of ``items``.
+    
+    Args:
+        fn: Datastore batch call taking a list (get_multi, put_multi, ...)
+        items: Keys or entities
+        parallel: Fan the chunks out on the shared batch thread pool
+        
+    Returns:
+        list: Results of ``fn`` per chunk, in chunk order
+    """
+    batches = chunks(items)
+    if not parallel or len(batches) < 2:
+        return [fn(batch) for batch in batches]
+    # Run each chunk in a copy of the caller's context, so its RPCs are
+    # attributed to the current request's metrics
+    context = contextvars.copy_context()
+    return list(_get_executor().map(lambda batch: context.copy().run(fn, batch), batches))
+
+
+def get_request_loader():
+    """Get the current request's batching loader, creating it lazily.
+    
+    Returns:
+        RequestLoader, or None outside a request or when disabled
+    """
+    if not has_request_context() or not current_app.config['REQUEST_LOADER_ENABLED']:
+        return None
+    
+    loader = g.get('request_loader')
+    if loader is None:
+        loader = g.request_loader = RequestLoader(current_app.clients.datastore,
+                                                  _map_chunks)
+    return loader
+
+
+def _get_executor():
+    """Get the thread pool used for parallel batch calls, creating it lazily.
+    
+    A forked worker gets its own pool: the parent's threads don't survive fork.
+    """
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                executor = ThreadPoolExecutor(
+                    max_workers=current_app.config['DATASTORE_BATCH_WORKERS'],
+                    thread_name_prefix='datastore-batch'
+                )
+                _executor, _executor_pid = executor, os.getpid()
+    return _executor
+
 
 class BaseModel:
-    """Base class for all Datastore models."""
+    """Base class for all Datastore models.
+    
+    Subclasses either keep arbitrary attributes in ``__dict__`` or declare
+    their persisted properties in ``FIELDS`` together with
+    ``__slots__ = ('id',) + FIELDS (+ private slots)``. Declared-field models
+    use no per-instance ``__dict__`` and reject undeclared attributes.
+    Properties an entity has beyond ``FIELDS`` are kept in ``_extra`` and
+    written back on save, so they survive a load and save unchanged.
+    """
+    
+    # Undeclared properties of a loaded entity (None if it had none)
+    __slots__ = ('_extra',)
     
     # Override in subclasses
     KIND = None
     
+    # Persisted properties of declared-field models (None: dynamic attributes)
+    FIELDS = None
+    
+    # Set in subclasses that maintain lookup index kinds (see _index_mutations)
+    INDEXED = False
+    
+    # Set in subclasses whose listings are served with collection ETags
+    VERSIONED = False
+    
+    def __init_subclass__(cls, **kwargs):
+        """Record the declared fields of declared-field subclasses."""
+        super().__init_subclass__(**kwargs)
+        
+        if cls.FIELDS is not None:
+            cls._field_set = frozenset(cls.FIELDS)
+    
+    @classmethod
+    def serializer(cls, fields=None):
+        """Get a function turning an entity straight into a JSON dict.
+        
+        Listing endpoints use this to serialize query results without
+        building model instances. The dict holds ``id`` plus ``fields``;
+        properties missing from the entity are None.
+        
+        Args:
+            fields: Property names to include (defaults to ``FIELDS``)
+            
+        Returns:
+            function: ``serialize(entity) -> dict``
+        """
+        fields = tuple(cls.FIELDS if fields is None else fields)
+        
+        def serialize(entity):
+            get = entity.get
+            data = {'id': entity.key.flat_path[-1]}
+            for field in fields:
+                data[field] = get(field)
+            return data
+        
+        return serialize
+    
     def __init__(self, **kwargs):
         """Initialize model with given attributes."""
+        self._extra = None
         self.id = kwargs.get('id')
         for key, value in kwargs.items():
             setattr(self, key, value)
     
     @classmethod
     def get_client(cls):
-        """Get Datastore client from app context."""
-        return current_app.datastore_client
+        """Get the shared Datastore client from the app's client registry."""
+        return current_app.clients.datastore
+    
+    @classmethod
+    def load(cls, entity_id):
+        """Queue a lookup by ID in the current request's loader.
+        
+        Lookups queued together are fetched in one batched call when the
+        first of their results is needed. Outside a request (or with the
+        loader disabled) the entity is fetched immediately.
+        
+        Args:
+            entity_id: The entity ID
+            
+        Returns:
+            Deferred: ``get()`` returns the model instance or None
+        """
+        loader = get_request_loader()
+        if loader is not None:
+            return loader.load(cls, entity_id)
+        return Loaded(cls.get_by_id(entity_id))
     
     @classmethod
     def get_by_id(cls, entity_id):
@@ -30,6 +175,10 @@ class BaseModel:
         Returns:
             Model instance or None
         """
+        loader = get_request_loader()
+        if loader is not None:
+            return loader.get(cls, entity_id)
+        
         client = cls.get_client()
         key = client.key(cls.KIND, int(entity_id))
         entity = client.get(key)
@@ -38,6 +187,109 @@ class BaseModel:
             return cls.from_entity(entity)
         return None
     
+    @classmethod
+    def get_many(cls, entity_ids, parallel=False):
+        """Get entities by ID with batched lookups.
+        
+        Args:
+            entity_ids: Iterable of entity IDs
+            parallel: Issue the 500-key lookups concurrently
+            
+        Returns:
+            list: Model instances in input order, None for missing IDs
+        """
+        loader = get_request_loader()
+        if loader is not None:
+            return loader.get_many(cls, entity_ids, parallel)
+        
+        entity_ids = [int(entity_id) for entity_id in entity_ids]
+        client = cls.get_client()
+        keys = [client.key(cls.KIND, entity_id) for entity_id in set(entity_ids)]
+        
+        found = {}
+        for entities in _map_chunks(client.get_multi, keys, parallel):
+            for entity in entities:
+                found[entity.key.id] = entity
+        
+        return [
+            cls.from_entity(found[entity_id]) if entity_id in found else None
+            for entity_id in entity_ids
+        ]
+    
+    @classmethod
+    def save_all(cls, models, parallel=False):
+        """Save models to Datastore with batched writes.
+        
+        Unlike ``save``, index entities are not written transactionally with
+        their models; each 500-entity chunk is committed separately.
+        
+        Args:
+            models: List of model instances
+            parallel: Issue the 500-entity writes concurrently
+            
+        Returns:
+            list: The saved models
+        """
+        if not models:
+            return models
+        
+        client = cls.get_client()
+        
+        # Reserve IDs in one call per kind for new models that need them
+        unassigned = {}
+        for model in models:
+            if not model.id and model.INDEXED:
+                unassigned.setdefault(model.KIND, []).append(model)
+        for kind, pending in unassigned.items():
+            keys = client.allocate_ids(client.key(kind), len(pending))
+            for model, key in zip(pending, keys):
+                model.id = key.id
+        
+        entities = [model._to_entity(client) for model in models]
+        puts, deletes = [], []
+        for model in models:
+            if model.INDEXED:
+                index_puts, index_deletes = model._index_mutations(client)
+                puts.extend(index_puts)
+                deletes.extend(index_deletes)
+        
+        _map_chunks(client.put_multi, entities + puts, parallel)
+        if deletes:
+            _map_chunks(client.delete_multi, deletes, parallel)
+        
+        for model, entity in zip(models, entities):
+            model.id = entity.key.id
+            model._after_write()
+        
+        cls._after_batch_write(models)
+        return models
+    
+    @classmethod
+    def delete_all(cls, models, parallel=False):
+        """Delete models (and their lookup index entities) with batched writes.
+        
+        Args:
+            models: List of model instances
+            parallel: Issue the 500-key deletes concurrently
+        """
+        models = [model for model in models if model.id]
+        if not models:
+            return
+        
+        client = cls.get_client()
+        keys = []
+        for model in models:
+            keys.append(client.key(model.KIND, model.id))
+            if model.INDEXED:
+                keys.extend(model._index_mutations(client, deleting=True)[1])
+        
+        _map_chunks(client.delete_multi, keys, parallel)
+        
+        for model in models:
+            model._after_write()
+        
+        cls._after_batch_write(models)
+    
     @classmethod
     def from_entity(cls, entity):
         """Create model instance from Datastore entity.
@@ -48,6 +300,21 @@ class BaseModel:
         Returns:
             Model instance
         """
+        if cls.FIELDS is not None:
+            model = object.__new__(cls)
+            # Key.id deep-copies the key path on every access; a fetched
+            # entity's key is complete, so its ID is the last path element.
+            model.id = entity.key.flat_path[-1]
+            get = entity.get
+            for field in cls.FIELDS:
+                setattr(model, field, get(field))
+            
+            model._extra = None
+            if not entity.keys() <= cls._field_set:
+                model._extra = {name: value for name, value in entity.items()
+                                if name not in cls._field_set}
+            return model
+        
         data = dict(entity)
         data['id'] = entity.key.id
         return cls(**data)
@@ -58,6 +325,14 @@ class BaseModel:
         Returns:
             dict: Model data
         """
+        if self.FIELDS is not None:
+            data = {}
+            for name in ('id',) + self.FIELDS:
+                value = getattr(self, name)
+                if value is not None:
+                    data[name] = value
+            return data
+        
         data = {}
         for key, value in self.__dict__.items():
             if not key.startswith('_') and value is not None:
@@ -65,9 +340,43 @@ class BaseModel:
         return data
     
     def save(self):
-        """Save model to Datastore."""
+        """Save model to Datastore.
+        
+        Lookup index entities returned by ``_index_mutations`` are written
+        in the same transaction as the entity itself.
+        """
         client = self.get_client()
         
+        if not self.id and self.INDEXED:
+            # Index entities reference the ID, so reserve it up front
+            self.id = client.allocate_ids(client.key(self.KIND), 1)[0].id
+        
+        entity = self._to_entity(client)
+        
+        if self.INDEXED:
+            puts, deletes = self._index_mutations(client)
+            with client.transaction():
+                client.put_multi([entity] + puts)
+                if deletes:
+                    client.delete_multi(deletes)
+        else:
+            client.put(entity)
+        
+        self.id = entity.key.id
+        self._after_write()
+        self._after_batch_write([self])
+        
+        return self
+    
+    def _to_entity(self, client):
+        """Build the Datastore entity for this model.
+        
+        Args:
+            client: Datastore client
+            
+        Returns:
+            datastore.Entity
+        """
         if self.id:
             # Update existing entity
             key = client.key(self.KIND, self.id)
@@ -77,21 +386,65 @@ class BaseModel:
         
         entity = datastore.Entity(key=key)
         
-        # Copy attributes to entity
-        for key, value in self.to_dict().items():
-            if key != 'id':  # Don't store id as property
-                entity[key] = value
+        # Keep the properties this model doesn't declare
+        if self.FIELDS is not None and self._extra:
+            entity.update(self._extra)
         
-        client.put(entity)
-        self.id = entity.key.id
+        # Copy attributes to entity. Subclasses may narrow to_dict for API
+        # responses, so persist every public attribute via the base version.
+        for name, value in BaseModel.to_dict(self).items():
+            if name != 'id':  # Don't store id as property
+                entity[name] = value
         
-        return self
+        return entity
     
     def delete(self):
-        """Delete model from Datastore."""
+        """Delete model (and its lookup index entities) from Datastore."""
         if not self.id:
             return
         
         client = self.get_client()
         key = client.key(self.KIND, self.id)
-        client.delete(key)
\ No newline at end of file
+        
+        if self.INDEXED:
+            _, deletes = self._index_mutations(client, deleting=True)
+            with client.transaction():
+                client.delete_multi([key] + deletes)
+        else:
+            client.delete(key)
+        
+        self._after_write()
+        self._after_batch_write([self])
+    
+    @staticmethod
+    def _after_batch_write(models):
+        """Forget written entities in the request loader and bump versions."""
+        loader = get_request_loader()
+        if loader is not None:
+            for model in models:
+                loader.forget(type(model), model.id)
+        
+        for kind in {model.KIND for model in models if model.VERSIONED}:
+            bump_version(kind)
+    
+    def _index_mutations(self, client, deleting=False):
+        """Get the lookup index writes that accompany a save or delete.
+        
+        Only called when ``INDEXED`` is set; override in subclasses that
+        maintain lookup index kinds.
+        
+        Args:
+            client: Datastore client
+            deleting: Whether the entity itself is being deleted
+            
+        Returns:
+            tuple: (index entities to put, index keys to delete)
+        """
+        return [], []
+    
+    def _after_write(self):
+        """Hook run after the entity is saved or deleted.
+        
+        Override in subclasses to invalidate caches derived from the entity.
+        """
+        pass
\ No newline at end of file
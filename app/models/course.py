@@ -0,0 +1,53 @@
+"""Course model for Datastore operations."""
+from app.models.base import BaseModel
+
+
+class Course(BaseModel):
+    """Course model representing Tarpaulin courses."""
+    
+    KIND = 'courses'
+    
+    # Properties stored on every course, in response order
+    FIELDS = ('subject', 'number', 'title', 'term', 'instructor_id')
+    __slots__ = ('id',) + FIELDS
+    
+    # Listings are served with collection ETags
+    VERSIONED = True
+    
+    def __init__(self, **kwargs):
+        """Initialize course with given attributes."""
+        super().__init__(**kwargs)
+        self.subject = kwargs.get('subject')
+        self.number = kwargs.get('number')
+        self.title = kwargs.get('title')
+        self.term = kwargs.get('term')
+        self.instructor_id = kwargs.get('instructor_id')
+    
+    def get_self_url(self, base_url):
+        """Get the URL of this course.
+        
+        Args:
+            base_url: Base URL of the API
+            
+        Returns:
+            str: Course URL
+        """
+        return f"{base_url}/courses/{self.id}"
+    
+    def to_dict(self, base_url=None):
+        """Convert course to dictionary.
+        
+        Args:
+            base_url: Base URL for the self link (omitted if None)
+            
+        Returns:
+            dict: Course data
+        """
+        data = {'id': self.id}
+        for field in self.FIELDS:
+            data[field] = getattr(self, field)
+        
+        if base_url:
+            data['self'] = self.get_self_url(base_url)
+        
+        return data
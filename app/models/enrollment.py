@@ -0,0 +1,117 @@
+"""Enrollment model for Datastore operations."""
+from google.cloud import datastore
+
+from app.models.base import BaseModel, chunks
+
+
+class Enrollment(BaseModel):
+    """A student's enrollment in a course.
+    
+    Enrollments are stored as child entities of their course, keyed
+    ``courses/<course_id>/enrollments/<student_id>`` with a ``student_id``
+    property. Both directions are answered from keys alone: a course's
+    roster is a keys-only ancestor query (strongly consistent) and a
+    student's courses are a keys-only query on ``student_id``, with the
+    course ID read from each key's parent.
+    
+    Enrollments are written in bulk through ``apply_roster_diff`` rather
+    than with ``save``.
+    """
+    
+    KIND = 'enrollments'
+    COURSE_KIND = 'courses'
+    
+    @classmethod
+    def key_for(cls, client, course_id, student_id):
+        """Build the key of one enrollment.
+        
+        Args:
+            client: Datastore client
+            course_id: The course ID
+            student_id: The student's user ID
+            
+        Returns:
+            datastore.Key
+        """
+        return client.key(cls.COURSE_KIND, int(course_id), cls.KIND, int(student_id))
+    
+    @classmethod
+    def student_ids_for_course(cls, course_id):
+        """Get the IDs of the students enrolled in a course.
+        
+        Args:
+            course_id: The course ID
+            
+        Returns:
+            list: Student user IDs
+        """
+        client = cls.get_client()
+        query = client.query(kind=cls.KIND,
+                             ancestor=client.key(cls.COURSE_KIND, int(course_id)))
+        query.keys_only()
+        return [entity.key.id for entity in query.fetch()]
+    
+    @classmethod
+    def course_ids_for_student(cls, student_id):
+        """Get the IDs of the courses a student is enrolled in.
+        
+        Args:
+            student_id: The student's user ID
+            
+        Returns:
+            list: Course IDs
+        """
+        client = cls.get_client()
+        query = client.query(kind=cls.KIND)
+        query.add_filter('student_id', '=', int(student_id))
+        query.keys_only()
+        return [entity.key.parent.id for entity in query.fetch()]
+    
+    @classmethod
+    def apply_roster_diff(cls, course_id, add=(), remove=()):
+        """Enroll and unenroll students in one batched transaction.
+        
+        Enrollment keys are deterministic, so adding an enrolled student or
+        removing an unenrolled one is a no-op and no reads are needed.
+        Diffs larger than the 500-mutation commit limit are applied as
+        consecutive transactions.
+        
+        Args:
+            course_id: The course ID
+            add: Student IDs to enroll
+            remove: Student IDs to unenroll
+        """
+        client = cls.get_client()
+        
+        mutations = []
+        for student_id in add:
+            entity = datastore.Entity(key=cls.key_for(client, course_id, student_id))
+            entity['student_id'] = int(student_id)
+            mutations.append(entity)
+        for student_id in remove:
+            mutations.append(cls.key_for(client, course_id, student_id))
+        
+        for chunk in chunks(mutations):
+            with client.transaction():
+                puts = [m for m in chunk if isinstance(m, datastore.Entity)]
+                deletes = [m for m in chunk if not isinstance(m, datastore.Entity)]
+                if puts:
+                    client.put_multi(puts)
+                if deletes:
+                    client.delete_multi(deletes)
+    
+    @classmethod
+    def delete_for_course(cls, course_id):
+        """Delete every enrollment in a course.
+        
+        Args:
+            course_id: The course ID
+        """
+        client = cls.get_client()
+        query = client.query(kind=cls.KIND,
+                             ancestor=client.key(cls.COURSE_KIND, int(course_id)))
+        query.keys_only()
+        keys = [entity.key for entity in query.fetch()]
+        
+        for chunk in chunks(keys):
+            client.delete_multi(chunk)
@@ -0,0 +1,146 @@
+"""Request-scoped batching loader for entity lookups.
+
+Code that needs several independent entities queues them with
+``BaseModel.load`` (e.g. ``update_course`` loads the course and the new
+instructor) instead of calling ``client.get`` per ID. ``load`` only queues
+the key and returns a ``Deferred``; the first time any queued result is
+needed, every pending key is fetched in one ``get_multi``. Identical keys
+are fetched once, and results, including misses, are memoized for the
+rest of the request. A failed lookup memoizes nothing, so its keys stay
+queued.
+
+``BaseModel.get_by_id`` and ``get_many`` go through the current request's
+loader too, so they share its memo and flush anything already queued.
+Saves and deletes drop the written entities from it.
+"""
+
+
+class Deferred:
+    """A queued lookup, resolved on first ``get``."""
+    
+    __slots__ = ('_loader', '_path')
+    
+    def __init__(self, loader, path):
+        self._loader = loader
+        self._path = path
+    
+    def get(self):
+        """Get the model instance, dispatching pending lookups if needed.
+        
+        Returns:
+            Model instance or None if the entity doesn't exist
+        """
+        return self._loader.resolve(self._path)
+
+
+class Loaded:
+    """An already resolved lookup, with the interface of ``Deferred``."""
+    
+    __slots__ = ('_value',)
+    
+    def __init__(self, value):
+        self._value = value
+    
+    def get(self):
+        """Get the model instance (None if the entity doesn't exist)."""
+        return self._value
+
+
+class RequestLoader:
+    """Collects, deduplicates and memoizes key lookups for one request."""
+    
+    def __init__(self, client, map_chunks):
+        """Initialize the loader.
+        
+        Args:
+            client: Datastore client
+            map_chunks: Function applying a batch call to 500-key chunks
+        """
+        self.client = client
+        self.map_chunks = map_chunks
+        self.rpcs = 0
+        
+        # flat_path -> model instance or None
+        self._results = {}
+        # flat_path -> (model class, key) waiting for the next dispatch
+        self._pending = {}
+    
+    def load(self, model_cls, entity_id):
+        """Queue a lookup by ID.
+        
+        Args:
+            model_cls: BaseModel subclass of the entity
+            entity_id: The entity ID
+            
+        Returns:
+            Deferred
+        """
+        key = self.client.key(model_cls.KIND, int(entity_id))
+        path = key.flat_path
+        if path not in self._results and path not in self._pending:
+            self._pending[path] = (model_cls, key)
+        return Deferred(self, path)
+    
+    def get(self, model_cls, entity_id):
+        """Look up one entity, together with anything already queued.
+        
+        Returns:
+            Model instance or None
+        """
+        return self.load(model_cls, entity_id).get()
+    
+    def get_many(self, model_cls, entity_ids, parallel=False):
+        """Look up entities by ID in as few batched calls as possible.
+        
+        Args:
+            model_cls: BaseModel subclass of the entities
+            entity_ids: Iterable of entity IDs
+            parallel: Issue the 500-key lookups concurrently
+            
+        Returns:
+            list: Model instances in input order, None for missing IDs
+        """
+        deferreds = [self.load(model_cls, entity_id) for entity_id in entity_ids]
+        self.dispatch(parallel)
+        return [deferred.get() for deferred in deferreds]
+    
+    def dispatch(self, parallel=False):
+        """Fetch every pending key in one batched lookup.
+        
+        Args:
+            parallel: Issue the 500-key lookups concurrently
+        """
+        if not self._pending:
+            return
+        
+        pending = self._pending
+        keys = [key for _, key in pending.values()]
+        found = {}
+        for entities in self.map_chunks(self.client.get_multi, keys, parallel):
+            self.rpcs += 1
+            for entity in entities:
+                found[entity.key.flat_path] = entity
+        
+        # Only record results once every lookup succeeded, so a failed RPC
+        # isn't remembered as missing entities
+        self._pending = {}
+        for path, (model_cls, _) in pending.items():
+            entity = found.get(path)
+            self._results[path] = None if entity is None else model_cls.from_entity(entity)
+    
+    def resolve(self, path):
+        """Get a memoized result, dispatching pending lookups first if needed."""
+        if path not in self._results:
+            self.dispatch()
+        return self._results[path]
+    
+    def forget(self, model_cls, entity_id):
+        """Drop a memoized result after the entity was written.
+        
+        Args:
+            model_cls: BaseModel subclass of the entity
+            entity_id: The entity ID
+        """
+        path = self.client.key(model_cls.KIND, int(entity_id)).flat_path
+        self._results.pop(path, None)
+        self._pending.pop(path, None)
@@ -1,4 +1,7 @@
 """User model for Datastore operations."""
+from flask import current_app, g
+from google.cloud import datastore
+
 from app.models.base import BaseModel
 
 
@@ -7,17 +10,49 @@ class User(BaseModel):
     
     KIND = 'users'
     
+    FIELDS = ('sub', 'role', 'avatar_filename', 'avatar_generation')
+    __slots__ = ('id',) + FIELDS + ('_loaded_sub',)
+    
+    # Lookup index kind: key name is the sub, ``user_id`` holds the user ID
+    SUB_INDEX_KIND = 'user_sub_index'
+    INDEXED = True
+    
+    # Listings are served with collection ETags
+    VERSIONED = True
+    
     def __init__(self, **kwargs):
         """Initialize user with given attributes."""
         super().__init__(**kwargs)
         self.sub = kwargs.get('sub')
         self.role = kwargs.get('role')
         self.avatar_filename = kwargs.get('avatar_filename')
+        self.avatar_generation = kwargs.get('avatar_generation')
+        
+        # Sub as loaded from Datastore, so writes can invalidate both values
+        self._loaded_sub = self.sub
+    
+    @classmethod
+    def from_entity(cls, entity):
+        """Create user instance from Datastore entity.
+        
+        Args:
+            entity: Datastore entity
+            
+        Returns:
+            User instance
+        """
+        user = super().from_entity(entity)
+        user._loaded_sub = user.sub
+        return user
     
     @classmethod
     def get_by_sub(cls, sub):
         """Get user by Auth0 sub claim.
         
+        Resolves the sub through the ``user_sub_index`` kind with strongly
+        consistent key lookups. Subs missing from the index fall back to a
+        property query when ``USER_SUB_INDEX_QUERY_FALLBACK`` is enabled.
+        
         Args:
             sub: Auth0 subject identifier
             
@@ -25,6 +60,16 @@ class User(BaseModel):
             User instance or None
         """
         client = cls.get_client()
+        index = client.get(client.key(cls.SUB_INDEX_KIND, sub))
+        
+        if index is not None:
+            user = cls.get_by_id(index['user_id'])
+            if user is not None and user.sub == sub:
+                return user
+        
+        if not current_app.config['USER_SUB_INDEX_QUERY_FALLBACK']:
+            return None
+        
         query = client.query(kind=cls.KIND)
         query.add_filter('sub', '=', sub)
         
@@ -33,6 +78,22 @@ class User(BaseModel):
             return cls.from_entity(results[0])
         return None
     
+    @classmethod
+    def index_entity(cls, client, sub, user_id):
+        """Build the ``user_sub_index`` entity mapping a sub to a user ID.
+        
+        Args:
+            client: Datastore client
+            sub: Auth0 subject identifier
+            user_id: The user's entity ID
+            
+        Returns:
+            datastore.Entity
+        """
+        entity = datastore.Entity(key=client.key(cls.SUB_INDEX_KIND, sub))
+        entity['user_id'] = user_id
+        return entity
+    
     @classmethod
     def get_all(cls):
         """Get all users.
@@ -49,6 +110,38 @@ class User(BaseModel):
         
         return users
     
+    def _index_mutations(self, client, deleting=False):
+        """Keep ``user_sub_index`` in sync with this user's sub."""
+        puts, deletes = [], []
+        
+        if self.sub and not deleting:
+            puts.append(self.index_entity(client, self.sub, self.id))
+        
+        stale_subs = {self._loaded_sub}
+        if deleting:
+            stale_subs.add(self.sub)
+        for sub in stale_subs:
+            if sub and (deleting or sub != self.sub):
+                deletes.append(client.key(self.SUB_INDEX_KIND, sub))
+        
+        return puts, deletes
+    
+    def _after_write(self):
+        """Evict this user from the identity caches."""
+        subs = {self.sub, self._loaded_sub}
+        
+        cache = current_app.identity_cache
+        if cache is not None:
+            for sub in subs:
+                cache.delete(sub)
+        
+        for name in ('current_user', 'caller'):
+            resolved = g.get(name)
+            if resolved is not None and resolved.sub in subs:
+                g.pop(name)
+        
+        self._loaded_sub = self.sub
+    
     def get_avatar_url(self, base_url):
         """Get avatar URL if user has avatar.
         
@@ -0,0 +1,64 @@
+"""Collection versions for conditional GETs on listings.
+
+Each versioned kind has one ``collection_versions`` entity, keyed by the
+kind, holding an opaque random ``version``. Every save or delete through
+the models replaces it with a blind put (no read, no transaction), after
+the data write. A listing read therefore costs one key lookup to
+validate, and a version read before the listing query can only be older
+than the data it tags, never newer. Versions are memoized for the rest of the
+request, so the ETag check and the collection cache share one lookup.
+"""
+import secrets
+
+from flask import current_app, g
+from google.cloud import datastore
+
+VERSION_KIND = 'collection_versions'
+
+# Version of a kind that has never been written through the models
+INITIAL_VERSION = '0'
+
+
+def version_entity(client, kind):
+    """Build a ``collection_versions`` entity with a fresh version.
+    
+    Args:
+        client: Datastore client
+        kind: The versioned kind
+        
+    Returns:
+        datastore.Entity
+    """
+    entity = datastore.Entity(key=client.key(VERSION_KIND, kind),
+                              exclude_from_indexes=('version',))
+    entity['version'] = secrets.token_hex(8)
+    return entity
+
+
+def get_version(kind):
+    """Get the current version of a kind.
+    
+    Args:
+        kind: The versioned kind
+        
+    Returns:
+        str: Opaque version
+    """
+    versions = g.setdefault('collection_versions', {})
+    if kind not in versions:
+        client = current_app.clients.datastore
+        entity = client.get(client.key(VERSION_KIND, kind))
+        versions[kind] = entity['version'] if entity else INITIAL_VERSION
+    return versions[kind]
+
+
+def bump_version(kind):
+    """Give a kind a new version after its entities changed.
+    
+    Args:
+        kind: The versioned kind
+    """
+    client = current_app.clients.datastore
+    entity = version_entity(client, kind)
+    client.put(entity)
+    g.setdefault('collection_versions', {})[kind] = entity['version']
@@ -0,0 +1,104 @@
+"""Administrative routes for operating the API."""
+from flask import Blueprint, current_app, jsonify, request
+
+from app.utils.profiling import PROFILE_HEADER
+from app.utils.responses import error_response
+
+# Create blueprint (access rules: app/auth/policy.py)
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+# App attributes with stats() counters, by the name they're reported under
+CACHES = {
+    'collections': 'collection_cache',
+    'identities': 'identity_cache',
+    'tokens': 'token_cache',
+    'avatars': 'avatar_cache',
+    'logins': 'login_cache',
+    'rate_limits': 'rate_limiter',
+}
+
+
+@admin_bp.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Report this worker's cache counters, including hit ratios.
+    
+    Disabled caches are omitted.
+    
+    Status Codes:
+        200: Success
+        401: Missing or invalid JWT
+        403: Caller is not an admin
+    """
+    stats = {}
+    for name, attr in CACHES.items():
+        cache = getattr(current_app, attr)
+        if cache is not None:
+            stats[name] = cache.stats()
+    return jsonify(stats), 200
+
+
+@admin_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Report this worker's latency histograms.
+    
+    Metrics are named ``<category>.<operation>``: ``datastore.lookup``,
+    ``storage.upload``, ``http.auth0_token``, ``auth.decode_jwt``, and
+    ``request.<endpoint>`` for whole requests. Empty when METRICS_ENABLED
+    is off.
+    
+    Status Codes:
+        200: Success
+        401: Missing or invalid JWT
+        403: Caller is not an admin
+    """
+    registry = current_app.metrics
+    return jsonify(registry.snapshot() if registry is not None else {}), 200
+
+
+@admin_bp.route('/profiling/token', methods=['POST'])
+def profiling_token():
+    """Issue a token that profiles any request sending it as ``X-Profile``.
+    
+    The token is valid for PROFILE_TOKEN_MAX_AGE seconds on every worker.
+    
+    Status Codes:
+        200: Success
+        401: Missing or invalid JWT
+        403: Caller is not an admin
+        404: Profiling is disabled
+    """
+    profiler = current_app.profiler
+    if profiler is None:
+        return error_response("Profiling is disabled", 404)
+    
+    return jsonify({
+        'header': PROFILE_HEADER,
+        'token': profiler.issue_token(),
+        'expires_in': profiler.token_max_age
+    }), 200
+
+
+@admin_bp.route('/profiling/window', methods=['POST'])
+def profiling_window():
+    """Profile every request handled by this worker for ``seconds``.
+    
+    Status Codes:
+        200: Success
+        400: ``seconds`` is not a positive number
+        401: Missing or invalid JWT
+        403: Caller is not an admin
+        404: Profiling is disabled
+    """
+    profiler = current_app.profiler
+    if profiler is None:
+        return error_response("Profiling is disabled", 404)
+    
+    data = request.get_json(silent=True) or {}
+    seconds = data.get('seconds')
+    if (not isinstance(seconds, (int, float)) or isinstance(seconds, bool) or
+            seconds <= 0):
+        return error_response("The request body is invalid", 400)
+    
+    seconds = min(seconds, current_app.config['PROFILE_WINDOW_MAX_SECONDS'])
+    profiler.open_window(seconds)
+    return jsonify({'seconds': seconds, 'directory': profiler.directory}), 200
@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 
 from app.auth.auth0_service import login_user
 from app.errors.exceptions import BadRequestError, UnauthorizedError
+from app.utils.responses import error_response
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__)
@@ -49,8 +50,8 @@ def login():
         return jsonify(result), 200
         
     except BadRequestError:
-        return jsonify({"Error": "The request body is invalid"}), 400
+        return error_response("The request body is invalid", 400)
     except UnauthorizedError:
-        return jsonify({"Error": "Unauthorized"}), 401
+        return error_response("Unauthorized", 401)
     except Exception:
-        return jsonify({"Error": "The request body is invalid"}), 400
+        return error_response("The request body is invalid", 400)
@@ -1,7 +1,125 @@
 """Avatar management routes."""
-from flask import Blueprint
+from flask import Blueprint, Response, current_app, jsonify, request
 
-# Create blueprint
+from app.auth.identity import get_caller, get_current_user
+from app.errors.exceptions import BadRequestError, ForbiddenError, NotFoundError
+from app.services.avatar_service import (
+    avatar_etag, get_avatar, remove_avatar, set_avatar
+)
+from app.utils.responses import error_response
+
+# Create blueprint (access rules: app/auth/policy.py)
 avatar_bp = Blueprint('avatar', __name__)
 
-# TODO: Implement avatar routes
\ No newline at end of file
+
+def _require_owner(user_id):
+    """Check that the caller is the user in the path.
+    
+    Args:
+        user_id: User ID from the URL
+        
+    Returns:
+        The caller (``get_caller``)
+        
+    Raises:
+        ForbiddenError: If the caller is someone else
+    """
+    caller = get_caller()
+    if not caller or caller.id != user_id:
+        raise ForbiddenError('Access denied')
+    return caller
+
+
+def _set_cache_headers(response, etag):
+    """Add the avatar's validator and caching policy to a response."""
+    if etag:
+        response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = current_app.config['AVATAR_MAX_AGE']
+    return response
+
+
+@avatar_bp.route('/users/<int:user_id>/avatar', methods=['POST'])
+def upload(user_id):
+    """Upload or replace the caller's avatar.
+    
+    The multipart ``file`` part is streamed to storage in fixed-size chunks.
+    
+    Status Codes:
+        200: Success
+        400: No ``file`` in the request
+        401: Missing or invalid JWT
+        403: Caller is not the user in the path
+    """
+    try:
+        if 'file' not in request.files:
+            raise BadRequestError('file is required')
+        
+        _require_owner(user_id)
+        
+        file = request.files['file']
+        user = set_avatar(user_id, file.stream, file.mimetype or 'image/png')
+        
+        return jsonify({
+            'avatar_url': user.get_avatar_url(request.host_url.rstrip('/'))
+        }), 200
+    
+    except BadRequestError:
+        return error_response("The request body is invalid", 400)
+    except ForbiddenError:
+        return error_response("You don't have permission on this resource", 403)
+
+
+@avatar_bp.route('/users/<int:user_id>/avatar', methods=['GET'])
+def download(user_id):
+    """Stream the caller's avatar back in chunks.
+    
+    Responses carry a strong ETag built from the user ID and the avatar's
+    storage generation. A matching If-None-Match is answered with 304
+    from the user record alone, without touching storage.
+    
+    Status Codes:
+        200: Success
+        304: Client's cached copy is current
+        401: Missing or invalid JWT
+        403: Caller is not the user in the path
+        404: User has no avatar
+    """
+    try:
+        # The endpoint policy already checked the caller owns the avatar
+        caller = get_current_user()
+        if not caller:
+            raise ForbiddenError('User not found')
+        
+        etag = avatar_etag(caller.id, caller.avatar_generation)
+        if caller.avatar_filename and etag and request.if_none_match.contains_weak(etag):
+            return _set_cache_headers(Response(status=304), etag)
+        
+        avatar = get_avatar(caller)
+        
+        response = Response(avatar.chunks, mimetype=avatar.content_type,
+                            direct_passthrough=True)
+        if avatar.size is not None:
+            response.content_length = avatar.size
+        return _set_cache_headers(response, avatar_etag(caller.id, avatar.generation))
+    
+    except NotFoundError:
+        return error_response("Not found", 404)
+
+
+@avatar_bp.route('/users/<int:user_id>/avatar', methods=['DELETE'])
+def delete(user_id):
+    """Delete the caller's avatar.
+    
+    Status Codes:
+        204: Deleted
+        401: Missing or invalid JWT
+        403: Caller is not the user in the path
+        404: User has no avatar
+    """
+    try:
+        remove_avatar(user_id)
+        return '', 204
+    
+    except NotFoundError:
+        return error_response("Not found", 404)
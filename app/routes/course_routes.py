@@ -1,7 +1,209 @@
 """Course management routes."""
-from flask import Blueprint
+from flask import Blueprint, jsonify, request
 
-# Create blueprint
+from app.errors.exceptions import (
+    BadRequestError, ConflictError, ForbiddenError, NotFoundError
+)
+from app.services.course_service import (
+    create_course, get_course, update_course, delete_course, list_courses
+)
+from app.models.course import Course
+from app.services.enrollment_service import get_roster, update_roster
+from app.utils.http_cache import collection_etag, not_modified, set_collection_etag
+from app.utils.pagination import get_page_args, next_link
+from app.utils.responses import error_response
+from app.utils.validators import validate_course_data, validate_enrollment_data
+
+# Create blueprint (access rules: app/auth/policy.py)
 courses_bp = Blueprint('courses', __name__)
 
-# TODO: Implement course routes
\ No newline at end of file
+
+def _base_url():
+    """Get the API base URL without a trailing slash."""
+    return request.host_url.rstrip('/')
+
+
+def _require_course_staff(course_id):
+    """Check that the caller is an admin or the course's instructor.
+    
+    Args:
+        course_id: The course ID
+        
+    Raises:
+        ForbiddenError: If the course doesn't exist or the caller can't manage it
+    """
+    try:
+        course = get_course(course_id)
+    except NotFoundError:
+        raise ForbiddenError('Course not found')
+    
+    caller = request.caller
+    if caller.role != 'admin' and course.instructor_id != caller.id:
+        raise ForbiddenError('Access denied')
+
+
+@courses_bp.route('/courses', methods=['POST'])
+def create():
+    """Create a course.
+    
+    Status Codes:
+        201: Created
+        400: Invalid request body or instructor_id
+        401: Missing or invalid JWT
+        403: Caller is not an admin
+    """
+    try:
+        fields = validate_course_data(request.get_json(silent=True))
+        course = create_course(fields)
+        return jsonify(course.to_dict(_base_url())), 201
+    
+    except BadRequestError:
+        return error_response("The request body is invalid", 400)
+
+
+@courses_bp.route('/courses', methods=['GET'])
+def list_all():
+    """List courses, sorted by subject, one cursor-paginated page at a time.
+    
+    Responses carry a weak ETag; a matching ``If-None-Match`` gets a 304
+    without running the listing query.
+    
+    Query Parameters:
+        limit: Page size
+        cursor: Token from the previous page's ``next`` link
+        subject: Only list courses with this subject
+        instructor_id: Only list courses taught by this instructor
+    
+    Status Codes:
+        200: Success
+        304: Not modified
+        400: Invalid query parameters
+    """
+    try:
+        limit, token = get_page_args()
+        
+        filters = {}
+        if 'subject' in request.args:
+            filters['subject'] = request.args['subject']
+        if 'instructor_id' in request.args:
+            try:
+                filters['instructor_id'] = int(request.args['instructor_id'])
+            except ValueError:
+                raise BadRequestError('instructor_id must be an integer')
+        
+        etag = collection_etag(Course.KIND)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        courses, next_token = list_courses(limit, token, **filters)
+        
+        base_url = _base_url()
+        response = {'courses': [course.to_dict(base_url) for course in courses]}
+        if next_token:
+            response['next'] = next_link('courses.list_all', next_token, limit, **filters)
+        return set_collection_etag(jsonify(response), etag), 200
+    
+    except BadRequestError:
+        return error_response("The request body is invalid", 400)
+
+
+@courses_bp.route('/courses/<int:course_id>', methods=['GET'])
+def get(course_id):
+    """Get a course.
+    
+    Status Codes:
+        200: Success
+        404: Course not found
+    """
+    try:
+        course = get_course(course_id)
+        return jsonify(course.to_dict(_base_url())), 200
+    
+    except NotFoundError:
+        return error_response("Not found", 404)
+
+
+@courses_bp.route('/courses/<int:course_id>', methods=['PATCH'])
+def update(course_id):
+    """Partially update a course.
+    
+    Status Codes:
+        200: Success
+        400: Invalid request body or instructor_id
+        401: Missing or invalid JWT
+        403: Caller is not an admin
+        404: Course not found
+    """
+    try:
+        fields = validate_course_data(request.get_json(silent=True), partial=True)
+        course = update_course(course_id, fields)
+        return jsonify(course.to_dict(_base_url())), 200
+    
+    except BadRequestError:
+        return error_response("The request body is invalid", 400)
+    except NotFoundError:
+        return error_response("Not found", 404)
+
+
+@courses_bp.route('/courses/<int:course_id>', methods=['DELETE'])
+def delete(course_id):
+    """Delete a course.
+    
+    Status Codes:
+        204: Deleted
+        401: Missing or invalid JWT
+        403: Caller is not an admin
+        404: Course not found
+    """
+    try:
+        delete_course(course_id)
+        return '', 204
+    
+    except NotFoundError:
+        return error_response("Not found", 404)
+
+
+@courses_bp.route('/courses/<int:course_id>/students', methods=['GET'])
+def get_students(course_id):
+    """Get the students enrolled in a course.
+    
+    Status Codes:
+        200: Success
+        401: Missing or invalid JWT
+        403: Caller is neither admin nor the course's instructor, or no such course
+    """
+    try:
+        _require_course_staff(course_id)
+        students = get_roster(course_id)
+        return jsonify([student.to_dict() for student in students]), 200
+    
+    except ForbiddenError:
+        return error_response("You don't have permission on this resource", 403)
+
+
+@courses_bp.route('/courses/<int:course_id>/students', methods=['PATCH'])
+def update_students(course_id):
+    """Enroll and/or unenroll students in a course.
+    
+    Request body: {"add": [student IDs], "remove": [student IDs]}
+    
+    Status Codes:
+        200: Success
+        400: Malformed request body
+        401: Missing or invalid JWT
+        403: Caller is neither admin nor the course's instructor, or no such course
+        409: An ID is in both lists or isn't a student
+    """
+    try:
+        _require_course_staff(course_id)
+        add, remove = validate_enrollment_data(request.get_json(silent=True))
+        update_roster(course_id, add, remove)
+        return '', 200
+    
+    except BadRequestError:
+        return error_response("The request body is invalid", 400)
+    except ForbiddenError:
+        return error_response("You don't have permission on this resource", 403)
+    except ConflictError:
+        return error_response("Enrollment data is invalid", 409)
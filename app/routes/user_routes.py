@@ -1,29 +1,35 @@
 # app/routes/user_routes.py
 
 from flask import Blueprint, jsonify, request
-from app.auth.decorators import requires_auth, requires_role
-from app.services.user_service import get_all_users, get_user_by_id
+from app.auth.identity import get_current_user
+from app.services.enrollment_service import get_course_ids_for_user
+from app.services.user_service import get_all_users, get_user_by_id, get_users_page
+from app.utils.http_cache import collection_etag, not_modified, set_collection_etag
+from app.utils.pagination import get_page_args, is_paginated_request, next_link
 from app.utils.responses import error_response
-from app.errors.exceptions import UnauthorizedError, ForbiddenError, NotFoundError
+from app.errors.exceptions import NotFoundError
 from app.models.user import User
 
-# Make sure url_prefix is "/users"
+# Make sure url_prefix is "/users" (access rules: app/auth/policy.py)
 users_bp = Blueprint("users", __name__, url_prefix="/users")
 
 @users_bp.route("/<int:user_id>", methods=["GET"])
-@requires_auth
 def get_user(user_id: int):
     try:
-        user = get_user_by_id(user_id)
+        # The endpoint policy admitted the caller as the owner or an admin
+        if request.caller.id == user_id:
+            # Resolved once per request, shared with authorization
+            caller: User = get_current_user()
+            if not caller:
+                raise NotFoundError("Not found")
+            user = caller.to_dict()
+            if caller.avatar_filename:
+                user["avatar_url"] = caller.get_avatar_url(request.host_url.rstrip("/"))
+        else:
+            user = get_user_by_id(user_id)
         if not user:
             raise NotFoundError("Not found")
 
-        caller: User = request.current_user
-        is_admin = (caller.role == "admin")
-        is_owner = (caller.sub == user["sub"])
-        if not (is_admin or is_owner):
-            raise ForbiddenError("You don't have permission on this resource")
-
         response = {
             "id":   user["id"],
             "role": user["role"],
@@ -32,30 +38,42 @@ def get_user(user_id: int):
         if "avatar_url" in user:
             response["avatar_url"] = user["avatar_url"]
         if user["role"] in ("instructor", "student"):
-            response["courses"] = []
+            base_url = request.host_url.rstrip("/")
+            course_ids = get_course_ids_for_user(user["id"], user["role"])
+            response["courses"] = [
+                f"{base_url}/courses/{course_id}" for course_id in course_ids
+            ]
         return jsonify(response), 200
 
-    except UnauthorizedError:
-        return error_response("Unauthorized", 401)
-    except ForbiddenError:
-        return error_response("You don't have permission on this resource", 403)
     except NotFoundError:
         return error_response("Not found", 404)
 
 
 @users_bp.route("", methods=["GET"])
-@requires_role("admin")
 def get_users():
     """
     GET /users/
         • 401 if no or invalid JWT
         • 403 if JWT is valid but role != "admin"
         • 200 + [ {id, role, sub}, … ] if role == "admin"
+        • 200 + { "users": [...], "next": <url> } when ?limit= or ?cursor= is given
+        • 304 if If-None-Match matches the weak ETag of the current users version
     """
-    try:
+    paginated = is_paginated_request()
+    if paginated:
+        limit, token = get_page_args()
+
+    etag = collection_etag(User.KIND)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    if not paginated:
         users = get_all_users()
-        return jsonify(users), 200
-    except UnauthorizedError:
-        return error_response("Unauthorized", 401)
-    except ForbiddenError:
-        return error_response("You don't have permission on this resource", 403)
+        return set_collection_etag(jsonify(users), etag), 200
+
+    users, next_token = get_users_page(limit, token)
+    response = {"users": users}
+    if next_token:
+        response["next"] = next_link("users.get_users", next_token, limit)
+    return set_collection_etag(jsonify(response), etag), 200
@@ -0,0 +1,128 @@
+"""Avatar business logic."""
+from flask import current_app
+
+from app.errors.exceptions import NotFoundError
+from app.models.user import User
+from app.utils.storage import (
+    StoredObject, avatar_object_name, delete_avatar, open_avatar, upload_avatar
+)
+
+
+def avatar_etag(user_id, generation):
+    """Get the strong ETag of one version of a user's avatar.
+    
+    Args:
+        user_id: The user's ID
+        generation: Storage generation of the avatar
+        
+    Returns:
+        str: Unquoted ETag or None if the generation is unknown
+    """
+    if not generation:
+        return None
+    return f"{user_id}-{generation}"
+
+
+def _evict(user_id, generation):
+    """Drop one version of an avatar from the byte cache."""
+    cache = current_app.avatar_cache
+    if cache is not None and generation:
+        cache.delete((user_id, generation))
+
+
+def set_avatar(user_id, file_stream, content_type):
+    """Store a new avatar for a user.
+    
+    Args:
+        user_id: The user's ID
+        file_stream: Readable binary file object
+        content_type: MIME type of the image
+        
+    Returns:
+        User instance
+        
+    Raises:
+        NotFoundError: If the user doesn't exist
+    """
+    user = User.get_by_id(user_id)
+    if not user:
+        raise NotFoundError('User not found')
+    
+    generation = upload_avatar(user_id, file_stream, content_type)
+    _evict(user_id, user.avatar_generation)
+    
+    user.avatar_filename = avatar_object_name(user_id)
+    user.avatar_generation = generation
+    return user.save()
+
+
+def get_avatar(user):
+    """Open a user's avatar, serving small avatars from the byte cache.
+    
+    Cache entries are keyed by user ID and storage generation, so a
+    re-upload can never be served stale bytes from this cache. The object
+    is opened pinned to the user's ``avatar_generation``; if a re-upload
+    replaced it after the user was read, the new object is served under its
+    own generation instead.
+    
+    Args:
+        user: User instance (already loaded, e.g. the caller)
+        
+    Returns:
+        StoredObject
+        
+    Raises:
+        NotFoundError: If the user has no avatar
+    """
+    if not user.avatar_filename:
+        raise NotFoundError('Avatar not found')
+    
+    cache = current_app.avatar_cache
+    if cache is not None and user.avatar_generation:
+        cached = cache.get((user.id, user.avatar_generation))
+        if cached is not None:
+            content_type, data = cached
+            return StoredObject(iter((data,)), content_type, len(data),
+                                user.avatar_generation)
+    
+    avatar = open_avatar(user.id, user.avatar_generation)
+    if avatar is None and user.avatar_generation:
+        avatar = open_avatar(user.id)
+    if avatar is None:
+        raise NotFoundError('Avatar not found')
+    
+    if (cache is not None and avatar.size is not None and
+            avatar.size <= current_app.config['AVATAR_CACHE_MAX_ITEM_BYTES']):
+        avatar.chunks = _fill_cache(avatar.chunks, avatar.content_type, cache,
+                                    (user.id, avatar.generation))
+    return avatar
+
+
+def _fill_cache(chunks, content_type, cache, key):
+    """Stream an avatar's chunks while collecting them into the cache."""
+    collected = []
+    for chunk in chunks:
+        collected.append(chunk)
+        yield chunk
+    cache.set(key, (content_type, b''.join(collected)))
+
+
+def remove_avatar(user_id):
+    """Delete a user's avatar.
+    
+    Args:
+        user_id: The user's ID
+        
+    Raises:
+        NotFoundError: If the user has no avatar
+    """
+    user = User.get_by_id(user_id)
+    if not user or not user.avatar_filename:
+        raise NotFoundError('Avatar not found')
+    
+    delete_avatar(user_id)
+    _evict(user_id, user.avatar_generation)
+    
+    user.avatar_filename = None
+    user.avatar_generation = None
+    user.save()
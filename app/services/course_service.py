@@ -0,0 +1,152 @@
+"""Course business logic and Datastore queries."""
+from app.errors.exceptions import BadRequestError, NotFoundError
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.utils.collection_cache import cached_collection
+from app.utils.pagination import paginate
+
+
+def _require_instructor(instructor):
+    """Check that the user named by ``instructor_id`` is an instructor.
+    
+    Args:
+        instructor: User instance, or None if no user has the ID
+        
+    Raises:
+        BadRequestError: If the user isn't an instructor
+    """
+    if not instructor or instructor.role != 'instructor':
+        raise BadRequestError('instructor_id must be the ID of an instructor')
+
+
+def create_course(fields):
+    """Create a course.
+    
+    Args:
+        fields: Validated course fields
+        
+    Returns:
+        Course instance
+        
+    Raises:
+        BadRequestError: If instructor_id is not an instructor
+    """
+    _require_instructor(User.get_by_id(fields['instructor_id']))
+    return Course(**fields).save()
+
+
+def get_course(course_id):
+    """Get a course by ID.
+    
+    Args:
+        course_id: The course ID
+        
+    Returns:
+        Course instance
+        
+    Raises:
+        NotFoundError: If the course doesn't exist
+    """
+    course = Course.get_by_id(course_id)
+    if not course:
+        raise NotFoundError('Course not found')
+    return course
+
+
+def update_course(course_id, fields):
+    """Apply a partial update to a course.
+    
+    Args:
+        course_id: The course ID
+        fields: Validated subset of course fields
+        
+    Returns:
+        Course instance
+        
+    Raises:
+        NotFoundError: If the course doesn't exist
+        BadRequestError: If instructor_id is not an instructor
+    """
+    # Queue both lookups so they share one batched call
+    course = Course.load(course_id)
+    instructor = User.load(fields['instructor_id']) if 'instructor_id' in fields else None
+    
+    course = course.get()
+    if not course:
+        raise NotFoundError('Course not found')
+    if instructor is not None:
+        _require_instructor(instructor.get())
+    
+    for name, value in fields.items():
+        setattr(course, name, value)
+    return course.save()
+
+
+def delete_course(course_id):
+    """Delete a course and its enrollments.
+    
+    Args:
+        course_id: The course ID
+        
+    Raises:
+        NotFoundError: If the course doesn't exist
+    """
+    get_course(course_id).delete()
+    Enrollment.delete_for_course(course_id)
+
+
+def list_courses(limit, token=None, subject=None, instructor_id=None):
+    """Get one page of courses using a projection query.
+    
+    Only the listed fields are read from the composite indexes in
+    ``index.yaml``; full entities are never fetched. Datastore can't project
+    a property that has an equality filter, so filtered properties are
+    dropped from the projection and filled in from the filter value.
+    Unfiltered pages are read through the collection cache; treat them as
+    read-only. Filtered ones always query, as their filter values are
+    client-supplied and unbounded.
+    
+    Args:
+        limit: Page size
+        token: Pagination token from the previous page
+        subject: Only list courses with this subject
+        instructor_id: Only list courses taught by this instructor
+        
+    Returns:
+        tuple: (list of Course instances, next page token or None)
+    """
+    if subject is not None or instructor_id is not None:
+        return _query_courses(limit, token, subject, instructor_id)
+    return cached_collection(Course.KIND, repr((limit, token)),
+                             lambda: _query_courses(limit, token, None, None))
+
+
+def _query_courses(limit, token, subject, instructor_id):
+    """Run the projection query behind ``list_courses``."""
+    client = Course.get_client()
+    query = client.query(kind=Course.KIND)
+    
+    fixed = {}
+    if subject is not None:
+        fixed['subject'] = subject
+    if instructor_id is not None:
+        fixed['instructor_id'] = instructor_id
+    
+    for name, value in fixed.items():
+        query.add_filter(name, '=', value)
+    
+    query.projection = [name for name in Course.FIELDS if name not in fixed]
+    query.order = ['number'] if subject is not None else ['subject', 'number']
+    
+    scope = f'{Course.KIND}:{subject}:{instructor_id}'
+    page = paginate(query, limit, token, scope=scope)
+    
+    courses = []
+    for entity in page.items:
+        course = Course.from_entity(entity)
+        for name, value in fixed.items():
+            setattr(course, name, value)
+        courses.append(course)
+    
+    return courses, page.next_token
@@ -0,0 +1,67 @@
+"""Enrollment business logic."""
+from app.errors.exceptions import ConflictError
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+
+
+def get_roster(course_id):
+    """Get the students enrolled in a course.
+    
+    The roster is one keys-only ancestor query plus one batched lookup.
+    
+    Args:
+        course_id: The course ID
+        
+    Returns:
+        list: User instances of the enrolled students
+    """
+    student_ids = Enrollment.student_ids_for_course(course_id)
+    return [user for user in User.get_many(student_ids) if user is not None]
+
+
+def update_roster(course_id, add, remove):
+    """Enroll and unenroll students in a course.
+    
+    Args:
+        course_id: The course ID
+        add: Student IDs to enroll
+        remove: Student IDs to unenroll
+        
+    Raises:
+        ConflictError: If an ID is in both lists or isn't a student
+    """
+    if set(add) & set(remove):
+        raise ConflictError('Enrollment data is invalid')
+    
+    ids = add + remove
+    users = User.get_many(ids, parallel=True)
+    if any(user is None or user.role != 'student' for user in users):
+        raise ConflictError('Enrollment data is invalid')
+    
+    Enrollment.apply_roster_diff(course_id, add, remove)
+
+
+def get_course_ids_for_user(user_id, role):
+    """Get the IDs of the courses a user teaches or is enrolled in.
+    
+    Either direction is a single keys-only query.
+    
+    Args:
+        user_id: The user's ID
+        role: The user's role
+        
+    Returns:
+        list: Course IDs (empty for admins)
+    """
+    if role == 'student':
+        return Enrollment.course_ids_for_student(user_id)
+    
+    if role == 'instructor':
+        client = Course.get_client()
+        query = client.query(kind=Course.KIND)
+        query.add_filter('instructor_id', '=', int(user_id))
+        query.keys_only()
+        return [entity.key.id for entity in query.fetch()]
+    
+    return []
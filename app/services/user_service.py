@@ -1,48 +1,73 @@
 # app/services/user_service.py
+import logging
 
 from flask import request
-from google.cloud import datastore
-client = datastore.Client()
+from app.extensions import get_datastore_client
+from app.models.user import User
+from app.utils.collection_cache import cached_collection
+from app.utils.pagination import paginate
+
+logger = logging.getLogger(__name__)
 
 def get_all_users():
     """
     Query Datastore kind="users" (which should already have exactly nine seeded entries),
     project only "role" and "sub", and return a list of dicts:
         [ { "id": <int>, "role": <str>, "sub": <str> }, … ]
+    Results are read through the collection cache; treat them as read-only.
     """
+    result = cached_collection(User.KIND, "all", _query_all_users)
+
+    logger.debug("list users sub=%s", request.caller.sub)
+    return result
+
+def _query_all_users():
+    """Run the projection query behind get_all_users."""
+    client = get_datastore_client()
     query = client.query(kind="users")
     # Only fetch "role" and "sub" properties—Datastore key holds the ID.
     query.projection = ["role", "sub"]
-    entities = list(query.fetch())
-
-    result = []
-    for ent in entities:
-        result.append({
-            "id": ent.key.id,
-            "role": ent["role"],
-            "sub": ent["sub"],
-        })
-        
-    print("DEBUG: current_user =", request.current_user)
-    return result
+    # Serialize straight from the entities, without model instances
+    serialize = User.serializer(("role", "sub"))
+    return [serialize(ent) for ent in query.fetch()]
+
+def get_users_page(limit: int, token: str | None = None):
+    """
+    Fetch one cursor-paginated page of users, projecting only "role" and "sub".
+    Returns (list of {id, role, sub} dicts, next page token or None).
+    Pages are read through the collection cache; treat them as read-only.
+    """
+    return cached_collection(User.KIND, f"page:{limit}:{token}",
+                             lambda: _query_users_page(limit, token))
+
+def _query_users_page(limit: int, token: str | None):
+    """Run the paginated projection query behind get_users_page."""
+    client = get_datastore_client()
+    query = client.query(kind="users")
+    query.projection = ["role", "sub"]
+    page = paginate(query, limit, token)
+
+    serialize = User.serializer(("role", "sub"))
+    users = [serialize(ent) for ent in page.items]
+    return users, page.next_token
 
 def get_user_by_id(user_id: int) -> dict | None:
     """
-    Fetch exactly one user entity from Datastore (kind="users").
+    Fetch exactly one user entity from Datastore (kind="users"), through the
+    request's batching loader so repeat lookups in a request are free.
     Returns a dict with keys id, role, sub, plus avatar_url if set,
     or None if no such entity exists.
     """
-    key = client.key("users", user_id)
-    ent = client.get(key)
-    if not ent:
+    user = User.get_by_id(user_id)
+    if not user:
         return None
 
-    user = {
-        "id": ent.key.id,
-        "role": ent["role"],
-        "sub": ent["sub"],
+    result = {
+        "id": user.id,
+        "role": user.role,
+        "sub": user.sub,
     }
-    # If you’ve already stored an avatar_url in the entity, include it:
-    if "avatar_url" in ent:
-        user["avatar_url"] = ent["avatar_url"]
-    return user
+    # Users with an uploaded avatar get a link to GET /users/<id>/avatar:
+    if user.avatar_filename:
+        result["avatar_url"] = f"{request.host_url}users/{user.id}/avatar"
+    return result
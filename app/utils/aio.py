@@ -0,0 +1,67 @@
+"""Threaded ASGI adapter for the ASGI serving mode (asgi.py).
+
+The app is a synchronous WSGI app in both serving modes; ASGI mode does
+not make it async. Concurrency model:
+
+* The ASGI server's event loop only parses HTTP and moves request and
+  response bodies.
+* Each request runs start to finish on one thread of the adapter's
+  pool, sized by ``ASGI_MAX_THREADS``. Its Datastore, Cloud Storage and
+  Auth0 calls block that thread, exactly as under a threaded WSGI server,
+  so a worker serves up to ``ASGI_MAX_THREADS`` requests at a time and
+  there is no second I/O pool to size against it.
+* Parallel Datastore batch lookups fan out on the separate
+  ``DATASTORE_BATCH_WORKERS`` pool (app/models/base.py), as under WSGI.
+
+None of the client libraries has a non-blocking transport, so async views
+would only move the same blocking calls to another pool.
+"""
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+# WsgiToAsgiInstance.run_wsgi_app without its thread-sensitive decorator
+_run_wsgi_app = inspect.unwrap(WsgiToAsgiInstance.run_wsgi_app)
+
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    """ASGI adapter that runs each WSGI request on a bounded thread pool.
+    
+    asgiref's ``WsgiToAsgi`` runs every request on one shared thread, which
+    serializes the app. This adapter gives each request its own pool thread,
+    so one ASGI worker keeps up to ``max_threads`` requests in flight while
+    they block on Datastore, Storage or Auth0.
+    """
+    
+    def __init__(self, wsgi_application, max_threads):
+        """Initialize the adapter.
+        
+        Args:
+            wsgi_application: WSGI callable (the Flask app)
+            max_threads: Maximum concurrently executing requests
+        """
+        super().__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=max_threads,
+                                           thread_name_prefix='asgi-request')
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            # No startup/shutdown work; acknowledge so servers don't warn
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        
+        instance = WsgiToAsgiInstance(self.wsgi_application)
+        # run_wsgi_app is declared thread-sensitive; rebind it to the pool
+        instance.run_wsgi_app = sync_to_async(
+            _run_wsgi_app.__get__(instance),
+            thread_sensitive=False,
+            executor=self.executor
+        )
+        await instance(scope, receive, send)
@@ -0,0 +1,123 @@
+"""In-process caching primitives."""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU cache with per-entry expiry.
+
+    Entries expire at an absolute wall-clock time (``time.time()``), either
+    given per entry or derived from the cache's default ``ttl``. When the
+    cache is full the least recently used entry is evicted. With a
+    ``weigher`` the cache is additionally bounded by total weight, e.g. the
+    number of bytes held.
+    """
+
+    def __init__(self, max_size=1024, ttl=None, max_weight=None, weigher=None):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries kept
+            ttl: Default lifetime of an entry in seconds (None for no expiry)
+            max_weight: Maximum total weight of all entries
+            weigher: Function returning the weight of a value (e.g. ``len``)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.hits = 0
+        self.misses = 0
+
+        self._data = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def _weigh(self, value):
+        return self.weigher(value) if self.weigher else 0
+
+    def _pop(self, key):
+        """Remove an entry and release its weight. Caller holds the lock."""
+        value, _ = self._data.pop(key)
+        self._weight -= self._weigh(value)
+
+    def get(self, key, default=None):
+        """Get a value, refreshing its LRU position.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            The cached value or ``default``
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._pop(key)
+            self.misses += 1
+            return default
+
+    def set(self, key, value, expires_at=None):
+        """Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            expires_at: Absolute expiry timestamp; defaults to now + ``ttl``
+        """
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+
+        weight = self._weigh(value)
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (value, expires_at)
+            self._weight += weight
+            while len(self._data) > self.max_size or (
+                    self.max_weight is not None and self._weight > self.max_weight):
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key):
+        """Remove a value if present.
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+    def clear(self):
+        """Remove all values."""
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Get hit/miss counters.
+
+        Returns:
+            dict: size, weight, hits, misses and hit_ratio
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'weight': self._weight,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
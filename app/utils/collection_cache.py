@@ -0,0 +1,135 @@
+"""Read-through cache for collection query results.
+
+Results are cached per kind and variant (e.g. the page of a listing),
+keyed by the kind's collection version (see ``app.models.versions``).
+Writes through the models bump the version, so every worker's entries
+become unreachable as soon as they commit; the backend's TTL and size bound
+age the stale ones out. Variants must come from a bounded set: listings
+filtered by client-supplied values bypass the cache, so arbitrary query
+strings can't flood it and evict the shared pages.
+
+Entries live in a ``CacheBackend``. ``LocalCacheBackend`` keeps them in
+process; a shared cache (e.g. Redis or Memcached) can implement the same
+four methods, storing values in serialized form. Cached values are shared
+between requests and must be treated as read-only.
+"""
+import time
+
+from flask import current_app
+
+from app.models.versions import get_version
+from app.utils.cache import LRUCache
+
+
+class CacheBackend:
+    """Storage interface of ``CollectionCache``."""
+    
+    def get(self, key):
+        """Get a value, or None on a miss."""
+        raise NotImplementedError
+    
+    def set(self, key, value, ttl):
+        """Store a value for ``ttl`` seconds."""
+        raise NotImplementedError
+    
+    def delete(self, key):
+        """Remove a value if present."""
+        raise NotImplementedError
+    
+    def stats(self):
+        """Get backend counters as a dict."""
+        return {}
+
+
+class LocalCacheBackend(CacheBackend):
+    """In-process backend: a bounded LRU per worker."""
+    
+    def __init__(self, max_size):
+        """Initialize the backend.
+        
+        Args:
+            max_size: Maximum number of entries kept
+        """
+        self.cache = LRUCache(max_size=max_size)
+    
+    def get(self, key):
+        return self.cache.get(key)
+    
+    def set(self, key, value, ttl):
+        self.cache.set(key, value, expires_at=time.time() + ttl)
+    
+    def delete(self, key):
+        self.cache.delete(key)
+    
+    def stats(self):
+        return self.cache.stats()
+
+
+class CollectionCache:
+    """Versioned read-through cache of collection results."""
+    
+    def __init__(self, backend, ttl):
+        """Initialize the cache.
+        
+        Args:
+            backend: CacheBackend holding the entries
+            ttl: Maximum age of an entry in seconds
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_load(self, kind, variant, loader):
+        """Get a collection result, loading and caching it on a miss.
+        
+        Args:
+            kind: Kind the result is built from
+            variant: String identifying the query (page, size, ...)
+            loader: Function computing the result
+            
+        Returns:
+            The cached or freshly loaded result
+        """
+        key = f'{kind}:{get_version(kind)}:{variant}'
+        
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        
+        self.misses += 1
+        value = loader()
+        self.backend.set(key, value, self.ttl)
+        return value
+    
+    def stats(self):
+        """Get hit/miss counters.
+        
+        Returns:
+            dict: hits, misses, hit_ratio and the backend's counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'backend': self.backend.stats()
+        }
+
+
+def cached_collection(kind, variant, loader):
+    """Read a collection result through the app's cache, if enabled.
+    
+    Args:
+        kind: Kind the result is built from
+        variant: String identifying the query
+        loader: Function computing the result
+        
+    Returns:
+        The result
+    """
+    cache = current_app.collection_cache
+    if cache is None:
+        return loader()
+    return cache.get_or_load(kind, variant, loader)
@@ -0,0 +1,69 @@
+"""Response compression.
+
+JSON responses above ``COMPRESSION_MIN_SIZE`` bytes are compressed with
+brotli (when installed) or gzip, according to the client's
+``Accept-Encoding``. Streamed responses, such as avatar downloads, are
+left alone.
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def _encodings():
+    """Get the supported content codings, preferred first."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def compress_response(response, config):
+    """Compress a response body in place if the client accepts it.
+    
+    Args:
+        response: Flask response
+        config: App config
+        
+    Returns:
+        The response
+    """
+    if (response.status_code != 200 or response.direct_passthrough or
+            response.is_streamed or 'Content-Encoding' in response.headers or
+            response.mimetype not in config['COMPRESSION_MIMETYPES']):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    
+    body = response.get_data()
+    if len(body) < config['COMPRESSION_MIN_SIZE']:
+        return response
+    
+    encoding = request.accept_encodings.best_match(_encodings())
+    if encoding == 'br':
+        body = brotli.compress(body, quality=config['COMPRESSION_BROTLI_QUALITY'])
+    elif encoding == 'gzip':
+        body = gzip.compress(body, compresslevel=config['COMPRESSION_GZIP_LEVEL'],
+                             mtime=0)
+    else:
+        return response
+    
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def register_compression(app):
+    """Compress eligible responses of an app.
+    
+    Args:
+        app: Flask application instance
+    """
+    if not app.config['COMPRESSION_ENABLED']:
+        return
+    
+    @app.after_request
+    def compress(response):
+        return compress_response(response, app.config)
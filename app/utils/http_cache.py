@@ -0,0 +1,58 @@
+"""Validators for conditional GETs on listing endpoints.
+
+A listing's weak ETag is derived from the collection versions of the kinds
+it reads (see ``app.models.versions``) and the request URL, so checking
+``If-None-Match`` costs one key lookup per kind and no listing query.
+"""
+import hashlib
+
+from flask import current_app, request
+
+from app.models.versions import get_version
+
+
+def collection_etag(*kinds):
+    """Compute the ETag of a listing for the current request.
+    
+    The URL is part of the tag because filters, page size, cursor and
+    host all change the representation.
+    
+    Args:
+        *kinds: Kinds the listing is built from
+        
+    Returns:
+        str: Opaque ETag value (sent as a weak validator)
+    """
+    parts = [f'{kind}={get_version(kind)}' for kind in kinds]
+    parts.append(request.url)
+    return hashlib.blake2b('|'.join(parts).encode(), digest_size=12).hexdigest()
+
+
+def set_collection_etag(response, etag):
+    """Attach a listing's ETag and make clients revalidate it.
+    
+    Args:
+        response: Flask response
+        etag: Value from ``collection_etag``
+        
+    Returns:
+        The response
+    """
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag):
+    """Build a 304 response if the client already has this version.
+    
+    Args:
+        etag: Value from ``collection_etag``
+        
+    Returns:
+        304 response, or None if the listing must be sent
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return set_collection_etag(current_app.response_class(status=304), etag)
@@ -0,0 +1,100 @@
+"""JSON encoding for API responses.
+
+``FastJSONProvider`` replaces Flask's default provider: responses are
+encoded compactly, straight to bytes, with orjson when it is installed and
+the stdlib encoder otherwise (``JSON_ENCODER``). Error bodies are constant,
+so they are encoded once and reused (see ``encode_error``).
+"""
+import json
+from functools import lru_cache
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Datetimes go through ``default`` so they render as HTTP dates, as before
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                   if orjson else 0)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes responses to bytes with a fast encoder."""
+    
+    def __init__(self, app):
+        """Initialize the provider from the app's config.
+        
+        Args:
+            app: Flask application instance
+            
+        Raises:
+            RuntimeError: If JSON_ENCODER is 'orjson' but orjson isn't installed
+        """
+        super().__init__(app)
+        self.sort_keys = app.config['JSON_SORT_KEYS']
+        
+        encoder = app.config['JSON_ENCODER']
+        if encoder == 'orjson' and orjson is None:
+            raise RuntimeError("JSON_ENCODER is 'orjson' but orjson is not installed")
+        self.use_orjson = orjson is not None and encoder != 'stdlib'
+    
+    def dumps_bytes(self, obj):
+        """Serialize data as compact UTF-8 JSON bytes.
+        
+        Args:
+            obj: The data to serialize
+            
+        Returns:
+            bytes
+        """
+        if self.use_orjson:
+            option = _ORJSON_OPTIONS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=self.default, option=option)
+        
+        return json.dumps(obj, default=self.default, sort_keys=self.sort_keys,
+                          ensure_ascii=False, separators=(',', ':')).encode()
+    
+    def dumps(self, obj, **kwargs):
+        """Serialize data as a JSON string.
+        
+        Calls with extra arguments (e.g. ``indent``) use the stdlib encoder.
+        """
+        if self.use_orjson and not kwargs:
+            return self.dumps_bytes(obj).decode()
+        return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        """Deserialize data as JSON, with orjson when available."""
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        """Serialize the arguments to a JSON response.
+        
+        The body is set as bytes, so Content-Length is set without
+        re-encoding. Output is always compact.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+@lru_cache(maxsize=128)
+def encode_error(message, use_orjson):
+    """Encode the body ``{"Error": message}`` once per distinct message.
+    
+    Args:
+        message: The error message
+        use_orjson: Encode with orjson, as ``FastJSONProvider.use_orjson``
+        
+    Returns:
+        bytes
+    """
+    if use_orjson:
+        return orjson.dumps({"Error": message})
+    return json.dumps({"Error": message}, ensure_ascii=False,
+                      separators=(',', ':')).encode()
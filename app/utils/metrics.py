@@ -0,0 +1,266 @@
+"""Lightweight request instrumentation.
+
+Datastore RPCs, storage operations, outbound HTTP calls and JWT
+verification are wrapped in ``timed`` spans. A span adds its duration to
+the current request's totals, reported in the ``Server-Timing`` response
+header, and to a process-wide histogram served by ``GET /admin/metrics``.
+Outside a request (or with ``METRICS_ENABLED`` off) a span records
+nothing and costs one context variable lookup.
+
+Histograms have fixed, exponentially spaced buckets, so memory is constant
+and recording is a bisect plus two increments under a lock.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets in milliseconds: 0.1 ms to ~105 s
+BUCKET_BOUNDS = tuple(0.1 * 2 ** i for i in range(21))
+
+# Datastore API methods that each issue one RPC
+DATASTORE_RPCS = ('lookup', 'run_query', 'run_aggregation_query', 'commit',
+                  'begin_transaction', 'rollback', 'allocate_ids', 'reserve_ids')
+
+_request_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    """Latency histogram with fixed buckets."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ms):
+        """Record one observation in milliseconds."""
+        index = bisect.bisect_left(BUCKET_BOUNDS, ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += ms
+            if ms > self.max:
+                self.max = ms
+
+    def percentile(self, p):
+        """Estimate a percentile as the upper bound of its bucket.
+
+        Args:
+            p: Percentile between 0 and 100
+
+        Returns:
+            float: Milliseconds (the maximum for the overflow bucket)
+        """
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def snapshot(self):
+        """Summarize the histogram.
+
+        Returns:
+            dict: count, mean/max/p50/p95/p99 in ms, and non-empty buckets
+                keyed by their upper bound
+        """
+        with self._lock:
+            return {
+                'count': self.count,
+                'mean_ms': self.total / self.count if self.count else 0.0,
+                'max_ms': self.max,
+                'p50_ms': self.percentile(50),
+                'p95_ms': self.percentile(95),
+                'p99_ms': self.percentile(99),
+                'buckets': {
+                    (f'{BUCKET_BOUNDS[i]:g}' if i < len(BUCKET_BOUNDS) else '+Inf'): count
+                    for i, count in enumerate(self.counts) if count
+                },
+            }
+
+
+class MetricsRegistry:
+    """Process-wide histograms by metric name, e.g. ``datastore.lookup``."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, ms):
+        """Record an observation of a metric.
+
+        Args:
+            name: Metric name
+            ms: Duration in milliseconds
+        """
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        histogram.record(ms)
+
+    def snapshot(self):
+        """Summarize every histogram.
+
+        Returns:
+            dict: Metric name -> ``Histogram.snapshot()``
+        """
+        return {name: histogram.snapshot()
+                for name, histogram in sorted(self._histograms.items())}
+
+
+class RequestMetrics:
+    """Call counts and time per category (``datastore``, ``storage``, ...)
+    for one request. Spans may finish on worker threads, so updates lock."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.started = time.perf_counter()
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        """Record a finished span.
+
+        Args:
+            name: Metric name; the part before the first dot is its category
+            seconds: Duration of the span
+        """
+        self.registry.observe(name, seconds * 1000)
+        category = name.partition('.')[0]
+        with self._lock:
+            span = self.spans.get(category)
+            if span is None:
+                self.spans[category] = [1, seconds]
+            else:
+                span[0] += 1
+                span[1] += seconds
+
+    def server_timing(self, total):
+        """Format the request's totals as a ``Server-Timing`` header value.
+
+        Args:
+            total: Request duration in seconds
+
+        Returns:
+            str
+        """
+        entries = [f'{category};dur={seconds * 1000:.2f};desc="{count} calls"'
+                   for category, (count, seconds) in sorted(self.spans.items())]
+        entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+
+
+class timed:
+    """Context manager timing a span of the current request.
+
+    Example:
+        with timed('storage.upload'):
+            ...
+    """
+
+    __slots__ = ('name', 'metrics', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.metrics = _request_metrics.get()
+        if self.metrics is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.metrics is not None:
+            self.metrics.add(self.name, time.perf_counter() - self.started)
+
+
+class InstrumentedDatastoreAPI:
+    """Proxy over a Datastore client's low-level API timing every RPC."""
+
+    def __init__(self, api):
+        """Initialize the proxy.
+
+        Args:
+            api: The client's ``_datastore_api`` (gRPC or HTTP)
+        """
+        self._api = api
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if name not in DATASTORE_RPCS:
+            return attr
+
+        metric = f'datastore.{name}'
+
+        def call(*args, **kwargs):
+            with timed(metric):
+                return attr(*args, **kwargs)
+
+        # Cache the wrapper, so later calls skip __getattr__
+        setattr(self, name, call)
+        return call
+
+
+def instrument_datastore(client):
+    """Time every RPC a Datastore client issues.
+
+    Args:
+        client: datastore.Client
+
+    Returns:
+        The client
+    """
+    client._datastore_api_internal = InstrumentedDatastoreAPI(client._datastore_api)
+    return client
+
+
+def register_metrics(app):
+    """Collect per-request metrics for an app and report them.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config['METRICS_ENABLED']:
+        app.metrics = None
+        return
+
+    app.metrics = MetricsRegistry()
+    server_timing = app.config['SERVER_TIMING_ENABLED']
+
+    @app.before_request
+    def start_request_metrics():
+        _request_metrics.set(RequestMetrics(app.metrics))
+
+    @app.after_request
+    def finish_request_metrics(response):
+        metrics = _request_metrics.get()
+        if metrics is None:
+            return response
+
+        total = time.perf_counter() - metrics.started
+        app.metrics.observe(f'request.{request.endpoint}', total * 1000)
+        if server_timing:
+            response.headers['Server-Timing'] = metrics.server_timing(total)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('request endpoint=%s status=%s duration_ms=%.2f %s',
+                         request.endpoint, response.status_code, total * 1000,
+                         ' '.join(f'{category}_calls={count} {category}_ms={seconds * 1000:.2f}'
+                                  for category, (count, seconds) in metrics.spans.items()))
+        return response
+
+    @app.teardown_request
+    def clear_request_metrics(exc):
+        _request_metrics.set(None)
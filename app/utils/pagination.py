@@ -0,0 +1,143 @@
+"""Cursor-based pagination for Datastore queries.
+
+Pages are fetched with Datastore query cursors rather than offsets, so
+page N costs the same as page 1. Cursors are handed to clients as opaque
+tokens signed with the app's SECRET_KEY and bound to the listing they came
+from, so they can't be forged or replayed against a different query.
+"""
+from flask import current_app, request, url_for
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from app.errors.exceptions import BadRequestError
+
+CURSOR_SALT = 'tarpaulin-pagination-cursor'
+
+
+class Page:
+    """One page of query results."""
+
+    def __init__(self, items, next_token=None):
+        """Initialize the page.
+
+        Args:
+            items: Entities on this page
+            next_token: Opaque token for the next page, or None on the last page
+        """
+        self.items = items
+        self.next_token = next_token
+
+
+def _serializer():
+    """Get the serializer used to sign cursor tokens."""
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=CURSOR_SALT)
+
+
+def encode_cursor(cursor, scope):
+    """Wrap a Datastore cursor in a signed, opaque token.
+
+    Args:
+        cursor: Datastore cursor (bytes or str)
+        scope: Identifier of the listing the cursor belongs to
+
+    Returns:
+        str: URL-safe token
+    """
+    if isinstance(cursor, bytes):
+        cursor = cursor.decode('ascii')
+    return _serializer().dumps({'c': cursor, 's': scope})
+
+
+def decode_cursor(token, scope):
+    """Unwrap a token produced by ``encode_cursor``.
+
+    Args:
+        token: Token from the client
+        scope: Identifier of the listing being requested
+
+    Returns:
+        str: Datastore cursor
+
+    Raises:
+        BadRequestError: If the token is tampered with or from another listing
+    """
+    try:
+        data = _serializer().loads(token)
+    except BadSignature:
+        raise BadRequestError('Invalid pagination cursor')
+
+    if not isinstance(data, dict) or data.get('s') != scope:
+        raise BadRequestError('Invalid pagination cursor')
+    return data['c']
+
+
+def get_page_args():
+    """Read ``limit`` and ``cursor`` from the query string.
+
+    Returns:
+        tuple: (limit, cursor token or None)
+
+    Raises:
+        BadRequestError: If limit is not a positive integer
+    """
+    limit = request.args.get('limit', current_app.config['DEFAULT_PAGE_SIZE'])
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise BadRequestError('limit must be an integer')
+
+    if limit < 1:
+        raise BadRequestError('limit must be positive')
+
+    return min(limit, current_app.config['MAX_PAGE_SIZE']), request.args.get('cursor')
+
+
+def is_paginated_request():
+    """Check whether the client asked for a paginated listing.
+
+    Returns:
+        bool: True if ``limit`` or ``cursor`` is in the query string
+    """
+    return 'limit' in request.args or 'cursor' in request.args
+
+
+def paginate(query, limit, token=None, scope=None):
+    """Fetch one page of a Datastore query.
+
+    Args:
+        query: Datastore query (filters, order and projection already set)
+        limit: Page size
+        token: Token from a previous page, or None for the first page
+        scope: Identifier of the listing, e.g. the kind plus its filters
+
+    Returns:
+        Page
+    """
+    scope = scope or query.kind
+    start_cursor = decode_cursor(token, scope) if token else None
+
+    iterator = query.fetch(limit=limit, start_cursor=start_cursor)
+    items = list(iterator)
+
+    next_token = None
+    if len(items) == limit and iterator.next_page_token:
+        next_token = encode_cursor(iterator.next_page_token, scope)
+
+    return Page(items, next_token)
+
+
+def next_link(endpoint, next_token, limit, **values):
+    """Build the absolute URL of the next page of a listing.
+
+    Args:
+        endpoint: Flask endpoint of the listing
+        next_token: Token from ``Page.next_token``
+        limit: Page size
+        **values: Extra query parameters (e.g. filters) to carry over
+
+    Returns:
+        str: URL or None if there is no next page
+    """
+    if not next_token:
+        return None
+    return url_for(endpoint, cursor=next_token, limit=limit,
+                   _external=True, **values)
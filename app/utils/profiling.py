@@ -0,0 +1,267 @@
+"""Opt-in request profiling.
+
+With ``PROFILING_ENABLED`` the app's WSGI callable is wrapped so selected
+requests are profiled and the result written to ``PROFILE_DIR``, one file
+per request, named in the ``X-Profile-File`` response header. A request is
+profiled when
+
+* ``PROFILING_ALL_REQUESTS`` is set,
+* an admin opened a profiling window on this worker
+  (``POST /admin/profiling/window``), or
+* it carries a valid ``X-Profile`` header: a short-lived token signed with
+  the app's SECRET_KEY, issued by ``POST /admin/profiling/token``.
+
+Two modes (``PROFILE_MODE``):
+
+* ``cprofile``: deterministic cProfile of the request thread, written as a
+  ``.prof`` pstats file (``python -m pstats``, snakeviz).
+* ``sample``: the worker's sampler thread records the request thread's
+  stack each ``PROFILE_SAMPLE_INTERVAL`` seconds, written as collapsed
+  stacks (``.folded``) for flamegraph.pl or speedscope. Concurrent
+  profiled requests share the one sampler and each gets only its own
+  thread's stacks; parallel Datastore batches show up as the request
+  thread waiting on the batch pool.
+
+Without ``PROFILING_ENABLED`` nothing is installed and requests pay nothing.
+"""
+import cProfile
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from itsdangerous import BadSignature, TimestampSigner
+
+PROFILE_SALT = 'tarpaulin-profile-token'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_FILE_HEADER = 'X-Profile-File'
+
+_unsafe_chars = re.compile(r'[^A-Za-z0-9]+')
+
+
+class StackSampler:
+    """Samples the stacks of the threads serving profiled requests.
+
+    One sampler is shared by all profiled requests of a worker. Its thread
+    runs while at least one request is registered, and each sample walks
+    only the registered threads' stacks, attributing them to their own
+    request.
+    """
+
+    def __init__(self, interval):
+        """Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self._targets = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def add(self, ident):
+        """Start sampling a thread.
+
+        Args:
+            ident: Thread identifier
+
+        Returns:
+            Counter of collapsed stacks, filled until ``remove(ident)``
+        """
+        with self._lock:
+            stacks = self._targets[ident] = Counter()
+            # A sampler thread doesn't survive fork: check it is alive
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='profile-sampler',
+                                                daemon=True)
+                self._thread.start()
+        return stacks
+
+    def remove(self, ident):
+        """Stop sampling a thread.
+
+        Args:
+            ident: Thread identifier
+
+        Returns:
+            Counter of the thread's collapsed stacks
+        """
+        with self._lock:
+            return self._targets.pop(ident)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._targets:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for ident, stacks in self._targets.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[_collapse(frame)] += 1
+
+
+def _collapse(frame):
+    """Format a stack, outermost frame first, as one collapsed-stack line."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+def _write_folded(stacks, path):
+    """Write samples in collapsed-stack format."""
+    with open(path, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f'{stack} {count}\n')
+
+
+class Profiler:
+    """Decides which requests to profile and profiles them."""
+
+    def __init__(self, app):
+        """Initialize the profiler from the app config.
+
+        Args:
+            app: Flask application instance
+        """
+        config = app.config
+        self.directory = config['PROFILE_DIR']
+        self.mode = config['PROFILE_MODE']
+        self.interval = config['PROFILE_SAMPLE_INTERVAL']
+        self.all_requests = config['PROFILING_ALL_REQUESTS']
+        self.token_max_age = config['PROFILE_TOKEN_MAX_AGE']
+        self.window_until = 0.0
+
+        self._signer = TimestampSigner(config['SECRET_KEY'], salt=PROFILE_SALT)
+        self._header_key = 'HTTP_' + PROFILE_HEADER.upper().replace('-', '_')
+        self._sequence = itertools.count()
+        self._sampler = StackSampler(self.interval)
+
+        if self.mode not in ('cprofile', 'sample'):
+            raise ValueError(f"PROFILE_MODE must be 'cprofile' or 'sample', not {self.mode!r}")
+
+    def issue_token(self):
+        """Issue a token enabling profiling of requests that send it.
+
+        Returns:
+            str: Value for the ``X-Profile`` header
+        """
+        return self._signer.sign('profile').decode('ascii')
+
+    def open_window(self, seconds):
+        """Profile every request of this worker for a while.
+
+        Args:
+            seconds: Length of the window
+        """
+        self.window_until = time.monotonic() + seconds
+
+    def wants(self, environ):
+        """Check whether to profile a request.
+
+        Args:
+            environ: WSGI environ
+
+        Returns:
+            bool
+        """
+        if self.all_requests or time.monotonic() < self.window_until:
+            return True
+
+        token = environ.get(self._header_key)
+        if token is None:
+            return False
+        try:
+            self._signer.unsign(token, max_age=self.token_max_age)
+        except BadSignature:
+            return False
+        return True
+
+    def _path(self, environ, suffix):
+        """Build a unique output path for a request's profile."""
+        name = _unsafe_chars.sub('_', environ.get('PATH_INFO', '')).strip('_') or 'root'
+        filename = (f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-"
+                    f"{next(self._sequence)}-{environ['REQUEST_METHOD']}-{name[:80]}{suffix}")
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, filename)
+
+    def profile(self, wsgi_app, environ, start_response):
+        """Run a request under the profiler and write the result.
+
+        The response body is collected inside the profile, so streamed
+        responses are profiled in full.
+        """
+        suffix = '.prof' if self.mode == 'cprofile' else '.folded'
+        path = self._path(environ, suffix)
+
+        def profiled_start_response(status, headers, exc_info=None):
+            headers.append((PROFILE_FILE_HEADER, os.path.basename(path)))
+            return start_response(status, headers, exc_info)
+
+        def run():
+            result = wsgi_app(environ, profiled_start_response)
+            try:
+                return [b''.join(result)]
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+
+        if self.mode == 'sample':
+            ident = threading.get_ident()
+            self._sampler.add(ident)
+            try:
+                return run()
+            finally:
+                _write_folded(self._sampler.remove(ident), path)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return wsgi_app(environ, start_response)
+        try:
+            return run()
+        finally:
+            profile.disable()
+            profile.dump_stats(path)
+
+    def wrap(self, wsgi_app):
+        """Wrap a WSGI callable so selected requests are profiled.
+
+        Args:
+            wsgi_app: The app's WSGI callable
+
+        Returns:
+            WSGI callable
+        """
+        def profiling_app(environ, start_response):
+            if not self.wants(environ):
+                return wsgi_app(environ, start_response)
+            return self.profile(wsgi_app, environ, start_response)
+
+        return profiling_app
+
+
+def register_profiling(app):
+    """Install the request profiler if PROFILING_ENABLED is set.
+
+    Sets ``app.profiler`` (None when disabled).
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config['PROFILING_ENABLED']:
+        app.profiler = None
+        return
+
+    app.profiler = Profiler(app)
+    app.wsgi_app = app.profiler.wrap(app.wsgi_app)
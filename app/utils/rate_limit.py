@@ -0,0 +1,276 @@
+"""Rate limiting and admission control.
+
+Every request passes, before any authentication or Datastore work:
+
+1. the concurrency limiter: at most ``MAX_CONCURRENT_REQUESTS`` requests
+   are in flight per worker; excess requests are shed with 503;
+2. the per-IP token bucket (``RATE_LIMITS['ip']``), and for
+   ``POST /users/login`` the stricter per-IP and per-username login
+   buckets, which also stop most attempts before they reach Auth0;
+
+and, right after the endpoint policy has verified the JWT and before the
+caller is resolved (which may hit the identity cache or Datastore),
+
+3. the per-sub bucket (``RATE_LIMITS['sub']``, ``RateLimiter.limit_sub``).
+
+A request over a limit gets 429 with a ``Retry-After`` header.
+
+Buckets live in a ``RateLimitStore``. ``LocalRateLimitStore`` keeps them in
+process, so limits apply per worker; a shared store (e.g. Redis running the
+same refill arithmetic in a Lua script) can implement ``consume`` to make
+them global. Each active key holds two numbers. A bucket left idle long
+enough to refill completely is indistinguishable from a new one, so such
+buckets are evicted without changing any decision.
+"""
+import abc
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, request
+
+from app.errors.exceptions import TooManyRequestsError
+from app.utils.responses import error_response
+
+# Most idle buckets evicted per consume, keeping eviction amortized O(1)
+EVICTIONS_PER_CALL = 2
+
+
+class RateLimitStore(abc.ABC):
+    """Storage interface of the token buckets."""
+
+    @abc.abstractmethod
+    def consume(self, key, rate, burst):
+        """Take one token from a bucket, creating it full if needed.
+
+        Args:
+            key: Bucket key
+            rate: Tokens added per second
+            burst: Bucket capacity
+
+        Returns:
+            float: 0 if a token was taken, else seconds until one is available
+        """
+
+    def stats(self):
+        """Get store counters as a dict."""
+        return {}
+
+
+class LocalRateLimitStore(RateLimitStore):
+    """In-process token buckets, least recently used first."""
+
+    def __init__(self, max_keys, idle_ttl):
+        """Initialize the store.
+
+        Args:
+            max_keys: Maximum number of buckets kept; beyond it the least
+                recently used bucket is dropped (and restarts full)
+            idle_ttl: Seconds after which an unused bucket is dropped; at
+                least the longest full-refill time, so eviction is lossless
+        """
+        self.max_keys = max_keys
+        self.idle_ttl = idle_ttl
+        self.allowed = 0
+        self.limited = 0
+
+        # key -> [tokens, last update (monotonic)]
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [burst, now]
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            self._evict(now)
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.allowed += 1
+                return 0.0
+            self.limited += 1
+            return (1 - bucket[0]) / rate
+
+    def _evict(self, now):
+        """Drop idle buckets and buckets over ``max_keys``. Caller holds the lock."""
+        buckets = self._buckets
+        while len(buckets) > self.max_keys:
+            buckets.popitem(last=False)
+        for _ in range(EVICTIONS_PER_CALL):
+            oldest = next(iter(buckets.values()), None)
+            if oldest is None or now - oldest[1] < self.idle_ttl:
+                break
+            buckets.popitem(last=False)
+
+    def stats(self):
+        """Get bucket counters.
+
+        Returns:
+            dict: size, allowed and limited
+        """
+        return {'size': len(self._buckets), 'allowed': self.allowed,
+                'limited': self.limited}
+
+
+class ConcurrencyLimiter:
+    """Non-blocking cap on the requests in flight in a worker."""
+
+    def __init__(self, max_in_flight):
+        """Initialize the limiter.
+
+        Args:
+            max_in_flight: Maximum concurrent requests
+        """
+        self.max_in_flight = max_in_flight
+        self.shed = 0
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+
+    def try_acquire(self):
+        """Take a slot if one is free.
+
+        Returns:
+            bool: True if the request may proceed
+        """
+        if self._slots.acquire(blocking=False):
+            return True
+        self.shed += 1
+        return False
+
+    def release(self):
+        """Return a slot."""
+        self._slots.release()
+
+
+class RateLimiter:
+    """The app's limits, enforced against a store."""
+
+    def __init__(self, store, limits, concurrency, proxy_count=0):
+        """Initialize the limiter.
+
+        Args:
+            store: RateLimitStore
+            limits: Limit name -> (rate per second, burst)
+            concurrency: ConcurrencyLimiter or None
+            proxy_count: Trusted proxies in front of the app, to find the
+                client address in X-Forwarded-For
+        """
+        self.store = store
+        self.limits = limits
+        self.concurrency = concurrency
+        self.proxy_count = proxy_count
+
+    def check(self, name, value):
+        """Consume a token of limit ``name`` for ``value``.
+
+        Returns:
+            float: 0 if allowed, else seconds to wait
+        """
+        rate, burst = self.limits[name]
+        return self.store.consume(f'{name}:{value}', rate, burst)
+
+    def limit_sub(self, payload):
+        """Apply the per-sub limit to a verified JWT payload.
+
+        Args:
+            payload: Verified JWT payload
+
+        Raises:
+            TooManyRequestsError: If the token's sub is over its limit
+        """
+        sub = payload.get('sub')
+        if sub:
+            wait = self.check('sub', sub)
+            if wait:
+                raise TooManyRequestsError(wait)
+
+    def client_ip(self):
+        """Get the client's address, skipping trusted proxies."""
+        if self.proxy_count:
+            route = request.access_route
+            if len(route) >= self.proxy_count:
+                return route[-self.proxy_count]
+        return request.remote_addr
+
+    def stats(self):
+        """Get limiter counters.
+
+        Returns:
+            dict: store counters, plus requests shed by the concurrency limit
+        """
+        stats = self.store.stats()
+        if self.concurrency is not None:
+            stats['shed'] = self.concurrency.shed
+        return stats
+
+
+def too_many_requests(retry_after):
+    """Build the 429 response for a request over a rate limit."""
+    response = error_response("Too many requests", 429)
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+def _username_key(username):
+    """Fixed-size bucket key for a login username."""
+    return hashlib.blake2b(username.encode(), digest_size=8).hexdigest()
+
+
+def register_rate_limiting(app):
+    """Enforce rate limits and the concurrency cap for an app.
+
+    Sets ``app.rate_limiter`` (None when disabled). Admission runs before
+    every other hook; the policy checks apply the per-sub limit through
+    ``app.rate_limiter`` as soon as they have verified the JWT.
+
+    Args:
+        app: Flask application instance
+    """
+    config = app.config
+    if not config['RATE_LIMIT_ENABLED']:
+        app.rate_limiter = None
+        return
+
+    limits = config['RATE_LIMITS']
+    idle_ttl = max(burst / rate for rate, burst in limits.values())
+    concurrency = (ConcurrencyLimiter(config['MAX_CONCURRENT_REQUESTS'])
+                   if config['MAX_CONCURRENT_REQUESTS'] else None)
+    limiter = app.rate_limiter = RateLimiter(
+        LocalRateLimitStore(config['RATE_LIMIT_MAX_KEYS'], idle_ttl),
+        limits, concurrency, config['RATE_LIMIT_PROXY_COUNT'])
+
+    def admit():
+        if concurrency is not None:
+            if not concurrency.try_acquire():
+                response = error_response("Service unavailable", 503)
+                response.headers['Retry-After'] = '1'
+                return response
+            g.admitted = True
+
+        ip = limiter.client_ip()
+        wait = limiter.check('ip', ip)
+        if not wait and request.endpoint == 'auth.login':
+            wait = limiter.check('login_ip', ip)
+            data = request.get_json(silent=True)
+            username = data.get('username') if isinstance(data, dict) else None
+            if not wait and isinstance(username, str):
+                wait = limiter.check('login_username', _username_key(username))
+        if wait:
+            return too_many_requests(wait)
+
+    # Shed load before any other hook (metrics, authentication) runs
+    app.before_request_funcs.setdefault(None, []).insert(0, admit)
+
+    if concurrency is not None:
+        @app.teardown_request
+        def release_slot(exc):
+            if g.pop('admitted', False):
+                concurrency.release()
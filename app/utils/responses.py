@@ -1,14 +1,21 @@
-from flask import jsonify
+from flask import current_app
+
+from app.utils.json_provider import encode_error
 
 def error_response(message: str, status_code: int):
     """
     Standardized error payload.
 
+    The body is pre-encoded once per distinct message and reused.
+
     Args:
         message: The error message string (without the "Error": prefix).
         status_code: HTTP status code to return.
 
     Returns:
-        A Flask response tuple with JSON body {"Error": message} and the given status_code.
+        A Flask response with JSON body {"Error": message} and the given status_code.
     """
-    return jsonify({"Error": message}), status_code
+    return current_app.response_class(
+        encode_error(message, current_app.json.use_orjson), status=status_code,
+        mimetype="application/json"
+    )
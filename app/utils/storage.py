@@ -1,10 +1,269 @@
-from google.cloud import storage
+"""Avatar object storage.
+
+Uploads and downloads are streamed in fixed-size chunks so worker memory
+stays flat regardless of image size. Two backends share one interface:
+``GCSStorage`` (the shared Storage client) and ``LocalStorage`` (a
+directory on disk, for development and tests), selected by
+``STORAGE_BACKEND``.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+
 from flask import current_app
+from google.api_core.exceptions import NotFound, PreconditionFailed
+
+from app.utils.metrics import timed
+
+
+class StoredObject:
+    """An object opened for streaming download."""
+
+    def __init__(self, chunks, content_type, size, generation):
+        """Initialize the object.
+
+        Args:
+            chunks: Iterator of byte chunks
+            content_type: MIME type of the object
+            size: Size in bytes, or None if unknown
+            generation: Opaque version that changes on every re-upload
+        """
+        self.chunks = chunks
+        self.content_type = content_type
+        self.size = size
+        self.generation = generation
+
+
+class GCSStorage:
+    """Google Cloud Storage backend using resumable, chunked transfers."""
+
+    def __init__(self, clients, bucket_name, chunk_size):
+        """Initialize the backend.
+
+        Args:
+            clients: The app's ClientRegistry
+            bucket_name: Bucket holding the objects
+            chunk_size: Transfer chunk size in bytes (multiple of 256 KiB)
+        """
+        self.clients = clients
+        self.bucket_name = bucket_name
+        self.chunk_size = chunk_size
+
+    @property
+    def bucket(self):
+        """The bucket, bound to this process's Storage client."""
+        return self.clients.storage.bucket(self.bucket_name)
+
+    def upload(self, name, stream, content_type):
+        """Upload a stream as a resumable upload, one chunk at a time.
+
+        Args:
+            name: Object name
+            stream: Readable binary file object
+            content_type: MIME type of the object
+
+        Returns:
+            str: Generation of the new object
+        """
+        blob = self.bucket.blob(name, chunk_size=self.chunk_size)
+        blob.upload_from_file(stream, content_type=content_type)
+        return str(blob.generation)
+
+    def open(self, name, generation=None):
+        """Open an object for chunked download.
+
+        Args:
+            name: Object name
+            generation: Only open the object if this is its live generation
+
+        Returns:
+            StoredObject or None if the object doesn't exist or has another
+            generation
+        """
+        try:
+            blob = self.bucket.get_blob(
+                name, if_generation_match=int(generation) if generation else None)
+        except PreconditionFailed:
+            return None
+        if blob is None:
+            return None
+
+        # The download URL carries blob.generation, so every chunk comes
+        # from the generation whose metadata is returned
+
+        reader = blob.open('rb', chunk_size=self.chunk_size)
+        return StoredObject(_iter_chunks(reader, self.chunk_size),
+                            blob.content_type, blob.size, str(blob.generation))
+
+    def delete(self, name):
+        """Delete an object if it exists.
+
+        Args:
+            name: Object name
+        """
+        try:
+            self.bucket.blob(name).delete()
+        except NotFound:
+            pass
+
+
+class LocalStorage:
+    """Filesystem backend storing each object as one file: a JSON metadata
+    line followed by the object's bytes."""
+
+    def __init__(self, root, chunk_size):
+        """Initialize the backend.
+
+        Args:
+            root: Directory holding the objects
+            chunk_size: Copy chunk size in bytes
+        """
+        self.root = root
+        self.chunk_size = chunk_size
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def upload(self, name, stream, content_type):
+        """Copy a stream to disk in chunks, replacing the object atomically.
+
+        The metadata and data are written to a temporary file that is then
+        moved into place, so readers see either the old object or the new
+        one, never a mix of the two.
+
+        Args:
+            name: Object name
+            stream: Readable binary file object
+            content_type: MIME type of the object
+
+        Returns:
+            str: Generation of the new object
+        """
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        generation = str(time.time_ns())
+        header = json.dumps({'content_type': content_type, 'generation': generation})
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header.encode() + b'\n')
+                shutil.copyfileobj(stream, f, self.chunk_size)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        return generation
+
+    def open(self, name, generation=None):
+        """Open an object for chunked download.
+
+        Args:
+            name: Object name
+            generation: Only open the object if it has this generation
+
+        Returns:
+            StoredObject or None if the object doesn't exist or has another
+            generation
+        """
+        try:
+            reader = open(self._path(name), 'rb')
+        except FileNotFoundError:
+            return None
+
+        header = reader.readline()
+        meta = json.loads(header)
+        if generation is not None and meta['generation'] != generation:
+            reader.close()
+            return None
+
+        size = os.fstat(reader.fileno()).st_size - len(header)
+        return StoredObject(_iter_chunks(reader, self.chunk_size), meta['content_type'],
+                            size, meta['generation'])
+
+    def delete(self, name):
+        """Delete an object if it exists.
+
+        Args:
+            name: Object name
+        """
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+
+def _iter_chunks(reader, chunk_size):
+    """Yield a file object's contents chunk by chunk, then close it."""
+    try:
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        reader.close()
+
+
+def create_storage(app):
+    """Build the avatar storage backend configured for an app.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        GCSStorage or LocalStorage
+    """
+    chunk_size = app.config['STORAGE_CHUNK_SIZE']
+    if app.config['STORAGE_BACKEND'] == 'local':
+        return LocalStorage(app.config['LOCAL_STORAGE_DIR'], chunk_size)
+    return GCSStorage(app.clients, app.config['STORAGE_BUCKET'], chunk_size)
+
+
+def avatar_object_name(user_id):
+    """Get the object name of a user's avatar."""
+    return f"avatars/{user_id}"
+
 
 def upload_avatar(user_id, file_stream, content_type):
-    client = storage.Client()
-    bucket_name = current_app.config["STORAGE_BUCKET"]
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(f"avatars/{user_id}")
-    blob.upload_from_string(file_stream.read(), content_type=content_type)
-    return blob.public_url
+    """Stream a user's avatar to storage.
+
+    Args:
+        user_id: The user's ID
+        file_stream: Readable binary file object
+        content_type: MIME type of the image
+
+    Returns:
+        str: Generation of the stored avatar
+    """
+    with timed('storage.upload'):
+        return current_app.avatar_storage.upload(
+            avatar_object_name(user_id), file_stream, content_type)
+
+
+def open_avatar(user_id, generation=None):
+    """Open a user's avatar for streaming download.
+
+    Args:
+        user_id: The user's ID
+        generation: Only open the avatar if it still has this generation
+
+    Returns:
+        StoredObject or None if it doesn't exist or has another generation
+    """
+    with timed('storage.open'):
+        return current_app.avatar_storage.open(avatar_object_name(user_id), generation)
+
+
+def delete_avatar(user_id):
+    """Delete a user's avatar from storage.
+
+    Args:
+        user_id: The user's ID
+    """
+    with timed('storage.delete'):
+        current_app.avatar_storage.delete(avatar_object_name(user_id))
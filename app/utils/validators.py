@@ -0,0 +1,76 @@
+"""Request body validation helpers."""
+from app.errors.exceptions import BadRequestError
+
+# Required course properties and their expected types
+COURSE_FIELDS = {
+    'subject': str,
+    'number': int,
+    'title': str,
+    'term': str,
+    'instructor_id': int,
+}
+
+# Datastore can't index a string longer than 1500 bytes (UTF-8), and course
+# strings are indexed for listing and filtering
+MAX_INDEXED_STRING_BYTES = 1500
+
+
+def validate_course_data(data, partial=False):
+    """Validate a course request body.
+    
+    Args:
+        data: Parsed JSON body
+        partial: Allow a subset of fields (PATCH)
+        
+    Returns:
+        dict: The course fields present in the body
+        
+    Raises:
+        BadRequestError: If a field is missing, has the wrong type or is a
+            string too long to index
+    """
+    if not isinstance(data, dict):
+        raise BadRequestError('Request body must be a JSON object')
+    
+    fields = {}
+    for name, expected_type in COURSE_FIELDS.items():
+        if name not in data:
+            if partial:
+                continue
+            raise BadRequestError(f'{name} is required')
+        
+        value = data[name]
+        # bool is a subclass of int but never a valid course number or ID
+        if not isinstance(value, expected_type) or isinstance(value, bool):
+            raise BadRequestError(f'{name} must be a {expected_type.__name__}')
+        if expected_type is str and len(value.encode()) > MAX_INDEXED_STRING_BYTES:
+            raise BadRequestError(f'{name} must be at most {MAX_INDEXED_STRING_BYTES} bytes')
+        fields[name] = value
+    
+    return fields
+
+
+def validate_enrollment_data(data):
+    """Validate a roster update body of the form {"add": [...], "remove": [...]}.
+    
+    Args:
+        data: Parsed JSON body
+        
+    Returns:
+        tuple: (student IDs to add, student IDs to remove), de-duplicated
+        
+    Raises:
+        BadRequestError: If the body or its ID lists are malformed
+    """
+    if not isinstance(data, dict):
+        raise BadRequestError('Request body must be a JSON object')
+    
+    lists = []
+    for name in ('add', 'remove'):
+        ids = data.get(name, [])
+        if not isinstance(ids, list) or not all(
+                isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise BadRequestError(f'{name} must be a list of user IDs')
+        lists.append(list(dict.fromkeys(ids)))
+    
+    return lists[0], lists[1]
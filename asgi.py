@@ -0,0 +1,17 @@
+"""ASGI entry point.
+
+The Flask app stays synchronous: each request runs on one thread of a
+pool of ASGI_MAX_THREADS (see app/utils/aio.py). Serve with an ASGI
+server, e.g.:
+    uvicorn asgi:app --host 127.0.0.1 --port 8080
+"""
+import os
+from app import create_app
+from app.utils.aio import ThreadPoolWsgiToAsgi
+
+# Get configuration name from environment variable
+config_name = os.environ.get('FLASK_ENV', 'development')
+
+# Create the Flask application and wrap it for ASGI servers
+flask_app = create_app(config_name)
+app = ThreadPoolWsgiToAsgi(flask_app, max_threads=flask_app.config['ASGI_MAX_THREADS'])
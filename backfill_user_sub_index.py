@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+backfill_user_sub_index.py
+
+Build the `user_sub_index` lookup kind from existing `users` entities.
+Each index entity is keyed by the user's Auth0 `sub` and stores the user's ID in `user_id`,
+so the API can resolve a JWT to a user with a strongly consistent key lookup.
+Safe to re-run: index entities are keyed by sub, so existing ones are overwritten in place.
+After running this you can set USER_SUB_INDEX_QUERY_FALLBACK = False in config.py.
+"""
+
+from google.cloud import datastore
+
+# If you are using the Datastore emulator, ensure these environment variables are set:
+#   export DATASTORE_EMULATOR_HOST="localhost:8081"
+#   export DATASTORE_PROJECT_ID="your-test-project-id"
+#
+# Otherwise, the script will use your GCP project configured in GOOGLE_CLOUD_PROJECT.
+
+USERS_KIND = "users"
+INDEX_KIND = "user_sub_index"
+
+# Datastore accepts at most 500 entities per commit
+BATCH_SIZE = 500
+
+
+def main():
+    client = datastore.Client()
+
+    # Only the sub is needed; the user ID comes from the key
+    query = client.query(kind=USERS_KIND)
+    query.projection = ["sub"]
+
+    batch = []
+    written = 0
+    skipped = 0
+    for user in query.fetch():
+        if not user["sub"]:
+            skipped += 1
+            continue
+
+        entity = datastore.Entity(key=client.key(INDEX_KIND, user["sub"]))
+        entity["user_id"] = user.key.id
+        batch.append(entity)
+
+        if len(batch) == BATCH_SIZE:
+            client.put_multi(batch)
+            written += len(batch)
+            batch = []
+
+    if batch:
+        client.put_multi(batch)
+        written += len(batch)
+
+    print(f"Wrote {written} '{INDEX_KIND}' entities ({skipped} users without a sub skipped).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,611 @@
+"""End-to-end API benchmark against the Datastore emulator.
+
+Boots ``create_app('testing')`` with stub identity-provider endpoints (JWKS
+and ``/oauth/token``, served in-process) and avatar storage in a temporary
+directory (or real GCS / fake-gcs-server with ``--storage gcs``). It seeds
+users, courses, enrollments and avatars in a fresh Datastore namespace,
+serves the app over HTTP, and replays a traffic mix from ``--concurrency``
+closed-loop clients.
+
+Reported per operation and overall: throughput, p50/p95/p99 latency, error
+count, and Datastore RPCs per request (counted at the gRPC API layer).
+Results are written as JSON (``--output``) and compared with a stored
+baseline (``--baseline``). Any regression beyond the tolerances, or a
+missing baseline, makes the run exit with status 1. Create or refresh the
+baseline with ``--update-baseline`` on the reference machine.
+
+Usage:
+    gcloud beta emulators datastore start --no-store-on-disk &
+    export DATASTORE_EMULATOR_HOST=localhost:8081
+    python benchmarks/e2e.py --mix default --duration 30 --concurrency 16 \\
+        --output bench_results.json --baseline benchmarks/baseline.json
+
+    # Replay a recorded mix instead (see benchmarks/recordings/sample.jsonl)
+    python benchmarks/e2e.py --replay benchmarks/recordings/sample.jsonl
+"""
+import argparse
+import base64
+import contextvars
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+KID = 'bench-key'
+DOMAIN = 'bench.auth0.test'
+AUDIENCE = 'tarpaulin-bench'
+PASSWORD = 'bench-password'
+
+# A 1x1 PNG
+AVATAR_BYTES = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==')
+
+# Synthetic mixes: operation -> relative weight
+MIXES = {
+    'default': {'login': 2, 'list_users': 5, 'get_user': 50, 'get_user_admin': 10,
+                'get_avatar': 20, 'upload_avatar': 3, 'list_courses': 10},
+    'dashboard': {'list_users_conditional': 60, 'list_users': 10, 'list_courses': 30},
+    'login': {'login': 100},
+    'avatars': {'get_avatar': 80, 'upload_avatar': 20},
+}
+
+# Regression gates (relative to the baseline)
+DEFAULT_TOLERANCE = 0.15
+LATENCY_SLACK_MS = 1.0
+RPC_SLACK = 0.05
+ERROR_RATE_SLACK = 0.01
+
+
+# --- Stub identity provider ----------------------------------------------------
+
+class IdentityProvider:
+    """Signing key plus an HTTP server for JWKS and the password grant."""
+
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.token_requests = 0
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_pem = self.private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption())
+
+        numbers = self.private_key.public_key().public_numbers()
+        self.jwks = json.dumps({'keys': [{
+            'kty': 'RSA', 'kid': KID, 'use': 'sig', 'alg': 'RS256',
+            'n': _b64url(numbers.n), 'e': _b64url(numbers.e),
+        }]}).encode()
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def issue(self, sub, lifetime=3600):
+        """Sign an access token for a sub."""
+        now = int(time.time())
+        claims = {'sub': sub, 'aud': AUDIENCE, 'iss': f'https://{DOMAIN}/',
+                  'iat': now, 'exp': now + lifetime}
+        return jwt.encode(claims, self.private_pem, algorithm='RS256', headers={'kid': KID})
+
+    def _handler(self):
+        idp = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._send(200, idp.jwks)
+
+            def do_POST(self):
+                idp.token_requests += 1
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                time.sleep(idp.latency)
+                if body.get('password') != PASSWORD:
+                    self._send(403, b'{"error":"invalid_grant"}')
+                    return
+                token = idp.issue(f"auth0|{body['username']}")
+                self._send(200, json.dumps({'access_token': token, 'expires_in': 86400}).encode())
+
+        return Handler
+
+
+def _b64url(number):
+    raw = number.to_bytes((number.bit_length() + 7) // 8, 'big')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+# --- Datastore RPC counting ----------------------------------------------------
+
+_rpc_counter = contextvars.ContextVar('bench_rpc_counter', default=None)
+
+RPC_METHODS = ('lookup', 'run_query', 'run_aggregation_query', 'commit',
+               'begin_transaction', 'rollback', 'allocate_ids', 'reserve_ids')
+
+
+class CountingDatastoreAPI:
+    """Proxy over the client's gRPC API counting calls for the current request."""
+
+    def __init__(self, api):
+        self._api = api
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if name not in RPC_METHODS:
+            return attr
+
+        def counted(*args, **kwargs):
+            counter = _rpc_counter.get()
+            if counter is not None:
+                counter[0] += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+def install_rpc_counter(app):
+    """Wrap the app's Datastore API and tag each request with an RPC counter.
+
+    The ``X-Bench-Op`` request header names the operation; counts are
+    aggregated per operation into the returned dict.
+    """
+    client = app.clients.datastore
+    client._datastore_api_internal = CountingDatastoreAPI(client._datastore_api)
+
+    totals = defaultdict(lambda: [0, 0])   # op -> [requests, rpcs]
+    lock = threading.Lock()
+    wsgi_app = app.wsgi_app
+
+    def counting_app(environ, start_response):
+        counter = [0]
+        token = _rpc_counter.set(counter)
+        try:
+            return wsgi_app(environ, start_response)
+        finally:
+            _rpc_counter.reset(token)
+            op = environ.get('HTTP_X_BENCH_OP')
+            if op:
+                with lock:
+                    totals[op][0] += 1
+                    totals[op][1] += counter[0]
+
+    app.wsgi_app = counting_app
+    return totals
+
+
+# --- Fixtures ------------------------------------------------------------------
+
+class Fixtures:
+    """Seeded users (with pre-issued tokens), courses and avatar owners."""
+
+    def __init__(self, admin, users, avatar_owners, tokens):
+        self.admin = admin
+        self.users = users
+        self.avatar_owners = avatar_owners
+        self.tokens = tokens
+
+
+def seed(app, idp, args):
+    """Write the benchmark data set through the models."""
+    from app.models.course import Course
+    from app.models.enrollment import Enrollment
+    from app.models.user import User
+    from app.services.avatar_service import set_avatar
+
+    rng = random.Random(args.seed)
+    with app.test_request_context():
+        users = []
+        for i in range(args.users):
+            role = 'admin' if i == 0 else 'instructor' if i % 20 == 1 else 'student'
+            users.append(User(sub=f'auth0|bench-{i}', role=role))
+        User.save_all(users, parallel=True)
+
+        instructors = [u for u in users if u.role == 'instructor']
+        students = [u for u in users if u.role == 'student']
+        courses = [Course(subject=rng.choice(['CS', 'MATH', 'PH', 'BIO']),
+                          number=rng.randrange(100, 500), title=f'Course {j}',
+                          term='fall-25', instructor_id=rng.choice(instructors).id)
+                   for j in range(args.courses)]
+        Course.save_all(courses, parallel=True)
+
+        for course in courses:
+            roster = rng.sample(students, min(len(students), args.roster_size))
+            Enrollment.apply_roster_diff(course.id, add=[s.id for s in roster])
+
+        avatar_owners = rng.sample(users, max(1, len(users) // 5))
+        for user in avatar_owners:
+            set_avatar(user.id, io.BytesIO(AVATAR_BYTES), 'image/png')
+
+    tokens = {user.id: idp.issue(user.sub) for user in users}
+    return Fixtures(users[0], users, avatar_owners, tokens)
+
+
+# --- Operations ----------------------------------------------------------------
+
+class Client:
+    """One closed-loop client: a session plus per-client state."""
+
+    def __init__(self, base_url, fixtures, seed):
+        self.base_url = base_url
+        self.fixtures = fixtures
+        self.session = requests.Session()
+        self.rng = random.Random(seed)
+        self.etags = {}
+
+    def auth(self, user):
+        return {'Authorization': f'Bearer {self.fixtures.tokens[user.id]}'}
+
+    def request(self, op, method, path, user=None, headers=None, **kwargs):
+        headers = dict(headers or {}, **{'X-Bench-Op': op})
+        if user is not None:
+            headers.update(self.auth(user))
+        return self.session.request(method, self.base_url + path, headers=headers, **kwargs)
+
+    def non_admin(self):
+        return self.rng.choice(self.fixtures.users[1:])
+
+    # Each operation returns (response, expected status codes)
+
+    def login(self):
+        index = self.rng.randrange(len(self.fixtures.users))
+        response = self.request('login', 'POST', '/users/login',
+                                json={'username': f'bench-{index}', 'password': PASSWORD})
+        return response, (200,)
+
+    def list_users(self):
+        return self.request('list_users', 'GET', '/users', self.fixtures.admin), (200,)
+
+    def list_users_conditional(self):
+        etag = self.etags.get('/users')
+        headers = {'If-None-Match': etag} if etag else None
+        response = self.request('list_users_conditional', 'GET', '/users',
+                                self.fixtures.admin, headers=headers)
+        if 'ETag' in response.headers:
+            self.etags['/users'] = response.headers['ETag']
+        return response, (200, 304)
+
+    def get_user(self):
+        user = self.non_admin()
+        return self.request('get_user', 'GET', f'/users/{user.id}', user), (200,)
+
+    def get_user_admin(self):
+        user = self.rng.choice(self.fixtures.users)
+        return self.request('get_user_admin', 'GET', f'/users/{user.id}',
+                            self.fixtures.admin), (200,)
+
+    def get_avatar(self):
+        user = self.rng.choice(self.fixtures.avatar_owners)
+        return self.request('get_avatar', 'GET', f'/users/{user.id}/avatar', user), (200,)
+
+    def upload_avatar(self):
+        user = self.rng.choice(self.fixtures.avatar_owners)
+        files = {'file': ('avatar.png', AVATAR_BYTES, 'image/png')}
+        return self.request('upload_avatar', 'POST', f'/users/{user.id}/avatar', user,
+                            files=files), (200,)
+
+    def list_courses(self):
+        return self.request('list_courses', 'GET', '/courses?limit=20'), (200,)
+
+    def replay(self, entry):
+        """Replay one recorded request (see ``load_recording``)."""
+        role = entry.get('as')
+        user = None
+        if role == 'admin':
+            user = self.fixtures.admin
+        elif role:
+            user = self.rng.choice([u for u in self.fixtures.users if u.role == role])
+
+        any_user = self.rng.choice(self.fixtures.users)
+        path = entry['path'].format(user_id=user.id if user else any_user.id,
+                                    any_user_id=any_user.id)
+        response = self.request(entry.get('op', entry['path']), entry['method'], path, user,
+                                headers=entry.get('headers'), json=entry.get('json'))
+        return response, tuple(entry.get('expect', (200,)))
+
+
+def load_recording(path):
+    """Load a recorded mix: JSON lines of ``method``, ``path`` and optional
+    ``op``, ``as`` (admin/instructor/student), ``json``, ``headers`` and
+    ``expect``. ``{user_id}`` in a path is the acting user's ID and
+    ``{any_user_id}`` a random user's."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- Load generation -----------------------------------------------------------
+
+def run_load(base_url, fixtures, args):
+    """Run the clients and collect (op, latency seconds, ok) samples."""
+    samples = []
+    lock = threading.Lock()
+    start = time.monotonic()
+    measure_from = start + args.warmup
+    deadline = measure_from + args.duration
+
+    if args.replay:
+        recording = itertools.cycle(load_recording(args.replay))
+        next_entry = threading.Lock()
+    else:
+        weights = MIXES[args.mix]
+        ops, op_weights = list(weights), list(weights.values())
+
+    def worker(n):
+        client = Client(base_url, fixtures, seed=args.seed * 1000 + n)
+        local = []
+        while time.monotonic() < deadline:
+            if args.replay:
+                with next_entry:
+                    entry = next(recording)
+                call, op = (lambda: client.replay(entry)), entry.get('op', entry['path'])
+            else:
+                op = client.rng.choices(ops, op_weights)[0]
+                call = getattr(client, op)
+
+            began = time.monotonic()
+            try:
+                response, expected = call()
+                ok = response.status_code in expected
+            except requests.RequestException:
+                ok = False
+            ended = time.monotonic()
+            if began >= measure_from:
+                local.append((op, ended - began, ok))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of a sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, duration):
+    """Aggregate samples into throughput, latency percentiles and errors."""
+    latencies = sorted(latency * 1000 for _, latency, _ in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, ok in samples if not ok),
+        'throughput_rps': len(samples) / duration,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+    }
+
+
+def build_results(samples, rpc_totals, idp, args):
+    by_op = defaultdict(list)
+    for sample in samples:
+        by_op[sample[0]].append(sample)
+
+    ops = {}
+    for op, op_samples in sorted(by_op.items()):
+        ops[op] = summarize(op_samples, args.duration)
+        requests_seen, rpcs = rpc_totals.get(op, (0, 0))
+        ops[op]['rpcs_per_request'] = rpcs / requests_seen if requests_seen else 0.0
+
+    return {
+        'meta': {
+            'mix': args.replay or args.mix,
+            'duration_s': args.duration,
+            'concurrency': args.concurrency,
+            'users': args.users,
+            'courses': args.courses,
+            'server': args.server,
+            'python': platform.python_version(),
+            'commit': _git_commit(),
+            'idp_token_requests': idp.token_requests,
+        },
+        'overall': summarize(samples, args.duration),
+        'ops': ops,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- Baseline comparison -------------------------------------------------------
+
+def compare(results, baseline, tolerance):
+    """List the regressions of ``results`` against ``baseline``."""
+    failures = []
+    if baseline['meta']['mix'] != results['meta']['mix']:
+        return [f"baseline was recorded with mix {baseline['meta']['mix']!r}, "
+                f"not {results['meta']['mix']!r}"]
+
+    base_rps = baseline['overall']['throughput_rps']
+    rps = results['overall']['throughput_rps']
+    if rps < base_rps * (1 - tolerance):
+        failures.append(f'overall throughput {rps:.1f} rps < baseline {base_rps:.1f} rps')
+
+    for op, base in baseline['ops'].items():
+        current = results['ops'].get(op)
+        if current is None:
+            failures.append(f'{op}: no samples (baseline has {base["requests"]})')
+            continue
+
+        for metric in ('p95_ms', 'p99_ms'):
+            limit = base[metric] * (1 + tolerance) + LATENCY_SLACK_MS
+            if current[metric] > limit:
+                failures.append(f'{op}: {metric} {current[metric]:.1f} > {limit:.1f}')
+
+        if current['rpcs_per_request'] > base['rpcs_per_request'] + RPC_SLACK:
+            failures.append(f'{op}: RPCs/request {current["rpcs_per_request"]:.2f} > '
+                            f'baseline {base["rpcs_per_request"]:.2f}')
+
+        base_rate = base['errors'] / base['requests'] if base['requests'] else 0.0
+        rate = current['errors'] / current['requests'] if current['requests'] else 0.0
+        if rate > base_rate + ERROR_RATE_SLACK:
+            failures.append(f'{op}: error rate {rate:.2%} > baseline {base_rate:.2%}')
+
+    return failures
+
+
+def print_report(results):
+    print(f'\n{"operation":24} {"req":>7} {"err":>5} {"rps":>8} {"p50":>8} {"p95":>8} '
+          f'{"p99":>8} {"rpc/req":>8}')
+    rows = list(results['ops'].items()) + [('overall', results['overall'])]
+    for op, stats in rows:
+        print(f'{op:24} {stats["requests"]:7} {stats["errors"]:5} '
+              f'{stats["throughput_rps"]:8.1f} {stats["p50_ms"]:8.2f} {stats["p95_ms"]:8.2f} '
+              f'{stats["p99_ms"]:8.2f} {stats.get("rpcs_per_request", 0.0):8.2f}')
+
+
+# --- Main ----------------------------------------------------------------------
+
+def create_bench_app(idp, args):
+    """Configure the environment for the testing config and build the app."""
+    os.environ.setdefault('DATASTORE_EMULATOR_HOST', 'localhost:8081')
+    os.environ.setdefault('GOOGLE_CLOUD_PROJECT',
+                          os.environ.get('DATASTORE_PROJECT_ID', 'tarpaulin-bench'))
+    os.environ.update({
+        'AUTH0_DOMAIN': DOMAIN,
+        'AUTH0_AUDIENCE': AUDIENCE,
+        'AUTH0_CLIENT_ID': 'bench-client',
+        'AUTH0_CLIENT_SECRET': 'bench-secret',
+        'AUTH0_JWKS_URL': f'{idp.url}/.well-known/jwks.json',
+        'AUTH0_TOKEN_URL': f'{idp.url}/oauth/token',
+        # Fresh namespace per run, so runs never see each other's data
+        'DATASTORE_NAMESPACE': f'bench-{int(time.time())}-{os.getpid()}',
+        'STORAGE_BACKEND': args.storage,
+    })
+    if args.storage == 'local':
+        os.environ['LOCAL_STORAGE_DIR'] = tempfile.mkdtemp(prefix='tarpaulin-bench-')
+
+    from app import create_app
+    return create_app('testing')
+
+
+def serve(app, server):
+    """Serve the app over HTTP in a background thread; return its base URL."""
+    if server == 'asgi':
+        import socket
+        import uvicorn
+        from app.utils.aio import ThreadPoolWsgiToAsgi
+
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        asgi_app = ThreadPoolWsgiToAsgi(app, app.config['ASGI_MAX_THREADS'])
+        uv = uvicorn.Server(uvicorn.Config(asgi_app, host='127.0.0.1', port=port,
+                                           log_level='warning', lifespan='off'))
+        threading.Thread(target=uv.run, daemon=True).start()
+        while not uv.started:
+            time.sleep(0.05)
+        return f'http://127.0.0.1:{port}'
+
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    http_server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{http_server.server_port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end API benchmark.')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='default')
+    parser.add_argument('--replay', help='JSON-lines recording to replay instead of --mix')
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured seconds first')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--courses', type=int, default=50)
+    parser.add_argument('--roster-size', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--storage', choices=('local', 'gcs'), default='local',
+                        help="'gcs' uses STORAGE_BUCKET (and STORAGE_EMULATOR_HOST if set)")
+    parser.add_argument('--idp-latency-ms', type=float, default=0,
+                        help='delay added to each stub token request')
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--baseline', default=os.path.join(ROOT, 'benchmarks', 'baseline.json'))
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    # Fail before the run, not after it, when there is nothing to gate against
+    if not args.update_baseline and not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --update-baseline to create one.')
+        return 1
+
+    idp = IdentityProvider(args.idp_latency_ms)
+    app = create_bench_app(idp, args)
+    rpc_totals = install_rpc_counter(app)
+
+    print(f'Seeding {args.users} users and {args.courses} courses...')
+    fixtures = seed(app, idp, args)
+    base_url = serve(app, args.server)
+
+    print(f'Running {args.replay or args.mix!r} for {args.warmup:g}s warm-up + '
+          f'{args.duration:g}s with {args.concurrency} clients ({args.server})')
+    # Only count RPCs of measured requests
+    threading.Timer(args.warmup, rpc_totals.clear).start()
+    samples = run_load(base_url, fixtures, args)
+
+    results = build_results(samples, rpc_totals, idp, args)
+    print_report(results)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nResults written to {args.output}')
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Baseline updated: {args.baseline}')
+        return 0
+
+    with open(args.baseline) as f:
+        failures = compare(results, json.load(f), args.tolerance)
+    if failures:
+        print('\nRegressions against baseline:')
+        for failure in failures:
+            print(f'  - {failure}')
+        return 1
+
+    print('\nNo regressions against baseline.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Benchmark model loading and serialization on a large user listing.
+
+Compares the legacy ``__dict__`` model path (``dict(entity)`` -> ``cls(**data)``
+-> walk ``__dict__``) with the declared-field ``__slots__`` model, plus
+serializing listings straight from entities.
+Runs offline on in-memory ``datastore.Entity`` objects; no emulator needed.
+
+Usage:
+    python benchmarks/model_serialization.py [--users 100000] [--repeat 5]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.cloud import datastore  # noqa: E402
+
+from app.models.base import BaseModel  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+class LegacyUser(BaseModel):
+    """User as it was before declared fields: attributes in ``__dict__``."""
+    
+    KIND = 'users'
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sub = kwargs.get('sub')
+        self.role = kwargs.get('role')
+        self.avatar_filename = kwargs.get('avatar_filename')
+        self.avatar_generation = kwargs.get('avatar_generation')
+        self._loaded_sub = self.sub
+
+
+def make_entities(count):
+    """Build ``count`` user entities shaped like the real ``users`` kind."""
+    roles = ('student',) * 8 + ('instructor', 'admin')
+    entities = []
+    for i in range(count):
+        entity = datastore.Entity(key=datastore.Key('users', i + 1, project='bench'))
+        entity['sub'] = f'auth0|{i:024x}'
+        entity['role'] = roles[i % len(roles)]
+        if i % 5 == 0:
+            entity['avatar_filename'] = f'avatars/{i + 1}'
+            entity['avatar_generation'] = str(1700000000000000000 + i)
+        entities.append(entity)
+    return entities
+
+
+def legacy_listing(entities):
+    """``get_all_users`` before: a dict per entity built by hand."""
+    return [{'id': e.key.id, 'role': e['role'], 'sub': e['sub']} for e in entities]
+
+
+def serializer_listing(entities):
+    """``get_all_users`` now: the entity serializer."""
+    serialize = User.serializer(('role', 'sub'))
+    return [serialize(e) for e in entities]
+
+
+CASES = [
+    ('load models (legacy __dict__)',
+     lambda entities: [LegacyUser.from_entity(e) for e in entities]),
+    ('load models (__slots__)',
+     lambda entities: [User.from_entity(e) for e in entities]),
+    ('load + to_dict (legacy)',
+     lambda entities: [BaseModel.to_dict(LegacyUser.from_entity(e)) for e in entities]),
+    ('load + to_dict (__slots__)',
+     lambda entities: [BaseModel.to_dict(User.from_entity(e)) for e in entities]),
+    ('listing dicts (hand-built)', legacy_listing),
+    ('listing dicts (serializer)', serializer_listing),
+]
+
+
+def measure(fn, entities, repeat):
+    """Return (best seconds, bytes retained by the result)."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn(entities)
+        best = min(best, time.perf_counter() - start)
+        del result
+    
+    gc.collect()
+    tracemalloc.start()
+    result = fn(entities)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return best, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    entities = make_entities(args.users)
+    print(f'{args.users} users, best of {args.repeat}\n')
+    print(f'{"case":34} {"time (ms)":>10} {"memory (MiB)":>13}')
+    for name, fn in CASES:
+        seconds, retained = measure(fn, entities, args.repeat)
+        print(f'{name:34} {seconds * 1000:10.1f} {retained / 2**20:13.1f}')
+
+
+if __name__ == '__main__':
+    main()
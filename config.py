@@ -18,6 +18,19 @@ class Config:
     PROJECT_ID = os.environ.get('GOOGLE_CLOUD_PROJECT')
     STORAGE_BUCKET = os.environ.get('STORAGE_BUCKET')
     
+    # Avatar storage: 'gcs' (STORAGE_BUCKET) or 'local' (LOCAL_STORAGE_DIR)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'gcs')
+    LOCAL_STORAGE_DIR = os.environ.get('LOCAL_STORAGE_DIR', 'local_storage')
+    # Streaming chunk size; GCS resumable uploads need a multiple of 256 KiB
+    STORAGE_CHUNK_SIZE = 256 * 1024
+    
+    # Avatar byte cache (per process) and client caching
+    AVATAR_CACHE_ENABLED = True
+    AVATAR_CACHE_MAX_ENTRIES = 10000
+    AVATAR_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    AVATAR_CACHE_MAX_ITEM_BYTES = 1024 * 1024
+    AVATAR_MAX_AGE = 300
+    
     # Auth0 settings
     AUTH0_DOMAIN = os.environ.get('AUTH0_DOMAIN')
     AUTH0_CLIENT_ID = os.environ.get('AUTH0_CLIENT_ID')
@@ -25,8 +38,123 @@ class Config:
     AUTH0_AUDIENCE = os.environ.get('AUTH0_AUDIENCE')
     ALGORITHMS = ['RS256']
     
+    # Auth0 token endpoint client settings
+    AUTH0_TOKEN_URL = os.environ.get('AUTH0_TOKEN_URL')
+    AUTH0_POOL_SIZE = 10
+    AUTH0_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+    AUTH0_MAX_RETRIES = 2
+    AUTH0_RETRY_BACKOFF = 0.2
+    
+    # Reuse tokens for repeated logins with identical credentials. The TTL
+    # bounds how long a changed password keeps returning cached tokens.
+    LOGIN_CACHE_ENABLED = False
+    LOGIN_CACHE_TTL = 60
+    LOGIN_CACHE_MAX_SIZE = 10000
+    
+    # JWKS key cache settings
+    AUTH0_JWKS_URL = os.environ.get('AUTH0_JWKS_URL')
+    JWKS_CACHE_TTL = int(os.environ.get('JWKS_CACHE_TTL', 600))
+    JWKS_MIN_REFETCH_INTERVAL = 30
+    JWKS_FETCH_TIMEOUT = 5
+    
+    # Verified-token cache settings
+    TOKEN_CACHE_ENABLED = True
+    TOKEN_CACHE_MAX_SIZE = 10000
+    
+    # Identity (sub -> User) cache settings. The TTL bounds how long another
+    # worker's role change can go unnoticed by this process.
+    IDENTITY_CACHE_ENABLED = True
+    IDENTITY_CACHE_TTL = 60
+    IDENTITY_CACHE_MAX_SIZE = 10000
+    
+    # Authorize from role and user-id claims in the verified JWT
+    # (<namespace>role, <namespace>user_id, set by an Auth0 Action from
+    # app_metadata) instead of looking the caller up; tokens without them
+    # fall back to Datastore. A role change only reaches requests bearing
+    # older tokens once they expire, or JWT_ROLE_CLAIMS_MAX_AGE seconds after
+    # issue if sooner (None: token lifetime only).
+    JWT_ROLE_CLAIMS_ENABLED = os.environ.get('JWT_ROLE_CLAIMS_ENABLED', '').lower() in ('1', 'true')
+    JWT_CLAIM_NAMESPACE = os.environ.get('JWT_CLAIM_NAMESPACE', 'https://tarpaulin.example.com/')
+    JWT_ROLE_CLAIMS_MAX_AGE = 3600
+    
+    # Fall back to a property query for subs missing from user_sub_index.
+    # Disable once backfill_user_sub_index.py has been run.
+    USER_SUB_INDEX_QUERY_FALLBACK = True
+    
+    # Datastore client settings. Channel options are gRPC channel arguments,
+    # e.g. {'grpc.keepalive_time_ms': 30000}.
+    DATASTORE_NAMESPACE = os.environ.get('DATASTORE_NAMESPACE')
+    DATASTORE_CLIENT_OPTIONS = None
+    DATASTORE_CHANNEL_OPTIONS = {}
+    
+    # Worker threads for parallel Datastore batch calls
+    DATASTORE_BATCH_WORKERS = 8
+    
+    # Batch and memoize get_by_id/get_many lookups within each request
+    REQUEST_LOADER_ENABLED = True
+    
+    # ASGI serving mode (asgi.py): requests run on a thread pool of this
+    # size, each doing its blocking Datastore/Storage/Auth0 calls in place
+    ASGI_MAX_THREADS = 256
+    
+    # JSON responses: 'auto' uses orjson when installed, else the stdlib
+    # encoder; 'orjson' requires it; 'stdlib' never uses it
+    JSON_ENCODER = 'auto'
+    JSON_SORT_KEYS = False
+    
+    # Read-through cache of listing results (GET /users, GET /courses),
+    # invalidated by collection version; TTL bounds an entry's age
+    COLLECTION_CACHE_ENABLED = True
+    COLLECTION_CACHE_TTL = 300
+    COLLECTION_CACHE_MAX_SIZE = 256
+    
+    # Response compression (br needs the optional brotli package)
+    COMPRESSION_ENABLED = True
+    COMPRESSION_MIN_SIZE = 1024
+    COMPRESSION_MIMETYPES = ('application/json',)
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 4
+    
+    # Per-request instrumentation: RPC/storage/HTTP timings, histograms at
+    # GET /admin/metrics, and (optionally) a Server-Timing response header
+    METRICS_ENABLED = True
+    SERVER_TIMING_ENABLED = True
+    
+    # Level of the app's loggers (DEBUG adds a timing line per request)
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    
+    # Rate limiting and admission control, per worker. Limits are token
+    # buckets of (tokens per second, burst): 'ip' for every request, 'sub'
+    # per authenticated caller, and 'login_ip'/'login_username' for
+    # POST /users/login. Requests beyond MAX_CONCURRENT_REQUESTS in flight
+    # (0 for no cap) are shed with 503. Set RATE_LIMIT_PROXY_COUNT to the
+    # number of proxies appending to X-Forwarded-For (e.g. 1 on App Engine).
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMITS = {
+        'ip': (50, 100),
+        'sub': (20, 50),
+        'login_ip': (5, 20),
+        'login_username': (1, 10),
+    }
+    RATE_LIMIT_MAX_KEYS = 100000
+    RATE_LIMIT_PROXY_COUNT = int(os.environ.get('RATE_LIMIT_PROXY_COUNT', 0))
+    MAX_CONCURRENT_REQUESTS = 200
+    
+    # Opt-in profiling (app/utils/profiling.py). When enabled, admins can
+    # profile single requests with a signed X-Profile header or open a
+    # profiling window; PROFILING_ALL_REQUESTS profiles everything.
+    # PROFILE_MODE is 'cprofile' (pstats files) or 'sample' (collapsed stacks).
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true')
+    PROFILING_ALL_REQUESTS = False
+    PROFILE_MODE = os.environ.get('PROFILE_MODE', 'cprofile')
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+    PROFILE_SAMPLE_INTERVAL = 0.005
+    PROFILE_TOKEN_MAX_AGE = 600
+    PROFILE_WINDOW_MAX_SECONDS = 300
+    
     # Pagination settings
     DEFAULT_PAGE_SIZE = 3
+    MAX_PAGE_SIZE = 100
     
     # API settings
     API_TITLE = 'Tarpaulin API'
@@ -42,12 +170,16 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
+    # Don't expose backend timings to clients
+    SERVER_TIMING_ENABLED = False
 
 
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     DATASTORE_EMULATOR_HOST = 'localhost:8081'
+    # Tests and benchmarks drive all their load from one address
+    RATE_LIMIT_ENABLED = False
 
 
 # Configuration dictionary
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+seed_datastore.py
+
+Generate large, realistic fixtures (users, courses and enrollments) for performance work,
+typically in the Datastore emulator. Unlike setup_datastore.py, which creates the nine users
+the Postman tests expect, this can write millions of entities:
+
+  * users:       a few admins, ~5% instructors, the rest students; each with a sub and its
+                 `user_sub_index` entry, so the API can authenticate them
+  * courses:     subjects and instructors drawn from skewed (Zipf-like) distributions
+  * enrollments: each student takes a small, variable number of courses, favouring
+                 popular ones; stored as `courses/<id>/enrollments/<student_id>` children
+
+Writes are `put_multi` calls of at most 500 entities, fanned out on a thread pool.
+
+Every entity is derived from (--seed, its index) and has a fixed ID in a block
+starting at --id-offset, so re-running with the same arguments overwrites entities in place
+instead of duplicating them. Finished chunks are appended to a checkpoint file, and an
+interrupted run resumes where it stopped.
+
+Usage:
+    export DATASTORE_EMULATOR_HOST="localhost:8081"
+    export DATASTORE_PROJECT_ID="your-test-project-id"
+    python seed_datastore.py --users 1000000 --courses 20000 --workers 16
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from google.cloud import datastore
+
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.models.versions import version_entity
+
+# Datastore accepts at most 500 entities per commit
+BATCH_SIZE = 500
+
+# Each user is written with its user_sub_index entity
+USERS_PER_CHUNK = BATCH_SIZE // 2
+
+# Students per enrollment job; each job splits its puts into 500-entity commits
+STUDENTS_PER_CHUNK = 100
+
+SUBJECTS = [
+    "CS", "MATH", "PH", "BIO", "CHEM", "ECE", "ME", "ENG", "HST", "ECON",
+    "PSY", "SOC", "ART", "MUS", "PHL", "STAT", "GEO", "ANTH", "LING", "WR",
+]
+TERMS = ["fall-24", "winter-25", "spring-25", "summer-25", "fall-25"]
+TITLE_WORDS = [
+    "Introduction", "Advanced", "Topics", "Systems", "Theory", "Methods", "Design",
+    "Analysis", "Foundations", "Applied", "Computational", "Modern", "Seminar",
+]
+
+
+class Plan:
+    """Deterministic layout of the generated data.
+
+    Users 0..n-1 are admins first, then instructors, then students. User i gets
+    ID ``id_offset + i``; course j gets ID ``id_offset + users + j``.
+    """
+
+    def __init__(self, args):
+        self.seed = args.seed
+        self.users = args.users
+        self.courses = args.courses
+        self.admins = max(1, args.users // 100000)
+        self.instructors = max(1, int(args.users * args.instructor_ratio))
+        self.mean_enrollments = args.mean_enrollments
+        self.id_offset = args.id_offset
+
+        self.first_student = self.admins + self.instructors
+        self.subject_weights = _zipf_weights(len(SUBJECTS), 1.1)
+        self.instructor_weights = _zipf_weights(self.instructors, 0.8)
+        self.course_weights = _zipf_weights(self.courses, 0.9)
+
+    def user_id(self, i):
+        return self.id_offset + i
+
+    def course_id(self, j):
+        return self.id_offset + self.users + j
+
+    def role(self, i):
+        if i < self.admins:
+            return "admin"
+        if i < self.first_student:
+            return "instructor"
+        return "student"
+
+    def rng(self, kind, i):
+        """Random generator for one entity, independent of chunking and threads."""
+        return random.Random(f"{self.seed}:{kind}:{i}")
+
+    def fingerprint(self):
+        """Identify the layout, so a checkpoint is only reused for the same data."""
+        fields = [self.seed, self.users, self.courses, self.admins, self.instructors,
+                  self.mean_enrollments, self.id_offset]
+        return hashlib.sha256(json.dumps(fields).encode()).hexdigest()[:16]
+
+
+def _zipf_weights(n, s):
+    """Cumulative Zipf weights for random.choices over n ranked items."""
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** s
+        cumulative.append(total)
+    return cumulative
+
+
+class Checkpoint:
+    """Append-only record of finished chunks, one ``phase chunk`` per line."""
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path) as f:
+                if f.readline().strip() == fingerprint:
+                    for line in f:
+                        phase, chunk = line.split()
+                        self.done.add((phase, int(chunk)))
+                else:
+                    print(f"Ignoring checkpoint {path}: it was written for different arguments")
+                    self.done = set()
+
+        self._file = open(path, "w" if not self.done else "a")
+        if not self.done:
+            self._file.write(fingerprint + "\n")
+            self._file.flush()
+
+    def is_done(self, phase, chunk):
+        return (phase, chunk) in self.done
+
+    def mark_done(self, phase, chunk):
+        with self._lock:
+            self._file.write(f"{phase} {chunk}\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def user_entities(client, plan, chunk):
+    """Users (and their sub index entries) of one chunk."""
+    entities = []
+    start = chunk * USERS_PER_CHUNK
+    for i in range(start, min(start + USERS_PER_CHUNK, plan.users)):
+        user_id = plan.user_id(i)
+        sub = f"auth0|seed-{plan.seed}-{i}"
+
+        entity = datastore.Entity(key=client.key(User.KIND, user_id))
+        entity.update({"sub": sub, "role": plan.role(i)})
+        entities.append(entity)
+        entities.append(User.index_entity(client, sub, user_id))
+    return entities
+
+
+def course_entities(client, plan, chunk):
+    """Courses of one chunk."""
+    entities = []
+    start = chunk * BATCH_SIZE
+    for j in range(start, min(start + BATCH_SIZE, plan.courses)):
+        rng = plan.rng("course", j)
+        subject = rng.choices(SUBJECTS, cum_weights=plan.subject_weights)[0]
+        instructor = rng.choices(range(plan.instructors), cum_weights=plan.instructor_weights)[0]
+
+        entity = datastore.Entity(key=client.key(Course.KIND, plan.course_id(j)))
+        entity.update({
+            "subject": subject,
+            "number": rng.randrange(100, 500),
+            "title": " ".join(rng.sample(TITLE_WORDS, 2)) + f" {subject}",
+            "term": rng.choice(TERMS),
+            "instructor_id": plan.user_id(plan.admins + instructor),
+        })
+        entities.append(entity)
+    return entities
+
+
+def enrollment_entities(client, plan, chunk):
+    """Enrollments of one chunk of students."""
+    entities = []
+    start = plan.first_student + chunk * STUDENTS_PER_CHUNK
+    for i in range(start, min(start + STUDENTS_PER_CHUNK, plan.users)):
+        rng = plan.rng("enrollments", i)
+        count = min(plan.courses, max(0, round(rng.gauss(plan.mean_enrollments, 1.5))))
+        courses = set()
+        while len(courses) < count:
+            courses.add(rng.choices(range(plan.courses), cum_weights=plan.course_weights)[0])
+
+        student_id = plan.user_id(i)
+        for j in sorted(courses):
+            entity = datastore.Entity(
+                key=Enrollment.key_for(client, plan.course_id(j), student_id))
+            entity["student_id"] = student_id
+            entities.append(entity)
+    return entities
+
+
+def run_phase(client, executor, checkpoint, name, chunk_count, build):
+    """Build and write every chunk of a phase that isn't checkpointed yet."""
+    todo = [chunk for chunk in range(chunk_count) if not checkpoint.is_done(name, chunk)]
+    print(f"{name}: {chunk_count - len(todo)}/{chunk_count} chunks already written")
+    if not todo:
+        return
+
+    def write(chunk):
+        entities = build(chunk)
+        for i in range(0, len(entities), BATCH_SIZE):
+            client.put_multi(entities[i:i + BATCH_SIZE])
+        checkpoint.mark_done(name, chunk)
+        return len(entities)
+
+    started, written = time.monotonic(), 0
+    futures = [executor.submit(write, chunk) for chunk in todo]
+    for done, future in enumerate(as_completed(futures), 1):
+        written += future.result()
+        if done % 100 == 0 or done == len(futures):
+            rate = written / (time.monotonic() - started)
+            print(f"  {name}: {done}/{len(futures)} chunks, {written} entities ({rate:,.0f}/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate bulk Datastore fixtures.")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--instructor-ratio", type=float, default=0.05,
+                        help="share of users that are instructors")
+    parser.add_argument("--mean-enrollments", type=float, default=4.0,
+                        help="average courses per student")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--id-offset", type=int, default=10**12,
+                        help="first entity ID; the default is far above the emulator's "
+                             "sequential IDs and unlikely to meet Datastore's scattered ones")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--checkpoint", default=".seed_checkpoint",
+                        help="file recording finished chunks, for resuming")
+    parser.add_argument("--skip-enrollments", action="store_true")
+    args = parser.parse_args()
+
+    plan = Plan(args)
+    client = datastore.Client()
+    checkpoint = Checkpoint(args.checkpoint, plan.fingerprint())
+
+    print(f"Seeding {plan.users} users ({plan.admins} admins, {plan.instructors} instructors), "
+          f"{plan.courses} courses with {args.workers} workers")
+
+    students = plan.users - plan.first_student
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        run_phase(client, executor, checkpoint, "users",
+                  -(-plan.users // USERS_PER_CHUNK),
+                  lambda chunk: user_entities(client, plan, chunk))
+        run_phase(client, executor, checkpoint, "courses",
+                  -(-plan.courses // BATCH_SIZE),
+                  lambda chunk: course_entities(client, plan, chunk))
+        if not args.skip_enrollments:
+            run_phase(client, executor, checkpoint, "enrollments",
+                      -(-students // STUDENTS_PER_CHUNK),
+                      lambda chunk: enrollment_entities(client, plan, chunk))
+
+    checkpoint.close()
+
+    # New collection versions, so cached listings are revalidated
+    client.put_multi([version_entity(client, User.KIND), version_entity(client, Course.KIND)])
+    print("Seeding complete.")
+
+
+if __name__ == "__main__":
+    main()
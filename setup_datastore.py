@@ -11,6 +11,8 @@ to the Auth0-issued subject (sub) from the JWT.
 import os
 from google.cloud import datastore
 
+from app.models.versions import version_entity
+
 # If you are using the Datastore emulator, ensure these environment variables are set:
 #   export DATASTORE_EMULATOR_HOST="localhost:8081"
 #   export DATASTORE_PROJECT_ID="your-test-project-id"
@@ -34,6 +36,14 @@ def main():
         keys_to_delete = [entity.key for entity in existing]
         client.delete_multi(keys_to_delete)
 
+    # Clear the sub -> user lookup index too, since it points at the deleted users
+    query = client.query(kind="user_sub_index")
+    query.keys_only()
+    stale_index = [entity.key for entity in query.fetch()]
+    if stale_index:
+        print(f"Deleting {len(stale_index)} 'user_sub_index' entities...")
+        client.delete_multi(stale_index)
+
     # Define the nine users to create. We leave 'sub' blank; Postman will fill it in later.
     to_insert = [
         {"role": "admin",      "sub": ""},
@@ -49,6 +59,7 @@ def main():
 
     print(f"Inserting {len(to_insert)} '{kind}' entities...")
 
+    entities = []
     for user_data in to_insert:
         key = client.key(kind)
         entity = datastore.Entity(key=key)
@@ -56,7 +67,12 @@ def main():
             "role": user_data["role"],
             "sub": user_data["sub"],
         })
-        client.put(entity)
+        entities.append(entity)
+
+    # One batched commit instead of a put per user, plus a new collection
+    # version so cached GET /users responses are revalidated
+    client.put_multi(entities + [version_entity(client, kind)])
+    for entity in entities:
         print(f"  • Created User id={entity.key.id} role={entity['role']} sub='{entity['sub']}'")
 
     print("Datastore seeding complete. You should now have exactly nine 'users' entities.")
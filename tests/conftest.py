@@ -0,0 +1,58 @@
+"""Shared fixtures: an app on the testing config with in-memory Datastore,
+local avatar storage and a stub JWKS endpoint."""
+import pytest
+
+import config
+from app import create_app
+from tests.fakes import AUDIENCE, DOMAIN, JWKS, FakeDatastoreClient, StubServer
+
+
+@pytest.fixture(scope='session')
+def jwks_server():
+    """Stub Auth0 JWKS endpoint serving the test signing key."""
+    with StubServer(lambda method, path, body: (200, JWKS)) as server:
+        yield server
+
+
+@pytest.fixture
+def make_app(jwks_server, tmp_path, monkeypatch):
+    """Factory creating apps on the testing config plus ``overrides``."""
+    monkeypatch.setattr('app.extensions.datastore.Client', FakeDatastoreClient)
+
+    def make_app(**overrides):
+        settings = {
+            'AUTH0_DOMAIN': DOMAIN,
+            'AUTH0_AUDIENCE': AUDIENCE,
+            'AUTH0_JWKS_URL': jwks_server.url + '/.well-known/jwks.json',
+            'STORAGE_BACKEND': 'local',
+            'LOCAL_STORAGE_DIR': str(tmp_path / 'storage'),
+        }
+        settings.update(overrides)
+        monkeypatch.setitem(config.config, 'test', type('Config', (config.TestingConfig,), settings))
+        return create_app('test')
+
+    return make_app
+
+
+@pytest.fixture(autouse=True)
+def _push_request_context():
+    """Override pytest-flask's, which pushes a request context around every
+    test using ``app``: test client requests would then share its ``g`` (and
+    the request loader and resolved caller memoized on it)."""
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def datastore_client(app):
+    """The app's in-memory Datastore client."""
+    return app.clients.datastore
+
@@ -0,0 +1,300 @@
+"""In-memory stand-ins for the app's external services.
+
+``FakeDatastoreClient`` implements the subset of ``datastore.Client`` the app
+uses (lookups, writes, transactions, simple queries) and counts its RPCs.
+``sign_token`` issues RS256 JWTs verifiable against ``JWKS``, and
+``StubServer`` serves canned HTTP responses (JWKS, the Auth0 token
+endpoint) from a local port.
+"""
+import base64
+import itertools
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.cloud.datastore import Entity, Key
+from jose import jwk, jwt
+
+AUDIENCE = 'test-audience'
+DOMAIN = 'tarpaulin.test'
+ISSUER = f'https://{DOMAIN}/'
+KID = 'test-key'
+
+_private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+PRIVATE_KEY_PEM = _private_key.private_bytes(serialization.Encoding.PEM,
+                                             serialization.PrivateFormat.PKCS8,
+                                             serialization.NoEncryption())
+_public_jwk = jwk.construct(
+    _private_key.public_key().public_bytes(serialization.Encoding.PEM,
+                                           serialization.PublicFormat.SubjectPublicKeyInfo),
+    'RS256').to_dict()
+JWKS = {'keys': [dict(_public_jwk, kid=KID, use='sig')]}
+
+_OPERATORS = {
+    '=': lambda a, b: a == b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def sign_token(sub='auth0|test', lifetime=3600, kid=KID, **claims):
+    """Issue a signed JWT for the test audience and issuer.
+
+    Args:
+        sub: Subject claim
+        lifetime: Seconds until the token expires
+        kid: Key ID in the header
+        **claims: Extra claims
+
+    Returns:
+        str: Encoded token
+    """
+    now = int(time.time())
+    payload = {'sub': sub, 'aud': AUDIENCE, 'iss': ISSUER, 'iat': now, 'exp': now + lifetime}
+    payload.update(claims)
+    return jwt.encode(payload, PRIVATE_KEY_PEM, algorithm='RS256', headers={'kid': kid})
+
+
+def _copy(entity):
+    """Detach an entity from the store, as a real lookup would."""
+    copy = Entity(key=entity.key, exclude_from_indexes=tuple(entity.exclude_from_indexes))
+    copy.update(entity)
+    return copy
+
+
+class _Iterator:
+    """Query results with the ``next_page_token`` of a real iterator."""
+
+    def __init__(self, entities, next_page_token):
+        self._entities = entities
+        self.next_page_token = next_page_token
+
+    def __iter__(self):
+        return iter(self._entities)
+
+
+class FakeQuery:
+    """Equality/range filters, ordering, projection and keys-only queries."""
+
+    def __init__(self, client, kind=None, ancestor=None):
+        self.client = client
+        self.kind = kind
+        self.ancestor = ancestor
+        self.filters = []
+        self.order = []
+        self.projection = []
+        self._keys_only = False
+
+    def add_filter(self, name, operator, value):
+        self.filters.append((name, operator, value))
+        return self
+
+    def keys_only(self):
+        self._keys_only = True
+
+    def fetch(self, limit=None, start_cursor=None):
+        self.client.rpcs['run_query'] += 1
+        entities = [entity for entity in self.client.store.values()
+                    if entity.key.kind == self.kind]
+        if self.ancestor is not None:
+            entities = [entity for entity in entities if entity.key.parent == self.ancestor]
+        for name, operator, value in self.filters:
+            entities = [entity for entity in entities
+                        if name in entity and _OPERATORS[operator](entity[name], value)]
+
+        entities.sort(key=lambda entity: entity.key.flat_path)
+        for name in reversed(self.order):
+            entities.sort(key=lambda entity: entity.get(name.lstrip('-')),
+                          reverse=name.startswith('-'))
+
+        start = int(base64.b64decode(start_cursor)) if start_cursor else 0
+        end = None if limit is None else start + limit
+        page = entities[start:end]
+
+        results = []
+        for entity in page:
+            if self._keys_only:
+                result = Entity(key=entity.key)
+            elif self.projection:
+                result = Entity(key=entity.key)
+                result.update({name: entity[name] for name in self.projection if name in entity})
+            else:
+                result = _copy(entity)
+            results.append(result)
+
+        next_page_token = None
+        if end is not None and end < len(entities):
+            next_page_token = base64.b64encode(str(end).encode())
+        return _Iterator(results, next_page_token)
+
+
+class _Transaction:
+    """Buffers writes and applies them on a clean exit."""
+
+    def __init__(self, client):
+        self.client = client
+        self.puts = []
+        self.deletes = []
+
+    def __enter__(self):
+        self.client._transaction = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.client._transaction = None
+        if exc_type is None:
+            self.client.rpcs['commit'] += 1
+            for entity in self.puts:
+                self.client._store(entity)
+            for key in self.deletes:
+                self.client.store.pop(key.flat_path, None)
+        return False
+
+
+class FakeDatastoreClient:
+    """In-memory ``datastore.Client`` counting RPCs in ``rpcs``."""
+
+    project = 'test-project'
+    namespace = None
+    database = None
+
+    def __init__(self, *args, **kwargs):
+        self.store = {}
+        self.rpcs = Counter()
+        self._ids = itertools.count(1000)
+        self._transaction = None
+        self._datastore_api_internal = None
+
+    @property
+    def _datastore_api(self):
+        return self._datastore_api_internal
+
+    def key(self, *path, **kwargs):
+        return Key(*path, project=self.project)
+
+    def _store(self, entity):
+        if entity.key.is_partial:
+            entity.key = entity.key.completed_key(next(self._ids))
+        self.store[entity.key.flat_path] = _copy(entity)
+
+    def get(self, key, **kwargs):
+        self.rpcs['lookup'] += 1
+        entity = self.store.get(key.flat_path)
+        return None if entity is None else _copy(entity)
+
+    def get_multi(self, keys, missing=None, **kwargs):
+        self.rpcs['lookup'] += 1
+        found = []
+        for key in keys:
+            entity = self.store.get(key.flat_path)
+            if entity is not None:
+                found.append(_copy(entity))
+            elif missing is not None:
+                missing.append(Entity(key=key))
+        return found
+
+    def put(self, entity, **kwargs):
+        self.put_multi([entity])
+
+    def put_multi(self, entities, **kwargs):
+        if self._transaction is not None:
+            self._transaction.puts.extend(entities)
+            return
+        self.rpcs['commit'] += 1
+        for entity in entities:
+            self._store(entity)
+
+    def delete(self, key, **kwargs):
+        self.delete_multi([key])
+
+    def delete_multi(self, keys, **kwargs):
+        if self._transaction is not None:
+            self._transaction.deletes.extend(keys)
+            return
+        self.rpcs['commit'] += 1
+        for key in keys:
+            self.store.pop(key.flat_path, None)
+
+    def query(self, kind=None, ancestor=None, **kwargs):
+        return FakeQuery(self, kind, ancestor)
+
+    def transaction(self, **kwargs):
+        return _Transaction(self)
+
+    def allocate_ids(self, incomplete_key, num_ids, **kwargs):
+        self.rpcs['allocate_ids'] += 1
+        return [incomplete_key.completed_key(next(self._ids)) for _ in range(num_ids)]
+
+
+class StubServer:
+    """Local HTTP server answering every request with ``handler``.
+
+    ``handler(method, path, body)`` returns ``(status, json_body)``. Requests
+    are recorded in ``requests`` as ``(method, path, body)``, and the client
+    ports of the connections they came on in ``connections``.
+
+    Example:
+        with StubServer(lambda *request: (200, JWKS)) as server:
+            urlopen(server.url + '/.well-known/jwks.json')
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.connections = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                stub.requests.append((self.command, self.path, body))
+                stub.connections.add(self.client_address[1])
+                status, data = stub.handler(self.command, self.path, body)
+                payload = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = _respond
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self._server.server_port}'
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def add_user(client, role, sub, **properties):
+    """Store a user entity and its sub index entry, returning its ID."""
+    entity = Entity(key=client.key('users'))
+    entity.update(role=role, sub=sub, **properties)
+    client.put(entity)
+    index = Entity(key=client.key('user_sub_index', sub))
+    index['user_id'] = entity.key.id
+    client.put(index)
+    return entity.key.id
+
+
+def bearer(sub='auth0|test', **claims):
+    """Authorization header for a freshly signed token."""
+    return {'Authorization': f'Bearer {sign_token(sub, **claims)}'}
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+from app.utils.aio import ThreadPoolWsgiToAsgi
+from tests.fakes import add_user, bearer
+
+
+def asgi_get(asgi_app, path, headers):
+    """Run one GET request through an ASGI app, returning (status, body)."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '', 'server': ('testserver', 80),
+        'client': ('127.0.0.1', 5000),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    status = next(m['status'] for m in messages if m['type'] == 'http.response.start')
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    return status, body
+
+
+def test_sync_views_run_on_the_request_pool(app, datastore_client):
+    user_id = add_user(datastore_client, 'admin', 'auth0|asgi')
+    threads = []
+
+    @app.before_request
+    def record_thread():
+        threads.append(threading.current_thread().name)
+
+    asgi_app = ThreadPoolWsgiToAsgi(app, max_threads=4)
+    status, body = asgi_get(asgi_app, f'/users/{user_id}', bearer('auth0|asgi'))
+
+    assert status == 200
+    assert b'"auth0|asgi"' in body
+    assert threads[0].startswith('asgi-request')
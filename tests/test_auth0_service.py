@@ -0,0 +1,110 @@
+import json
+import time
+
+import pytest
+
+from app.auth import auth0_service
+from app.auth.auth0_service import get_session, login_user
+from app.errors.exceptions import UnauthorizedError
+from tests.fakes import StubServer
+
+
+@pytest.fixture
+def token_endpoint():
+    """Fake Auth0 token endpoint answering with the queued statuses, then 200."""
+    statuses = []
+
+    def handler(method, path, body):
+        status = statuses.pop(0) if statuses else 200
+        if status != 200:
+            return status, {'error': 'unavailable'}
+        username = json.loads(body)['username']
+        return 200, {'access_token': f'token-for-{username}', 'expires_in': 86400}
+
+    with StubServer(handler) as server:
+        server.statuses = statuses
+        yield server
+
+
+@pytest.fixture
+def make_login_app(make_app, token_endpoint, monkeypatch):
+    # Each app gets a session built from its own retry settings
+    monkeypatch.setattr(auth0_service, '_session', None)
+
+    def make_login_app(**overrides):
+        return make_app(AUTH0_TOKEN_URL=token_endpoint.url + '/oauth/token',
+                        AUTH0_RETRY_BACKOFF=0, AUTH0_MAX_RETRIES=2, **overrides)
+
+    return make_login_app
+
+
+def test_retries_unavailable_responses(make_login_app, token_endpoint):
+    token_endpoint.statuses.extend([503, 502])
+
+    with make_login_app().app_context():
+        assert login_user('a@example.com', 'pw') == {'token': 'token-for-a@example.com'}
+
+    assert len(token_endpoint.requests) == 3
+
+
+def test_gives_up_after_max_retries(make_login_app, token_endpoint):
+    token_endpoint.statuses.extend([503] * 3)
+
+    with make_login_app().app_context():
+        with pytest.raises(UnauthorizedError):
+            login_user('a@example.com', 'pw')
+
+    assert len(token_endpoint.requests) == 3
+
+
+def test_rejected_credentials_are_not_retried(make_login_app, token_endpoint):
+    token_endpoint.statuses.append(403)
+
+    with make_login_app().app_context():
+        with pytest.raises(UnauthorizedError):
+            login_user('a@example.com', 'wrong')
+
+    assert len(token_endpoint.requests) == 1
+
+
+def test_session_is_reused(make_login_app, token_endpoint):
+    with make_login_app().app_context():
+        session = get_session()
+        for i in range(3):
+            login_user(f'{i}@example.com', 'pw')
+        assert get_session() is session
+
+    # Keep-alive: every login went over the same pooled connection
+    assert len(token_endpoint.requests) == 3
+    assert len(token_endpoint.connections) == 1
+
+
+def test_login_cache_hits_and_expiry(make_login_app, token_endpoint, monkeypatch):
+    now = [time.time()]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+
+    with make_login_app(LOGIN_CACHE_ENABLED=True, LOGIN_CACHE_TTL=60).app_context():
+        first = login_user('a@example.com', 'pw')
+        assert login_user('a@example.com', 'pw') == first
+        assert len(token_endpoint.requests) == 1
+
+        # Other credentials are a different entry
+        login_user('a@example.com', 'other')
+        assert len(token_endpoint.requests) == 2
+
+        now[0] += 61
+        assert login_user('a@example.com', 'pw') == first
+        assert len(token_endpoint.requests) == 3
+
+
+def test_login_cache_respects_token_expiry(make_login_app, token_endpoint):
+    def short_lived(method, path, body):
+        return 200, {'access_token': 'short', 'expires_in': 30}
+
+    token_endpoint.handler = short_lived
+    with make_login_app(LOGIN_CACHE_ENABLED=True).app_context():
+        login_user('a@example.com', 'pw')
+        login_user('a@example.com', 'pw')
+
+    # Tokens expiring within a minute are never cached
+    assert len(token_endpoint.requests) == 2
@@ -0,0 +1,50 @@
+import io
+
+from app.models.user import User
+from app.services.avatar_service import get_avatar, set_avatar
+from app.utils.storage import upload_avatar
+from tests.fakes import add_user
+
+
+def read(avatar):
+    return b''.join(avatar.chunks)
+
+
+def test_avatar_is_cached_per_generation(app, datastore_client):
+    user_id = add_user(datastore_client, 'student', 'auth0|student')
+
+    with app.test_request_context():
+        user = set_avatar(user_id, io.BytesIO(b'png'), 'image/png')
+        assert read(get_avatar(user)) == b'png'
+        assert app.avatar_cache.get((user_id, user.avatar_generation)) == ('image/png', b'png')
+
+        avatar = get_avatar(user)
+        assert (avatar.generation, read(avatar)) == (user.avatar_generation, b'png')
+
+
+def test_reupload_racing_a_read_is_served_under_its_own_generation(app, datastore_client,
+                                                                  monkeypatch):
+    user_id = add_user(datastore_client, 'student', 'auth0|student')
+
+    with app.test_request_context():
+        set_avatar(user_id, io.BytesIO(b'old'), 'image/png')
+        stale = User.get_by_id(user_id)
+
+    with app.test_request_context():
+        # Storage already holds the new object; the user record still
+        # names the old generation
+        generation = upload_avatar(user_id, io.BytesIO(b'new'), 'image/jpeg')
+
+        opened = []
+        storage_open = app.avatar_storage.open
+        monkeypatch.setattr(app.avatar_storage, 'open', lambda name, generation=None: (
+            opened.append(generation) or storage_open(name, generation)))
+
+        avatar = get_avatar(stale)
+        assert (avatar.generation, avatar.content_type) == (generation, 'image/jpeg')
+        assert read(avatar) == b'new'
+        # Pinned to the user's generation first, then retried on the live object
+        assert opened == [stale.avatar_generation, None]
+
+    assert app.avatar_cache.get((user_id, stale.avatar_generation)) is None
+    assert app.avatar_cache.get((user_id, generation)) == ('image/jpeg', b'new')
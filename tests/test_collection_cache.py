@@ -0,0 +1,56 @@
+import pytest
+
+from app.models.course import Course
+from tests.fakes import add_user
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(COLLECTION_CACHE_MAX_SIZE=4)
+
+
+@pytest.fixture
+def add_course(app, datastore_client):
+    instructor_id = add_user(datastore_client, 'instructor', 'auth0|instructor')
+
+    def add_course(subject='CS', number=493):
+        with app.test_request_context():
+            return Course(subject=subject, number=number, title='Cloud', term='fall-24',
+                          instructor_id=instructor_id).save()
+
+    return add_course
+
+
+def test_repeated_listing_is_served_from_cache(client, datastore_client, add_course):
+    add_course()
+    first = client.get('/courses')
+    assert first.status_code == 200
+
+    datastore_client.rpcs.clear()
+    second = client.get('/courses')
+    assert second.get_json() == first.get_json()
+    assert datastore_client.rpcs['run_query'] == 0
+
+
+def test_course_write_invalidates_listing(client, datastore_client, add_course):
+    add_course('CS')
+    assert len(client.get('/courses').get_json()['courses']) == 1
+
+    add_course('MTH')
+    datastore_client.rpcs.clear()
+    courses = client.get('/courses').get_json()['courses']
+    assert [course['subject'] for course in courses] == ['CS', 'MTH']
+    assert datastore_client.rpcs['run_query'] == 1
+
+
+def test_filtered_listings_stay_out_of_the_cache(app, client, datastore_client, add_course):
+    add_course()
+    client.get('/courses')
+    for i in range(20):
+        assert client.get(f'/courses?subject=S{i}').status_code == 200
+
+    assert app.collection_cache.stats()['backend']['size'] <= 4
+    # The shared listing was not evicted by the filtered ones
+    datastore_client.rpcs.clear()
+    client.get('/courses')
+    assert datastore_client.rpcs['run_query'] == 0
@@ -0,0 +1,78 @@
+import gzip
+import json
+
+import pytest
+
+from app.models.course import Course
+from tests.fakes import add_user
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@pytest.fixture
+def add_courses(app, datastore_client):
+    instructor_id = add_user(datastore_client, 'instructor', 'auth0|instructor')
+
+    def add_courses(count):
+        with app.test_request_context():
+            for number in range(count):
+                Course(subject='CS', number=number, title='Cloud Application Development',
+                       term='fall-24', instructor_id=instructor_id).save()
+
+    return add_courses
+
+
+def test_matching_etag_is_not_modified(client, datastore_client, add_courses):
+    add_courses(1)
+    response = client.get('/courses')
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+
+    datastore_client.rpcs.clear()
+    response = client.get('/courses', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.data == b''
+    assert datastore_client.rpcs['run_query'] == 0
+
+    # Other pages of the listing have their own tag
+    assert client.get('/courses?limit=1').headers['ETag'] != etag
+
+
+def test_write_changes_etag(client, add_courses):
+    add_courses(1)
+    etag = client.get('/courses').headers['ETag']
+
+    add_courses(1)
+    response = client.get('/courses', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert len(response.get_json()['courses']) == 2
+
+
+@pytest.mark.parametrize('encoding, decompress', [
+    ('gzip', gzip.decompress),
+    pytest.param('br', brotli and brotli.decompress,
+                 marks=pytest.mark.skipif(brotli is None, reason='brotli not installed')),
+])
+def test_large_listing_is_compressed(client, add_courses, encoding, decompress):
+    add_courses(20)
+    plain = client.get('/courses?limit=20')
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.data) >= 1024
+
+    response = client.get('/courses?limit=20', headers={'Accept-Encoding': encoding})
+    assert response.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(decompress(response.data)) == plain.get_json()
+
+
+def test_small_response_is_not_compressed(client, add_courses):
+    add_courses(1)
+    response = client.get('/courses', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    # Caches must still key on the header
+    assert 'Accept-Encoding' in response.headers['Vary']
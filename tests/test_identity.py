@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from app.auth.identity import TokenIdentity, get_caller
+from app.auth.jwt_utils import authenticate_request
+from app.models.user import User
+from tests.fakes import add_user, bearer
+
+NAMESPACE = 'https://tarpaulin.example.com/'
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(JWT_ROLE_CLAIMS_ENABLED=True, JWT_CLAIM_NAMESPACE=NAMESPACE,
+                    JWT_ROLE_CLAIMS_MAX_AGE=3600)
+
+
+@pytest.fixture
+def student_id(datastore_client):
+    return add_user(datastore_client, 'student', 'auth0|student')
+
+
+def resolve_caller(app, datastore_client, **claims):
+    """Authenticate a token with ``claims`` and resolve its caller.
+
+    Returns:
+        tuple: (caller, number of Datastore lookups it took)
+    """
+    with app.test_request_context(headers=bearer('auth0|student', **claims)):
+        authenticate_request()
+        datastore_client.rpcs.clear()
+        return get_caller(), datastore_client.rpcs['lookup']
+
+
+def claims(role=None, user_id=None, namespace=NAMESPACE, **extra):
+    values = {namespace + 'role': role, namespace + 'user_id': user_id}
+    return dict({name: value for name, value in values.items() if value is not None}, **extra)
+
+
+def test_valid_claims_need_no_lookup(app, datastore_client, student_id):
+    caller, lookups = resolve_caller(app, datastore_client,
+                                     **claims('instructor', str(student_id)))
+
+    assert isinstance(caller, TokenIdentity)
+    assert (caller.id, caller.role, caller.sub) == (student_id, 'instructor', 'auth0|student')
+    assert lookups == 0
+
+
+@pytest.mark.parametrize('token_claims', [
+    pytest.param({}, id='no claims'),
+    pytest.param(claims('admin'), id='role without user_id'),
+    pytest.param(claims(user_id=1), id='user_id without role'),
+    pytest.param(claims('superuser', 1), id='unknown role'),
+    pytest.param(claims(['admin'], 1), id='role not a string'),
+    pytest.param(claims('admin', 'abc'), id='user_id not a number'),
+    pytest.param(claims('admin', 1, iat=int(time.time()) - 7200), id='older than max age'),
+    pytest.param(claims('admin', 1, namespace='https://attacker.example/'), id='forged namespace'),
+    pytest.param({'role': 'admin', 'user_id': 1}, id='unnamespaced'),
+])
+def test_untrusted_claims_fall_back_to_stored_role(app, datastore_client, student_id,
+                                                   token_claims):
+    caller, lookups = resolve_caller(app, datastore_client, **token_claims)
+
+    assert isinstance(caller, User)
+    assert (caller.id, caller.role) == (student_id, 'student')
+    assert lookups > 0
+
+
+def test_claims_are_ignored_when_disabled(make_app):
+    app = make_app(JWT_ROLE_CLAIMS_ENABLED=False)
+    datastore_client = app.clients.datastore
+    add_user(datastore_client, 'student', 'auth0|student')
+
+    caller, _ = resolve_caller(app, datastore_client, **claims('admin', 1))
+
+    assert isinstance(caller, User)
+    assert caller.role == 'student'
+
+
+def test_claims_decide_role_policies(app, client, datastore_client, student_id):
+    assert client.get('/users', headers=bearer('auth0|student')).status_code == 403
+
+    headers = bearer('auth0|student', **claims('admin', student_id))
+    assert client.get('/users', headers=headers).status_code == 200
@@ -0,0 +1,23 @@
+import pytest
+
+from app.utils import json_provider
+
+
+class UnusedEncoder:
+    def __getattr__(self, name):
+        raise AssertionError(f'orjson.{name} used with JSON_ENCODER=stdlib')
+
+
+@pytest.fixture
+def app(make_app, monkeypatch):
+    monkeypatch.setattr(json_provider, 'orjson', UnusedEncoder())
+    return make_app(JSON_ENCODER='stdlib')
+
+
+def test_stdlib_encoder_is_used_for_all_bodies(client):
+    response = client.get('/courses')
+    assert response.get_json() == {'courses': []}
+
+    response = client.get('/courses/999999')
+    assert response.status_code == 404
+    assert response.data == b'{"Error":"Not found"}'
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from app.auth.jwks import JWKSCache
+from tests.fakes import JWKS, KID, StubServer
+
+
+@pytest.fixture
+def jwks():
+    """Stub JWKS endpoint whose responses tests can change or hold back."""
+    state = {'status': 200, 'release': None}
+
+    def handler(method, path, body):
+        if state['release'] is not None:
+            state['release'].wait(5)
+        return state['status'], JWKS
+
+    with StubServer(handler) as server:
+        server.state = state
+        yield server
+
+
+def make_cache(server, **kwargs):
+    return JWKSCache(server.url + '/.well-known/jwks.json', **kwargs)
+
+
+def test_keys_are_fetched_once(jwks):
+    cache = make_cache(jwks)
+
+    assert cache.get_key(KID) is not None
+    assert cache.get_key(KID) is not None
+    assert len(jwks.requests) == 1
+
+
+def test_unknown_kids_are_rate_limited(jwks):
+    cache = make_cache(jwks, min_refetch_interval=30)
+    cache.get_key(KID)
+
+    assert cache.get_key('forged-1') is None
+    assert cache.get_key('forged-2') is None
+    assert len(jwks.requests) == 1
+
+
+def test_failed_first_fetch_is_rate_limited(jwks):
+    jwks.state['status'] = 500
+    cache = make_cache(jwks, min_refetch_interval=30)
+
+    assert cache.get_key(KID) is None
+    assert cache.get_key(KID) is None
+    assert len(jwks.requests) == 1
+
+
+def test_stale_keys_are_served_during_background_refresh(jwks):
+    cache = make_cache(jwks, ttl=60)
+    key = cache.get_key(KID)
+    cache._fetched_at -= 120
+
+    release = jwks.state['release'] = threading.Event()
+    try:
+        started = time.monotonic()
+        assert cache.get_key(KID) is key
+        # The refresh is in flight; neither starting another nor reading
+        # keys waits for it
+        cache._refresh_in_background()
+        assert cache.get_key(KID) is key
+        assert time.monotonic() - started < 1
+    finally:
+        release.set()
+
+    deadline = time.monotonic() + 5
+    while cache._generation < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache._generation == 2
+    assert len(jwks.requests) == 2
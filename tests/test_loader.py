@@ -0,0 +1,57 @@
+import pytest
+
+from app.models.base import get_request_loader
+from app.models.course import Course
+from app.models.user import User
+from app.services.course_service import update_course
+from tests.fakes import add_user
+
+
+def test_queued_lookups_share_one_rpc(app, datastore_client):
+    ids = [add_user(datastore_client, 'student', f'auth0|{i}') for i in range(3)]
+
+    with app.test_request_context():
+        datastore_client.rpcs.clear()
+        deferreds = [User.load(user_id) for user_id in ids + [ids[0], 999999]]
+        assert datastore_client.rpcs['lookup'] == 0
+
+        users = [deferred.get() for deferred in deferreds]
+        assert [user.id for user in users[:4]] == ids + [ids[0]]
+        assert users[4] is None
+
+        # Hits and misses are memoized for the rest of the request
+        assert User.get_by_id(ids[1]).id == ids[1]
+        assert User.get_by_id(999999) is None
+        assert datastore_client.rpcs['lookup'] == 1
+        assert get_request_loader().rpcs == 1
+
+
+def test_update_course_looks_up_course_and_instructor_together(app, datastore_client):
+    instructor_id = add_user(datastore_client, 'instructor', 'auth0|instructor')
+
+    with app.test_request_context():
+        course = Course(subject='CS', number=493, title='Cloud', term='fall-24',
+                        instructor_id=instructor_id).save()
+
+    with app.test_request_context():
+        datastore_client.rpcs.clear()
+        updated = update_course(course.id, {'instructor_id': instructor_id, 'title': 'Cloud II'})
+        assert updated.title == 'Cloud II'
+        assert datastore_client.rpcs['lookup'] == 1
+
+
+def test_failed_lookup_is_not_remembered_as_missing(app, datastore_client, monkeypatch):
+    user_id = add_user(datastore_client, 'student', 'auth0|flaky')
+    get_multi = datastore_client.get_multi
+
+    def failing_get_multi(keys, **kwargs):
+        monkeypatch.setattr(datastore_client, 'get_multi', get_multi)
+        raise ConnectionError('lookup failed')
+
+    with app.test_request_context():
+        monkeypatch.setattr(datastore_client, 'get_multi', failing_get_multi)
+        deferred = User.load(user_id)
+        with pytest.raises(ConnectionError):
+            deferred.get()
+
+        assert deferred.get().id == user_id
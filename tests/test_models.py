@@ -0,0 +1,63 @@
+from app.models import base
+from app.models.course import Course
+from app.models.user import User
+from tests.fakes import add_user
+
+
+def test_save_keeps_undeclared_properties(app, datastore_client):
+    user_id = add_user(datastore_client, 'student', 'auth0|extra',
+                       avatar_url='https://cdn.example/a.png', email='a@example.com')
+
+    with app.test_request_context():
+        user = User.get_by_id(user_id)
+        user.role = 'instructor'
+        user.save()
+
+    stored = datastore_client.store[('users', user_id)]
+    assert stored['role'] == 'instructor'
+    assert stored['avatar_url'] == 'https://cdn.example/a.png'
+    assert stored['email'] == 'a@example.com'
+
+
+def test_save_all_keeps_undeclared_properties(app, datastore_client):
+    ids = [add_user(datastore_client, 'student', f'auth0|{i}', email=f'{i}@example.com')
+           for i in range(3)]
+
+    with app.app_context():
+        users = User.get_many(ids)
+        User.save_all(users)
+
+    for i, user_id in enumerate(ids):
+        assert datastore_client.store[('users', user_id)]['email'] == f'{i}@example.com'
+
+
+def test_declared_fields_round_trip(app, datastore_client):
+    with app.app_context():
+        course = Course(subject='CS', number=493, title='Cloud', term='fall-24',
+                        instructor_id=7).save()
+        loaded = Course.get_by_id(course.id)
+
+    assert loaded.to_dict() == {'id': course.id, 'subject': 'CS', 'number': 493,
+                                'title': 'Cloud', 'term': 'fall-24', 'instructor_id': 7}
+    assert loaded._extra is None
+
+
+def test_serializer(datastore_client):
+    add_user(datastore_client, 'admin', 'auth0|s', email='s@example.com')
+    entity = next(e for e in datastore_client.store.values() if e.key.kind == 'users')
+
+    assert User.serializer(('role', 'sub', 'avatar_filename'))(entity) == {
+        'id': entity.key.id, 'role': 'admin', 'sub': 'auth0|s', 'avatar_filename': None}
+
+
+def test_batch_executor_is_per_process(app, monkeypatch):
+    monkeypatch.setattr(base, '_executor', None)
+    with app.app_context():
+        executor = base._get_executor()
+        assert base._get_executor() is executor
+
+        # A forked child must not reuse the parent's pool
+        monkeypatch.setattr(base.os, 'getpid', lambda: -1)
+        assert base._get_executor() is not executor
+    base._executor.shutdown()
+    executor.shutdown()
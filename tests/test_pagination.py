@@ -0,0 +1,58 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from app.models.course import Course
+from tests.fakes import add_user, bearer
+
+
+@pytest.fixture
+def instructor_id(app, datastore_client):
+    instructor_id = add_user(datastore_client, 'instructor', 'auth0|instructor')
+    with app.test_request_context():
+        for number in range(3):
+            Course(subject='CS', number=number, title='Cloud', term='fall-24',
+                   instructor_id=instructor_id).save()
+    return instructor_id
+
+
+def next_args(response):
+    """Get the query parameters of a listing's ``next`` link."""
+    return {name: values[0] for name, values in
+            parse_qs(urlsplit(response.get_json()['next']).query).items()}
+
+
+def test_next_link_carries_cursor_limit_and_filters(client, instructor_id):
+    args = next_args(client.get(f'/courses?limit=2&instructor_id={instructor_id}'))
+    assert args.keys() == {'cursor', 'limit', 'instructor_id'}
+    assert args['limit'] == '2'
+
+    last = client.get('/courses', query_string=args).get_json()
+    assert [course['number'] for course in last['courses']] == [2]
+    assert 'next' not in last
+
+
+def test_tampered_cursor_is_rejected(client, instructor_id):
+    cursor = next_args(client.get('/courses?limit=2'))['cursor']
+    payload, signature = cursor.rsplit('.', 1)
+    # Alter the payload, keeping the old signature
+    tampered = payload.swapcase() + '.' + signature
+
+    assert client.get(f'/courses?limit=2&cursor={tampered}').status_code == 400
+    assert client.get('/courses?limit=2&cursor=not-a-cursor').status_code == 400
+
+
+def test_cursor_is_bound_to_its_listing(client, datastore_client, instructor_id):
+    cursor = next_args(client.get('/courses?limit=2'))['cursor']
+    assert client.get(f'/courses?limit=2&cursor={cursor}').status_code == 200
+
+    # Same listing with another filter scope
+    response = client.get(f'/courses?limit=2&cursor={cursor}&subject=CS')
+    assert response.status_code == 400
+    response = client.get(f'/courses?limit=2&cursor={cursor}&instructor_id={instructor_id}')
+    assert response.status_code == 400
+
+    # Another listing
+    add_user(datastore_client, 'admin', 'auth0|admin')
+    response = client.get(f'/users?limit=2&cursor={cursor}', headers=bearer('auth0|admin'))
+    assert response.status_code == 400
@@ -0,0 +1,101 @@
+import pytest
+
+from app.auth.policy import POLICIES, compile_policies
+from app.errors.exceptions import ForbiddenError, UnauthorizedError
+from tests.fakes import add_user, bearer
+
+ROLES = ('anonymous', 'student', 'instructor', 'admin')
+
+A, U, F = 'allow', UnauthorizedError, ForbiddenError
+
+# (method, path, outcome for anonymous, student, instructor, admin);
+# {self} is the caller's own user ID, {other} another user's
+CASES = [
+    ('GET', '/test', A, A, A, A),
+    ('POST', '/users/login', A, A, A, A),
+
+    ('GET', '/users', U, F, F, A),
+    ('GET', '/users/{self}', U, A, A, A),
+    ('GET', '/users/{other}', U, F, F, A),
+
+    ('POST', '/users/{self}/avatar', U, A, A, A),
+    ('POST', '/users/{other}/avatar', U, A, A, A),
+    ('GET', '/users/{self}/avatar', U, A, A, A),
+    ('GET', '/users/{other}/avatar', U, F, F, F),
+    ('DELETE', '/users/{self}/avatar', U, A, A, A),
+    ('DELETE', '/users/{other}/avatar', U, F, F, F),
+
+    ('POST', '/courses', U, F, F, A),
+    ('GET', '/courses', A, A, A, A),
+    ('GET', '/courses/1', A, A, A, A),
+    ('PATCH', '/courses/1', U, F, F, A),
+    ('DELETE', '/courses/1', U, F, F, A),
+    ('GET', '/courses/1/students', U, F, A, A),
+    ('PATCH', '/courses/1/students', U, F, A, A),
+
+    ('GET', '/admin/cache-stats', U, F, F, A),
+    ('GET', '/admin/metrics', U, F, F, A),
+    ('POST', '/admin/profiling/token', U, F, F, A),
+    ('POST', '/admin/profiling/window', U, F, F, A),
+]
+
+
+@pytest.fixture
+def users(datastore_client):
+    """Role -> (user ID, sub) of one stored user per role."""
+    users = {role: (add_user(datastore_client, role, f'auth0|{role}'), f'auth0|{role}')
+             for role in ROLES[1:]}
+    users['other'] = (add_user(datastore_client, 'student', 'auth0|other'), 'auth0|other')
+    return users
+
+
+def authorize(app, method, path, headers):
+    """Run the request's before_request hooks; return 'allow' or the error type."""
+    with app.test_request_context(path, method=method, headers=headers):
+        try:
+            app.preprocess_request()
+        except (UnauthorizedError, ForbiddenError) as e:
+            return type(e)
+        return A
+
+
+@pytest.mark.parametrize('method,path,role,expected', [
+    (method, path, role, expected)
+    for method, path, *outcomes in CASES
+    for role, expected in zip(ROLES, outcomes)
+])
+def test_endpoint_policy(app, users, method, path, role, expected):
+    if role == 'anonymous':
+        caller_id, headers = users['student'][0], {}
+    else:
+        caller_id, sub = users[role]
+        headers = bearer(sub)
+    url = path.format(self=caller_id, other=users['other'][0])
+
+    assert authorize(app, method, url, headers) == expected
+
+
+def test_every_endpoint_is_covered(app):
+    urls = app.url_map.bind('localhost')
+    covered = {urls.match(path.format(self=1, other=2), method)[0]
+               for method, path, *_ in CASES}
+    assert covered == set(app.view_functions) - {'static'}
+
+
+def test_token_without_user_is_forbidden(app, users):
+    assert authorize(app, 'GET', '/users', bearer('auth0|nobody')) is F
+    # Authentication alone doesn't need a user
+    assert authorize(app, 'POST', '/users/1/avatar', bearer('auth0|nobody')) == A
+
+
+def test_invalid_token_is_unauthorized(app, users):
+    headers = {'Authorization': 'Bearer not-a-jwt'}
+    assert authorize(app, 'GET', '/users', headers) is U
+
+
+def test_missing_policy_fails_app_creation(app):
+    policies = dict(POLICIES)
+    del policies['courses.get']
+
+    with pytest.raises(RuntimeError, match='courses.get'):
+        compile_policies(app, policies)
@@ -0,0 +1,58 @@
+import threading
+import time
+
+from app.utils.profiling import PROFILE_FILE_HEADER, StackSampler
+
+
+def _busy_a(stop):
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+def _busy_b(stop):
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+def _samplers():
+    return [thread for thread in threading.enumerate() if thread.name == 'profile-sampler']
+
+
+def test_one_sampler_attributes_stacks_per_thread():
+    sampler = StackSampler(0.001)
+    stop = threading.Event()
+    threads = [threading.Thread(target=target, args=(stop,)) for target in (_busy_a, _busy_b)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        stacks = [sampler.add(thread.ident) for thread in threads]
+        [sampler_thread] = _samplers()
+        time.sleep(0.05)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    results = [sampler.remove(thread.ident) for thread in threads]
+    assert results == stacks
+    for stacks, own, other in ((results[0], '_busy_a', '_busy_b'),
+                               (results[1], '_busy_b', '_busy_a')):
+        assert stacks
+        assert all(own in stack and other not in stack for stack in stacks)
+
+    # The sampler thread exits once nothing is registered
+    sampler_thread.join(1)
+    assert not sampler_thread.is_alive()
+
+
+def test_sampled_request_writes_its_profile(make_app, tmp_path):
+    app = make_app(PROFILING_ENABLED=True, PROFILING_ALL_REQUESTS=True, PROFILE_MODE='sample',
+                   PROFILE_DIR=str(tmp_path / 'profiles'), PROFILE_SAMPLE_INTERVAL=0.001)
+
+    response = app.test_client().get('/test')
+    assert response.status_code == 200
+
+    path = tmp_path / 'profiles' / response.headers[PROFILE_FILE_HEADER]
+    assert path.name.endswith('.folded')
+    assert path.exists()
@@ -0,0 +1,105 @@
+import pytest
+
+from app.utils.rate_limit import LocalRateLimitStore, RateLimitStore
+from tests.fakes import add_user, bearer
+
+# (rate per second, burst): slow refill so buckets don't recover mid-test
+LIMITS = {
+    'ip': (0.1, 3),
+    'sub': (0.1, 2),
+    'login_ip': (0.1, 2),
+    'login_username': (0.1, 1),
+}
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(RATE_LIMIT_ENABLED=True, RATE_LIMITS=LIMITS, MAX_CONCURRENT_REQUESTS=2,
+                    IDENTITY_CACHE_ENABLED=False)
+
+
+def test_ip_limit(client):
+    for _ in range(3):
+        assert client.get('/test').status_code == 200
+
+    response = client.get('/test')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '10'
+
+    other = client.get('/test', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert other.status_code == 200
+
+
+def test_login_username_limit(client):
+    body = {'username': 'a@example.com', 'password': ''}
+    # Empty passwords are rejected by the view after admission
+    assert client.post('/users/login', json=body).status_code == 400
+
+    response = client.post('/users/login', json=body)
+    assert response.status_code == 429
+    assert 'Retry-After' in response.headers
+
+    # Limited by username, whatever the address
+    response = client.post('/users/login', json=body, environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert response.status_code == 429
+
+    other = {'username': 'b@example.com', 'password': ''}
+    response = client.post('/users/login', json=other, environ_base={'REMOTE_ADDR': '10.0.0.3'})
+    assert response.status_code == 400
+
+
+def test_sub_limit_applies_before_caller_resolution(app, client, datastore_client):
+    add_user(datastore_client, 'admin', 'auth0|admin')
+    headers = bearer('auth0|admin')
+    for _ in range(2):
+        assert client.get('/users', headers=headers, environ_base={'REMOTE_ADDR': '10.0.0.3'}
+                          ).status_code == 200
+
+    datastore_client.rpcs.clear()
+    response = client.get('/users', headers=headers, environ_base={'REMOTE_ADDR': '10.0.0.4'})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '10'
+    # Rejected without resolving the caller
+    assert datastore_client.rpcs['lookup'] == 0
+
+
+def test_excess_concurrency_is_shed(app, client):
+    concurrency = app.rate_limiter.concurrency
+    assert concurrency.try_acquire() and concurrency.try_acquire()
+    try:
+        response = client.get('/test')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    finally:
+        concurrency.release()
+        concurrency.release()
+
+    assert client.get('/test').status_code == 200
+    assert app.rate_limiter.stats()['shed'] == 1
+
+
+def test_local_store_refills_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('app.utils.rate_limit.time.monotonic', lambda: now[0])
+    store = LocalRateLimitStore(max_keys=2, idle_ttl=10)
+
+    assert store.consume('a', 1, 2) == 0
+    assert store.consume('a', 1, 2) == 0
+    assert store.consume('a', 1, 2) == pytest.approx(1)
+    now[0] += 0.5
+    assert store.consume('a', 1, 2) == pytest.approx(0.5)
+    now[0] += 0.5
+    assert store.consume('a', 1, 2) == 0
+
+    store.consume('b', 1, 2)
+    store.consume('c', 1, 2)
+    assert store.stats()['size'] == 2
+
+    now[0] += 10
+    store.consume('d', 1, 2)
+    assert store.stats()['size'] == 1
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitStore()
@@ -0,0 +1,114 @@
+import io
+import os
+
+import pytest
+from google.api_core.exceptions import NotFound, PreconditionFailed
+
+from app.utils.storage import GCSStorage, LocalStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(str(tmp_path), chunk_size=4)
+
+
+def read(stored):
+    return b''.join(stored.chunks)
+
+
+def test_upload_and_open(storage):
+    generation = storage.upload('avatars/1', io.BytesIO(b'0123456789'), 'image/png')
+
+    stored = storage.open('avatars/1')
+    assert (stored.content_type, stored.size, stored.generation) == ('image/png', 10, generation)
+    assert read(stored) == b'0123456789'
+
+    assert read(storage.open('avatars/1', generation=generation)) == b'0123456789'
+    assert storage.open('avatars/1', generation='stale') is None
+    assert storage.open('avatars/2') is None
+
+
+def test_reupload_replaces_data_and_metadata(storage, tmp_path):
+    first = storage.upload('avatars/1', io.BytesIO(b'old'), 'image/png')
+    second = storage.upload('avatars/1', io.BytesIO(b'new data'), 'image/jpeg')
+
+    stored = storage.open('avatars/1')
+    assert second != first
+    assert (stored.content_type, stored.generation) == ('image/jpeg', second)
+    assert read(stored) == b'new data'
+    # No temporary files left behind
+    assert sorted(os.listdir(tmp_path / 'avatars')) == ['1']
+
+
+def test_open_object_is_unaffected_by_reupload(storage):
+    first = storage.upload('avatars/1', io.BytesIO(b'old'), 'image/png')
+    stored = storage.open('avatars/1')
+
+    storage.upload('avatars/1', io.BytesIO(b'new data'), 'image/jpeg')
+
+    # Data and metadata are published together, so a reader racing the
+    # re-upload sees one consistent version
+    assert (stored.content_type, stored.size, stored.generation) == ('image/png', 3, first)
+    assert read(stored) == b'old'
+
+
+def test_failed_upload_keeps_previous_object(storage, tmp_path):
+    generation = storage.upload('avatars/1', io.BytesIO(b'old'), 'image/png')
+
+    class BrokenStream(io.RawIOBase):
+        def readinto(self, buffer):
+            raise ConnectionError('client went away')
+
+    with pytest.raises(ConnectionError):
+        storage.upload('avatars/1', BrokenStream(), 'image/jpeg')
+
+    stored = storage.open('avatars/1')
+    assert (stored.content_type, stored.generation) == ('image/png', generation)
+    assert read(stored) == b'old'
+    assert sorted(os.listdir(tmp_path / 'avatars')) == ['1']
+
+
+def test_delete(storage, tmp_path):
+    storage.upload('avatars/1', io.BytesIO(b'data'), 'image/png')
+
+    storage.delete('avatars/1')
+    storage.delete('avatars/1')
+
+    assert storage.open('avatars/1') is None
+    assert os.listdir(tmp_path / 'avatars') == []
+
+
+def test_gcs_delete_of_missing_object():
+    deleted = []
+
+    class Blob:
+        def __init__(self, name):
+            self.name = name
+
+        def delete(self):
+            deleted.append(self.name)
+            raise NotFound('no such object')
+
+    class Bucket:
+        blob = Blob
+
+    class Clients:
+        storage = type('Client', (), {'bucket': lambda self, name: Bucket()})()
+
+    GCSStorage(Clients(), 'bucket', 256 * 1024).delete('avatars/1')
+    assert deleted == ['avatars/1']
+
+
+def test_gcs_open_is_pinned_to_the_live_generation():
+    requested = []
+
+    class Bucket:
+        def get_blob(self, name, if_generation_match=None):
+            requested.append(if_generation_match)
+            raise PreconditionFailed('generation mismatch')
+
+    class Clients:
+        storage = type('Client', (), {'bucket': lambda self, name: Bucket()})()
+
+    assert GCSStorage(Clients(), 'bucket', 256 * 1024).open('avatars/1', generation='42') is None
+    assert requested == [42]
@@ -0,0 +1,37 @@
+import pytest
+
+from app.errors.exceptions import BadRequestError
+from app.utils.validators import MAX_INDEXED_STRING_BYTES, validate_course_data
+from tests.fakes import add_user, bearer
+
+COURSE = {'subject': 'CS', 'number': 493, 'title': 'Cloud', 'term': 'fall-24',
+          'instructor_id': 1}
+
+
+@pytest.mark.parametrize('name', ['subject', 'title', 'term'])
+def test_string_fields_fit_an_index_entry(name):
+    at_limit = dict(COURSE, **{name: 'x' * MAX_INDEXED_STRING_BYTES})
+    assert validate_course_data(at_limit)[name] == at_limit[name]
+
+    with pytest.raises(BadRequestError):
+        validate_course_data(dict(COURSE, **{name: 'x' * (MAX_INDEXED_STRING_BYTES + 1)}))
+    # The limit is in UTF-8 bytes, not characters
+    with pytest.raises(BadRequestError):
+        validate_course_data({name: 'é' * 751}, partial=True)
+
+
+def test_overlong_title_is_a_400(client, datastore_client):
+    add_user(datastore_client, 'admin', 'auth0|admin')
+    instructor_id = add_user(datastore_client, 'instructor', 'auth0|instructor')
+    body = dict(COURSE, instructor_id=instructor_id, title='x' * 2000)
+
+    response = client.post('/courses', json=body, headers=bearer('auth0|admin'))
+    assert response.status_code == 400
+
+    created = client.post('/courses', json=dict(body, title='Cloud'),
+                          headers=bearer('auth0|admin'))
+    assert created.status_code == 201
+
+    response = client.patch(f"/courses/{created.get_json()['id']}",
+                            json={'subject': 'x' * 2000}, headers=bearer('auth0|admin'))
+    assert response.status_code == 400